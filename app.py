@@ -12,6 +12,10 @@ from models.opinion import Opinion
 from models.objeto import Objeto
 from models.incidencia import Incidencia
 from models.categoria import Categoria
+from models.version_cache import VersionCache
+
+# Sello de versión de Objeto (ETag / Last-Modified) en cada flush
+import src.services.versiones  # noqa: F401
 
 # Cargar variables de entorno
 load_dotenv()
@@ -40,6 +44,23 @@ def create_app():
     app.config["UPLOAD_FOLDER"] = os.getenv("UPLOAD_FOLDER", "./static/uploads")
     app.config["MAX_CONTENT_LENGTH"] = int(os.getenv("MAX_CONTENT_LENGTH", 16777216))
     app.config["SESSION_TIMEOUT"] = int(os.getenv("SESSION_TIMEOUT", 3600))
+    app.config["CATALOGO_POR_PAGINA"] = int(os.getenv("CATALOGO_POR_PAGINA", 24))
+    app.config["RESERVAS_POR_PAGINA"] = int(os.getenv("RESERVAS_POR_PAGINA", 20))
+    app.config["SUGERENCIAS_TTL"] = int(os.getenv("SUGERENCIAS_TTL", 300))
+    app.config["CACHE_VERIFICAR_CADA"] = int(os.getenv("CACHE_VERIFICAR_CADA", 5))
+    app.config["CACHE_INICIO_TTL"] = int(os.getenv("CACHE_INICIO_TTL", 60))
+    app.config["IMAGENES_PROCESOS"] = int(os.getenv("IMAGENES_PROCESOS", 2))
+    app.config["IMAGEN_MAX_BYTES"] = int(os.getenv("IMAGEN_MAX_BYTES", 8388608))
+    app.config["IMAGEN_MAX_PIXELES"] = int(os.getenv("IMAGEN_MAX_PIXELES", 40000000))
+    app.config["BORRADO_EN_SEGUNDO_PLANO"] = int(os.getenv("BORRADO_EN_SEGUNDO_PLANO", 1))
+    app.config["ALMACENAMIENTO"] = os.getenv("ALMACENAMIENTO", "local")
+    app.config["S3_BUCKET"] = os.getenv("S3_BUCKET")
+    app.config["S3_PREFIJO"] = os.getenv("S3_PREFIJO", "")
+    app.config["S3_ENDPOINT_URL"] = os.getenv("S3_ENDPOINT_URL")
+    app.config["S3_URL_PUBLICA"] = os.getenv("S3_URL_PUBLICA")
+    app.config["UPLOADS_MAX_AGE"] = int(os.getenv("UPLOADS_MAX_AGE", 3600))
+    app.config["UPLOADS_SENDFILE"] = os.getenv("UPLOADS_SENDFILE", "")
+    app.config["UPLOADS_ACCEL_PREFIJO"] = os.getenv("UPLOADS_ACCEL_PREFIJO", "/_uploads/")
 
     # CONFIGURACIÓN DE EMAIL
     app.config["MAIL_SERVER"] = os.getenv("EMAIL_HOST")
@@ -87,6 +108,8 @@ def register_blueprints(app):
     from src.routes.incidencias import incidencias_bp
     from src.routes.admin import admin_bp
     from src.routes.estadisticas import estadisticas_bp
+    from src.routes.api import api_bp
+    from src.routes.uploads import uploads_bp
 
     app.register_blueprint(main_bp)
     app.register_blueprint(auth_bp, url_prefix="/auth")
@@ -98,6 +121,8 @@ def register_blueprints(app):
     app.register_blueprint(incidencias_bp, url_prefix="/incidencias")
     app.register_blueprint(admin_bp, url_prefix="/admin")
     app.register_blueprint(estadisticas_bp, url_prefix="/admin/estadisticas")
+    app.register_blueprint(api_bp, url_prefix="/api")
+    app.register_blueprint(uploads_bp, url_prefix="/uploads")
 
 
 def register_error_handlers(app):
@@ -0,0 +1,26 @@
+"""Variantes (miniaturas y WebP) de imagen_objeto
+
+Revision ID: 0a7c4e2b9d16
+Revises: f38c6d2e1a95
+Create Date: 2026-10-18 14:35:09.551823
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a7c4e2b9d16'
+down_revision = 'f38c6d2e1a95'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('imagen_objeto', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('variantes', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('imagen_objeto', schema=None) as batch_op:
+        batch_op.drop_column('variantes')
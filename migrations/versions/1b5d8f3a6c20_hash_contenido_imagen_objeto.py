@@ -0,0 +1,28 @@
+"""Almacenamiento por contenido: hash_contenido en imagen_objeto
+
+Revision ID: 1b5d8f3a6c20
+Revises: 0a7c4e2b9d16
+Create Date: 2026-10-18 15:12:44.208317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1b5d8f3a6c20'
+down_revision = '0a7c4e2b9d16'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('imagen_objeto', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('hash_contenido', sa.String(length=64), nullable=True))
+        batch_op.create_index(batch_op.f('ix_imagen_objeto_hash_contenido'), ['hash_contenido'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('imagen_objeto', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_imagen_objeto_hash_contenido'))
+        batch_op.drop_column('hash_contenido')
@@ -0,0 +1,32 @@
+"""Medidas, tamaño y vista previa de imagen_objeto
+
+Revision ID: 2c6e9a4d7b31
+Revises: 1b5d8f3a6c20
+Create Date: 2026-10-18 16:02:17.930462
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2c6e9a4d7b31'
+down_revision = '1b5d8f3a6c20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('imagen_objeto', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('ancho', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('alto', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('tamano_bytes', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('placeholder', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('imagen_objeto', schema=None) as batch_op:
+        batch_op.drop_column('placeholder')
+        batch_op.drop_column('tamano_bytes')
+        batch_op.drop_column('alto')
+        batch_op.drop_column('ancho')
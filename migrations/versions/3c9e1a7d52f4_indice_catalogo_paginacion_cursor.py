@@ -0,0 +1,30 @@
+"""Índice para la paginación por cursor del catálogo
+
+Revision ID: 3c9e1a7d52f4
+Revises: b88d9cadebef
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c9e1a7d52f4'
+down_revision = 'b88d9cadebef'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('objeto', schema=None) as batch_op:
+        batch_op.create_index(
+            'ix_objeto_catalogo',
+            ['publicado', 'estado', 'fecha_publicacion', 'id_objeto'],
+            unique=False,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('objeto', schema=None) as batch_op:
+        batch_op.drop_index('ix_objeto_catalogo')
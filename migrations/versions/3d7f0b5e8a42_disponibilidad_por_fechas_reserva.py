@@ -0,0 +1,40 @@
+"""Disponibilidad por fechas: índice de reserva y fin del estado Reservado
+
+Revision ID: 3d7f0b5e8a42
+Revises: 2c6e9a4d7b31
+Create Date: 2026-10-18 16:48:31.114209
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3d7f0b5e8a42'
+down_revision = '2c6e9a4d7b31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('reserva', schema=None) as batch_op:
+        batch_op.create_index('ix_reserva_objeto_fin', ['id_objeto', 'fecha_fin'], unique=False)
+
+    # La ocupación ahora la dan las fechas de cada reserva: vuelven al
+    # catálogo los objetos "Reservado" por una reserva activa. El resto los
+    # marcó así su propietario a mano (el formulario lo permitía) y pasan a
+    # "No Disponible" para que sigan fuera del catálogo
+    op.execute(sa.text("""
+        UPDATE objeto SET estado = 'Disponible'
+        WHERE estado = 'Reservado' AND EXISTS (
+            SELECT 1 FROM reserva
+            WHERE reserva.id_objeto = objeto.id_objeto
+              AND reserva.estado IN ('Pendiente', 'Aceptada', 'Confirmada', 'Activa')
+        )
+    """))
+    op.execute(sa.text("UPDATE objeto SET estado = 'No Disponible' WHERE estado = 'Reservado'"))
+
+
+def downgrade():
+    with op.batch_alter_table('reserva', schema=None) as batch_op:
+        batch_op.drop_index('ix_reserva_objeto_fin')
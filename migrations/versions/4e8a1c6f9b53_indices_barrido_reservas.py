@@ -0,0 +1,28 @@
+"""Índices del barrido del ciclo de vida de las reservas
+
+Revision ID: 4e8a1c6f9b53
+Revises: 3d7f0b5e8a42
+Create Date: 2026-10-18 18:12:07.402311
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4e8a1c6f9b53'
+down_revision = '3d7f0b5e8a42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('reserva', schema=None) as batch_op:
+        batch_op.create_index('ix_reserva_estado_fin', ['estado', 'fecha_fin'], unique=False)
+        batch_op.create_index('ix_reserva_estado_inicio', ['estado', 'fecha_inicio'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('reserva', schema=None) as batch_op:
+        batch_op.drop_index('ix_reserva_estado_inicio')
+        batch_op.drop_index('ix_reserva_estado_fin')
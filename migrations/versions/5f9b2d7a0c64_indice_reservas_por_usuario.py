@@ -0,0 +1,28 @@
+"""Índice de "Mis reservas" por usuario y fecha de reserva
+
+Revision ID: 5f9b2d7a0c64
+Revises: 4e8a1c6f9b53
+Create Date: 2026-10-18 19:03:45.918247
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f9b2d7a0c64'
+down_revision = '4e8a1c6f9b53'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('reserva', schema=None) as batch_op:
+        batch_op.create_index(
+            'ix_reserva_usuario_fecha', ['id_usuario', 'fecha_reserva', 'id_reserva'], unique=False
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('reserva', schema=None) as batch_op:
+        batch_op.drop_index('ix_reserva_usuario_fecha')
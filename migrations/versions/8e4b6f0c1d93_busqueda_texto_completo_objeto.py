@@ -0,0 +1,92 @@
+"""Búsqueda de texto completo en nombre y descripción de objeto
+
+Revision ID: 8e4b6f0c1d93
+Revises: 3c9e1a7d52f4
+Create Date: 2026-10-18 10:03:27.540912
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e4b6f0c1d93'
+down_revision = '3c9e1a7d52f4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialecto = op.get_bind().dialect.name
+
+    if dialecto == 'postgresql':
+        # Español con stemming y sin acentos ("cámara" == "camara")
+        op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+        op.execute("""
+            DO $$
+            BEGIN
+                IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'rentflow_es') THEN
+                    CREATE TEXT SEARCH CONFIGURATION rentflow_es (COPY = spanish);
+                    ALTER TEXT SEARCH CONFIGURATION rentflow_es
+                        ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem;
+                END IF;
+            END
+            $$
+        """)
+        op.execute("""
+            ALTER TABLE objeto ADD COLUMN busqueda_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('rentflow_es', coalesce(nombre, '')), 'A') ||
+                setweight(to_tsvector('rentflow_es', coalesce(descripcion, '')), 'B')
+            ) STORED
+        """)
+        op.execute(
+            "CREATE INDEX ix_objeto_busqueda_vector ON objeto USING gin (busqueda_vector)"
+        )
+
+    elif dialecto == 'sqlite':
+        op.execute("""
+            CREATE VIRTUAL TABLE objeto_fts USING fts5(
+                nombre, descripcion,
+                content='objeto', content_rowid='id_objeto',
+                tokenize='unicode61 remove_diacritics 2',
+                prefix='2 3'
+            )
+        """)
+        op.execute("""
+            CREATE TRIGGER objeto_fts_ai AFTER INSERT ON objeto BEGIN
+                INSERT INTO objeto_fts(rowid, nombre, descripcion)
+                VALUES (new.id_objeto, new.nombre, new.descripcion);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER objeto_fts_ad AFTER DELETE ON objeto BEGIN
+                INSERT INTO objeto_fts(objeto_fts, rowid, nombre, descripcion)
+                VALUES ('delete', old.id_objeto, old.nombre, old.descripcion);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER objeto_fts_au AFTER UPDATE OF nombre, descripcion ON objeto BEGIN
+                INSERT INTO objeto_fts(objeto_fts, rowid, nombre, descripcion)
+                VALUES ('delete', old.id_objeto, old.nombre, old.descripcion);
+                INSERT INTO objeto_fts(rowid, nombre, descripcion)
+                VALUES (new.id_objeto, new.nombre, new.descripcion);
+            END
+        """)
+        # Indexar los objetos existentes
+        op.execute("INSERT INTO objeto_fts(objeto_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    dialecto = op.get_bind().dialect.name
+
+    if dialecto == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_objeto_busqueda_vector")
+        op.execute("ALTER TABLE objeto DROP COLUMN IF EXISTS busqueda_vector")
+        op.execute("DROP TEXT SEARCH CONFIGURATION IF EXISTS rentflow_es")
+
+    elif dialecto == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS objeto_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS objeto_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS objeto_fts_ai")
+        op.execute("DROP TABLE IF EXISTS objeto_fts")
@@ -0,0 +1,28 @@
+"""Índice en imagen_objeto.objeto_id para cargar portadas por página
+
+Revision ID: a61d2e9f7b08
+Revises: 8e4b6f0c1d93
+Create Date: 2026-10-18 10:41:05.662731
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a61d2e9f7b08'
+down_revision = '8e4b6f0c1d93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('imagen_objeto', schema=None) as batch_op:
+        batch_op.create_index(
+            batch_op.f('ix_imagen_objeto_objeto_id'), ['objeto_id'], unique=False
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('imagen_objeto', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_imagen_objeto_objeto_id'))
@@ -0,0 +1,47 @@
+"""Agregados de calificaciones en objeto
+
+Revision ID: c27f5b8a9e14
+Revises: a61d2e9f7b08
+Create Date: 2026-10-18 11:20:53.204417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c27f5b8a9e14'
+down_revision = 'a61d2e9f7b08'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('objeto', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('suma_calificaciones', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('total_opiniones', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('promedio_calificacion', sa.Numeric(precision=3, scale=2), nullable=False, server_default='0'))
+
+    # Calcular los agregados de las opiniones existentes
+    op.execute("""
+        UPDATE objeto SET
+            suma_calificaciones = (
+                SELECT COALESCE(SUM(calificacion), 0) FROM opiniones
+                WHERE opiniones.id_objeto = objeto.id_objeto
+            ),
+            total_opiniones = (
+                SELECT COUNT(*) FROM opiniones
+                WHERE opiniones.id_objeto = objeto.id_objeto
+            ),
+            promedio_calificacion = COALESCE((
+                SELECT AVG(calificacion) FROM opiniones
+                WHERE opiniones.id_objeto = objeto.id_objeto
+            ), 0)
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('objeto', schema=None) as batch_op:
+        batch_op.drop_column('promedio_calificacion')
+        batch_op.drop_column('total_opiniones')
+        batch_op.drop_column('suma_calificaciones')
@@ -0,0 +1,29 @@
+"""Tabla version_cache para invalidar las caches de cada worker
+
+Revision ID: d4a83c1f6e27
+Revises: c27f5b8a9e14
+Create Date: 2026-10-18 12:20:41.318402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a83c1f6e27'
+down_revision = 'c27f5b8a9e14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'version_cache',
+        sa.Column('clave', sa.String(length=50), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('clave')
+    )
+
+
+def downgrade():
+    op.drop_table('version_cache')
@@ -0,0 +1,33 @@
+"""Sello de versión en objeto para ETag / Last-Modified
+
+Revision ID: e5f1b97a0c32
+Revises: d4a83c1f6e27
+Create Date: 2026-10-18 13:02:17.904116
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5f1b97a0c32'
+down_revision = 'd4a83c1f6e27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('objeto', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+        batch_op.add_column(sa.Column('fecha_actualizacion', sa.DateTime(), nullable=True))
+
+    op.execute("UPDATE objeto SET fecha_actualizacion = CURRENT_TIMESTAMP")
+
+    with op.batch_alter_table('objeto', schema=None) as batch_op:
+        batch_op.alter_column('fecha_actualizacion', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('objeto', schema=None) as batch_op:
+        batch_op.drop_column('fecha_actualizacion')
+        batch_op.drop_column('version')
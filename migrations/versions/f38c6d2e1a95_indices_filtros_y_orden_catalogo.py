@@ -0,0 +1,36 @@
+"""Índices compuestos para los filtros de precio y órdenes del catálogo
+
+Revision ID: f38c6d2e1a95
+Revises: e5f1b97a0c32
+Create Date: 2026-10-18 13:48:52.270339
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f38c6d2e1a95'
+down_revision = 'e5f1b97a0c32'
+branch_labels = None
+depends_on = None
+
+INDICES = {
+    'ix_objeto_catalogo_precio': ['publicado', 'estado', 'precio', 'id_objeto'],
+    'ix_objeto_catalogo_calificacion': ['publicado', 'estado', 'promedio_calificacion', 'id_objeto'],
+    'ix_objeto_categoria_fecha': ['publicado', 'estado', 'id_categoria', 'fecha_publicacion', 'id_objeto'],
+    'ix_objeto_categoria_precio': ['publicado', 'estado', 'id_categoria', 'precio', 'id_objeto'],
+    'ix_objeto_categoria_calificacion': ['publicado', 'estado', 'id_categoria', 'promedio_calificacion', 'id_objeto'],
+}
+
+
+def upgrade():
+    with op.batch_alter_table('objeto', schema=None) as batch_op:
+        for nombre, columnas in INDICES.items():
+            batch_op.create_index(nombre, columnas, unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('objeto', schema=None) as batch_op:
+        for nombre in INDICES:
+            batch_op.drop_index(nombre)
@@ -1,9 +1,33 @@
 from extensions import db
+from sqlalchemy import func
 
 
 class ImagenObjeto(db.Model):
     __tablename__ = "imagen_objeto"
 
     id = db.Column(db.Integer, primary_key=True)
+    # Ruta relativa a UPLOAD_FOLDER: "ab/cd/<sha256>.jpg" (las anteriores, el nombre subido)
     nombre_archivo = db.Column(db.String(255), nullable=False)
-    objeto_id = db.Column(db.Integer, db.ForeignKey("objeto.id_objeto"), nullable=False)
+    # SHA-256 del contenido: varias filas pueden compartir el mismo archivo
+    hash_contenido = db.Column(db.String(64), nullable=True, index=True)
+    objeto_id = db.Column(
+        db.Integer, db.ForeignKey("objeto.id_objeto"), nullable=False, index=True
+    )
+    # Medidas con que se muestra (rotación EXIF aplicada), tamaño del original
+    # y vista previa de 16 px como data URI; None en filas sin medir
+    ancho = db.Column(db.Integer, nullable=True)
+    alto = db.Column(db.Integer, nullable=True)
+    tamano_bytes = db.Column(db.Integer, nullable=True)
+    placeholder = db.Column(db.Text, nullable=True)
+    # Miniaturas y WebP generados en segundo plano (src/services/imagenes.py):
+    # [{"archivo": ..., "ancho": 320, "formato": "webp"}, ...]; None = pendiente
+    variantes = db.Column(db.JSON, nullable=True)
+
+    @staticmethod
+    def referencias(hash_contenido):
+        """Filas que usan el archivo con ese contenido (su conteo de referencias)."""
+        return (
+            db.session.query(func.count(ImagenObjeto.id))
+            .filter(ImagenObjeto.hash_contenido == hash_contenido)
+            .scalar()
+        )
@@ -1,9 +1,33 @@
 from extensions import db
-from datetime import date
+from datetime import date, datetime
+from sqlalchemy import case, func, select, update
 
 
 class Objeto(db.Model):
     __tablename__ = "objeto"
+    __table_args__ = (
+        # Soporta el orden del catálogo y la paginación por cursor: uno por cada
+        # orden disponible, con y sin filtro de categoría, para que cada página
+        # sea un recorrido de rango del índice y no un ordenamiento de la tabla
+        db.Index("ix_objeto_catalogo", "publicado", "estado", "fecha_publicacion", "id_objeto"),
+        db.Index("ix_objeto_catalogo_precio", "publicado", "estado", "precio", "id_objeto"),
+        db.Index(
+            "ix_objeto_catalogo_calificacion",
+            "publicado", "estado", "promedio_calificacion", "id_objeto",
+        ),
+        db.Index(
+            "ix_objeto_categoria_fecha",
+            "publicado", "estado", "id_categoria", "fecha_publicacion", "id_objeto",
+        ),
+        db.Index(
+            "ix_objeto_categoria_precio",
+            "publicado", "estado", "id_categoria", "precio", "id_objeto",
+        ),
+        db.Index(
+            "ix_objeto_categoria_calificacion",
+            "publicado", "estado", "id_categoria", "promedio_calificacion", "id_objeto",
+        ),
+    )
 
     id_objeto = db.Column(db.Integer, primary_key=True)
     nombre = db.Column(db.String(100), nullable=False)
@@ -19,6 +43,74 @@ class Objeto(db.Model):
         db.Integer, db.ForeignKey("categoria.id_categoria"), nullable=False
     )
 
+    # Agregados de opiniones, mantenidos en cada escritura de Opinion
+    suma_calificaciones = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    total_opiniones = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    promedio_calificacion = db.Column(db.Numeric(3, 2), nullable=False, default=0, server_default="0")
+
+    # Sello de versión: cambia con el objeto, sus imágenes, opiniones o reservas
+    # (ver src/services/versiones.py). Base de ETag y Last-Modified.
+    version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
+    fecha_actualizacion = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
     reservas = db.relationship("Reserva", backref="objeto", lazy=True)
     opiniones = db.relationship("Opinion", backref="objeto", lazy=True)
     imagenes = db.relationship("ImagenObjeto", backref="objeto", lazy=True, cascade="all, delete-orphan")
+
+    @staticmethod
+    def ajustar_calificaciones(id_objeto, delta_suma, delta_total):
+        """
+        Suma los deltas a los agregados de opiniones del objeto dentro de la
+        transacción en curso (se confirma con el commit de la opinión).
+        """
+        # El UPDATE no pasa por before_flush: el catálogo (orden por
+        # calificación) se invalida a mano en la misma transacción
+        from src.services.catalogo import CLAVE_CATALOGO
+        from src.services.cache import incrementar_version
+
+        suma = Objeto.suma_calificaciones + delta_suma
+        total = Objeto.total_opiniones + delta_total
+        db.session.execute(
+            update(Objeto)
+            .where(Objeto.id_objeto == id_objeto)
+            .values(
+                suma_calificaciones=suma,
+                total_opiniones=total,
+                promedio_calificacion=case(
+                    (total > 0, db.cast(suma, db.Float) / total), else_=0
+                ),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        incrementar_version(CLAVE_CATALOGO)
+
+    @staticmethod
+    def recalcular_calificaciones():
+        """Recalcula los agregados de todos los objetos desde la tabla opiniones."""
+        from models.opinion import Opinion
+        from src.services.catalogo import CLAVE_CATALOGO
+        from src.services.cache import incrementar_version
+
+        suma = (
+            select(func.coalesce(func.sum(Opinion.calificacion), 0))
+            .where(Opinion.id_objeto == Objeto.id_objeto)
+            .scalar_subquery()
+        )
+        total = (
+            select(func.count(Opinion.id_opinion))
+            .where(Opinion.id_objeto == Objeto.id_objeto)
+            .scalar_subquery()
+        )
+        resultado = db.session.execute(
+            update(Objeto)
+            .values(
+                suma_calificaciones=suma,
+                total_opiniones=total,
+                promedio_calificacion=case(
+                    (total > 0, db.cast(suma, db.Float) / total), else_=0
+                ),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        incrementar_version(CLAVE_CATALOGO)
+        return resultado.rowcount
@@ -3,6 +3,17 @@ from extensions import db
 
 class Reserva(db.Model):
     __tablename__ = "reserva"
+    __table_args__ = (
+        # Disponibilidad por fechas (src/services/disponibilidad.py): por
+        # objeto, las reservas que terminan desde una fecha en adelante
+        db.Index("ix_reserva_objeto_fin", "id_objeto", "fecha_fin"),
+        # Barrido del ciclo de vida (src/services/reservas.py): las reservas
+        # de un estado que vencieron antes de hoy
+        db.Index("ix_reserva_estado_fin", "estado", "fecha_fin"),
+        db.Index("ix_reserva_estado_inicio", "estado", "fecha_inicio"),
+        # "Mis reservas": las de un usuario por fecha de reserva (cursor)
+        db.Index("ix_reserva_usuario_fecha", "id_usuario", "fecha_reserva", "id_reserva"),
+    )
 
     id_reserva = db.Column(db.Integer, primary_key=True)
     fecha_reserva = db.Column(db.Date, nullable=False)
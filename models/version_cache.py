@@ -0,0 +1,11 @@
+from extensions import db
+
+
+class VersionCache(db.Model):
+    __tablename__ = "version_cache"
+
+    clave = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<VersionCache {self.clave}={self.version}>"
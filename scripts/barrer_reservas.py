@@ -0,0 +1,29 @@
+import sys
+import os
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from src.services.reservas import LOTE_BARRIDO, barrer_reservas
+
+
+def main(lote=LOTE_BARRIDO, pausa=0):
+    """
+    Finaliza las reservas cuyo alquiler terminó y expira las solicitudes
+    que nunca se confirmaron. Pensado para correr a diario (cron).
+    """
+    app = create_app()
+
+    with app.app_context():
+        cambios = barrer_reservas(lote=lote, pausa=pausa)
+        for estado, total in cambios.items():
+            print(f"✅ {total} reservas pasaron a {estado}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Barrido del ciclo de vida de las reservas.")
+    parser.add_argument("--lote", type=int, default=LOTE_BARRIDO, help="reservas por UPDATE y commit")
+    parser.add_argument("--pausa", type=float, default=0, help="segundos de espera entre lotes")
+    argumentos = parser.parse_args()
+    main(argumentos.lote, argumentos.pausa)
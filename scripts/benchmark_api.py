@@ -0,0 +1,73 @@
+import sys
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Sin DATABASE_URL se usa una base SQLite temporal
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(
+        tempfile.mkdtemp(), "benchmark_api.db"
+    )
+
+from app import create_app, db
+from models.objeto import Objeto
+from benchmark_busqueda import TOTAL_OBJETOS, poblar
+
+POR_PAGINA = int(os.getenv("BENCHMARK_POR_PAGINA", 100))
+REPETICIONES = 20
+
+PETICIONES = [
+    ("HTML objetos/listar.html", "/objetos/", {}),
+    ("API todos los campos", "/api/objetos", {}),
+    ("API fields=id,nombre,precio", "/api/objetos?fields=id_objeto,nombre,precio", {}),
+    ("API + gzip", "/api/objetos", {"Accept-Encoding": "gzip"}),
+    ("API + brotli", "/api/objetos", {"Accept-Encoding": "br"}),
+]
+
+
+def medir(cliente, url, cabeceras):
+    """Latencia p50/p95 (ms), pico de memoria (KiB) y tamaño de respuesta (bytes)."""
+    tiempos = []
+    for _ in range(REPETICIONES):
+        inicio = time.perf_counter()
+        cuerpo = cliente.get(url, headers=cabeceras).get_data()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+        db.session.remove()
+    tiempos.sort()
+
+    tracemalloc.start()
+    cliente.get(url, headers=cabeceras).get_data()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    db.session.remove()
+
+    return statistics.median(tiempos), tiempos[int(len(tiempos) * 0.95) - 1], pico / 1024, len(cuerpo)
+
+
+def benchmark_api():
+    app = create_app()
+    app.config["CATALOGO_POR_PAGINA"] = POR_PAGINA
+    cliente = app.test_client()
+
+    with app.app_context():
+        db.create_all()
+        if Objeto.query.count() < TOTAL_OBJETOS:
+            print(f"🔄 Insertando {TOTAL_OBJETOS} objetos...")
+            poblar()
+
+        print(f"📊 Catálogo de {Objeto.query.count()} objetos, {POR_PAGINA} por página")
+        print(f"{'petición':<30}{'p50/p95 ms':>20}{'memoria KiB':>14}{'bytes':>10}")
+
+        for nombre, url, cabeceras in PETICIONES:
+            # Las respuestas HTML condicionales no aplican: sin If-None-Match
+            # cada petición renderiza la plantilla completa
+            p50, p95, memoria, tamano = medir(cliente, url, cabeceras)
+            print(f"{nombre:<30}{p50:>9.2f} / {p95:>7.2f}{memoria:>14.0f}{tamano:>10}")
+
+
+if __name__ == "__main__":
+    benchmark_api()
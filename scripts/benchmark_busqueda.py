@@ -0,0 +1,125 @@
+import sys
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Sin DATABASE_URL se usa una base SQLite temporal (FTS5)
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(
+        tempfile.mkdtemp(), "benchmark_busqueda.db"
+    )
+
+from sqlalchemy import insert
+from app import create_app, db
+from models.categoria import Categoria
+from models.objeto import Objeto
+from models.usuario import Usuario
+from src.services.catalogo import consulta_catalogo, paginar
+
+TOTAL_OBJETOS = int(os.getenv("BENCHMARK_OBJETOS", 100000))
+REPETICIONES = 20
+
+SUSTANTIVOS = [
+    "taladro", "bicicleta", "cámara", "sierra", "carpa", "proyector", "consola",
+    "escalera", "generador", "hidrolavadora", "bocina", "mesa", "silla", "drone",
+    "lijadora", "compresor", "kayak", "patineta", "guitarra", "parrilla",
+]
+ADJETIVOS = [
+    "eléctrico", "profesional", "portátil", "grande", "pequeño", "nuevo",
+    "inalámbrico", "plegable", "industrial", "compacto",
+]
+FRASES = [
+    "ideal para trabajos en casa", "perfecto para eventos", "incluye accesorios",
+    "en excelente estado", "poco uso", "con batería extra", "para exteriores",
+    "fácil de transportar", "alta potencia", "se entrega limpio",
+]
+CONSULTAS = ["taladro", "camara profesional", "eventos", "bateria", "kayak plegable"]
+
+
+def poblar():
+    propietario = Usuario(
+        nombre="Benchmark", apellido="Rentflow", correo="benchmark@rentflow.test",
+        contrasena="x", telefono="0", direccion="Santo Domingo", id_rol=3,
+        fecha_registro=date.today(),
+    )
+    categoria = Categoria(nombre="Benchmark", descripcion="Datos de prueba")
+    db.session.add_all([propietario, categoria])
+    db.session.commit()
+
+    azar = random.Random(42)
+    lote = []
+    for i in range(TOTAL_OBJETOS):
+        lote.append({
+            "nombre": f"{azar.choice(SUSTANTIVOS).capitalize()} {azar.choice(ADJETIVOS)}",
+            "descripcion": f"{azar.choice(FRASES).capitalize()}, {azar.choice(FRASES)}.",
+            "estado": "Disponible",
+            "precio": azar.randint(100, 5000),
+            "publicado": True,
+            "fecha_publicacion": date.today() - timedelta(days=azar.randint(0, 365)),
+            "id_usuario": propietario.id_usuario,
+            "id_categoria": categoria.id_categoria,
+        })
+        if len(lote) == 5000:
+            db.session.execute(insert(Objeto), lote)
+            lote = []
+    if lote:
+        db.session.execute(insert(Objeto), lote)
+    db.session.commit()
+
+
+def medir(funcion):
+    tiempos = []
+    for _ in range(REPETICIONES):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    tiempos.sort()
+    return statistics.median(tiempos), tiempos[int(len(tiempos) * 0.95) - 1]
+
+
+def buscar_texto_completo(termino):
+    query, orden = consulta_catalogo(None, termino)
+    return paginar(query, None, 24, orden)
+
+
+def buscar_ilike(termino):
+    # Búsqueda anterior: ILIKE sobre el nombre, sin índice posible
+    return (
+        Objeto.query.filter_by(estado="Disponible", publicado=True)
+        .filter(Objeto.nombre.ilike(f"%{termino}%"))
+        .order_by(Objeto.fecha_publicacion.desc(), Objeto.id_objeto.desc())
+        .limit(24)
+        .all()
+    )
+
+
+def benchmark_busqueda():
+    app = create_app()
+
+    with app.app_context():
+        db.create_all()
+        if Objeto.query.count() < TOTAL_OBJETOS:
+            print(f"🔄 Insertando {TOTAL_OBJETOS} objetos...")
+            poblar()
+
+        motor = db.engine.dialect.name
+        print(f"📊 Búsqueda sobre {Objeto.query.count()} objetos ({motor})")
+        print(f"{'consulta':<22}{'texto completo p50/p95':>26}{'ILIKE p50/p95':>22}")
+
+        for termino in CONSULTAS:
+            fts = medir(lambda: buscar_texto_completo(termino))
+            ilike = medir(lambda: buscar_ilike(termino))
+            db.session.rollback()
+            print(
+                f"{termino:<22}{fts[0]:>12.2f} / {fts[1]:>7.2f} ms"
+                f"{ilike[0]:>10.2f} / {ilike[1]:>7.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    benchmark_busqueda()
@@ -0,0 +1,42 @@
+import sys
+import os
+from concurrent.futures import wait
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from models.imagen_objeto import ImagenObjeto
+from src.services.almacenamiento import almacenamiento
+from src.services.imagenes import procesar_imagen
+
+
+def generar_variantes():
+    """Genera miniaturas y WebP de las imágenes subidas antes del pipeline."""
+    app = create_app()
+
+    with app.app_context():
+        pendientes = ImagenObjeto.query.filter(ImagenObjeto.variantes.is_(None)).all()
+        print(f"🔄 {len(pendientes)} imágenes sin variantes")
+
+        futuros, faltantes = [], 0
+        for imagen in pendientes:
+            if not almacenamiento().existe(imagen.nombre_archivo):
+                faltantes += 1
+                continue
+            futuro = procesar_imagen(imagen)
+            if futuro:
+                futuros.append(futuro)
+
+        wait(futuros)
+        pool = app.extensions.get("rentflow_imagenes")
+        if pool:
+            # Espera también a los callbacks que registran cada variante
+            pool.shutdown(wait=True)
+
+        print(f"✅ Variantes generadas para {len(pendientes) - faltantes} imágenes")
+        if faltantes:
+            print(f"⚠️ {faltantes} imágenes no están en el almacenamiento")
+
+
+if __name__ == "__main__":
+    generar_variantes()
@@ -0,0 +1,73 @@
+import sys
+import os
+import io
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+from app import create_app, db
+from models.imagen_objeto import ImagenObjeto
+from src.services.almacenamiento import almacenamiento
+from src.services.imagenes import medir_imagen, vista_previa
+
+# Filas que se actualizan por commit
+LOTE = 200
+
+
+def medir_imagenes():
+    """Guarda medidas, tamaño y vista previa de las imágenes subidas antes de tenerlas."""
+    app = create_app()
+
+    with app.app_context():
+        pendientes = ImagenObjeto.query.filter(ImagenObjeto.ancho.is_(None)).count()
+        print(f"🔄 {pendientes} imágenes sin medir")
+
+        medidas = {}  # nombre_archivo -> (tamaño, ancho, alto, placeholder)
+        medidas_ok, faltantes, ultimo_id = 0, 0, 0
+        while True:
+            lote = (
+                ImagenObjeto.query.filter(
+                    ImagenObjeto.ancho.is_(None), ImagenObjeto.id > ultimo_id
+                )
+                .order_by(ImagenObjeto.id)
+                .limit(LOTE)
+                .all()
+            )
+            if not lote:
+                break
+
+            for imagen in lote:
+                # Con el almacenamiento por contenido varias filas comparten archivo
+                if imagen.nombre_archivo not in medidas:
+                    try:
+                        datos = almacenamiento().leer(imagen.nombre_archivo)
+                        medidas[imagen.nombre_archivo] = (
+                            len(datos),
+                            *medir_imagen(io.BytesIO(datos)),
+                            # Las que ya tienen variantes no volverán a pasar por el pool
+                            imagen.placeholder or vista_previa(io.BytesIO(datos)),
+                        )
+                    except (OSError, ValueError, Image.DecompressionBombError):
+                        medidas[imagen.nombre_archivo] = None
+                if medidas[imagen.nombre_archivo] is None:
+                    faltantes += 1
+                    continue
+
+                (
+                    imagen.tamano_bytes,
+                    imagen.ancho,
+                    imagen.alto,
+                    imagen.placeholder,
+                ) = medidas[imagen.nombre_archivo]
+                medidas_ok += 1
+
+            ultimo_id = lote[-1].id
+            db.session.commit()
+
+        print(f"✅ {medidas_ok} imágenes medidas")
+        if faltantes:
+            print(f"⚠️ {faltantes} imágenes no están en el almacenamiento o no se pueden leer")
+
+
+if __name__ == "__main__":
+    medir_imagenes()
@@ -0,0 +1,21 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from models.objeto import Objeto
+
+
+def recalcular_calificaciones():
+    """Repara suma, total y promedio de calificaciones de todos los objetos."""
+    app = create_app()
+
+    with app.app_context():
+        actualizados = Objeto.recalcular_calificaciones()
+        db.session.commit()
+        print(f"✅ Calificaciones recalculadas en {actualizados} objetos")
+
+
+if __name__ == "__main__":
+    recalcular_calificaciones()
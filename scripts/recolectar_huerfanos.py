@@ -0,0 +1,122 @@
+import sys
+import os
+import argparse
+import re
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from models.imagen_objeto import ImagenObjeto
+from src.services.almacenamiento import HUELLA, almacenamiento
+
+# Archivos que se comparan contra la base de datos en cada consulta
+LOTE = 1000
+
+# Directorios del almacenamiento por contenido ("ab/cd/<archivo>")
+FRAGMENTOS = re.compile(r"^[0-9a-f]{2}/[0-9a-f]{2}/[^/]+$")
+
+
+def archivos_de_imagenes():
+    """
+    Genera los archivos del almacenamiento que pueden ser de ImagenObjeto:
+    la raíz (nombres anteriores al almacenamiento por contenido y
+    temporales) y los directorios "ab/cd/". Los demás (avatares) se saltan.
+    El almacenamiento los lista de a poco, nunca todos en memoria.
+    """
+    for archivo in almacenamiento().listar():
+        if "/" not in archivo.nombre or FRAGMENTOS.match(archivo.nombre):
+            yield archivo
+
+
+def _nombres_anteriores():
+    """Originales y variantes de las imágenes sin hash (un conjunto que ya no crece)."""
+    nombres = set()
+    filas = (
+        db.session.query(ImagenObjeto.nombre_archivo, ImagenObjeto.variantes)
+        .filter(ImagenObjeto.hash_contenido.is_(None))
+        .yield_per(LOTE)
+    )
+    for nombre_archivo, variantes in filas:
+        nombres.add(nombre_archivo.replace("\\", "/"))
+        nombres.update(v["archivo"].replace("\\", "/") for v in variantes or [])
+    return nombres
+
+
+def _huerfanos_del_lote(lote, anteriores):
+    """Los archivos del lote que ninguna fila de ImagenObjeto usa."""
+    huellas = {
+        HUELLA.match(archivo.nombre).group("hash")
+        for archivo in lote
+        if HUELLA.match(archivo.nombre)
+    }
+    usadas = set()
+    if huellas:
+        usadas = {
+            huella
+            for (huella,) in db.session.query(ImagenObjeto.hash_contenido)
+            .filter(ImagenObjeto.hash_contenido.in_(huellas))
+            .distinct()
+        }
+
+    for archivo in lote:
+        coincidencia = HUELLA.match(archivo.nombre)
+        if coincidencia:
+            if coincidencia.group("hash") not in usadas:
+                yield archivo
+        elif archivo.nombre not in anteriores:
+            yield archivo
+
+
+def recolectar_huerfanos(aplicar=False, minutos=60):
+    """
+    Busca en el almacenamiento los archivos de imágenes que ya no usa
+    ninguna ImagenObjeto (borrados pendientes que se perdieron, subidas a
+    medias) y los lista; con `aplicar` además los borra. Los archivos
+    modificados en los últimos `minutos` se respetan: pueden ser de una
+    subida en curso.
+    """
+    app = create_app()
+
+    with app.app_context():
+        limite = time.time() - minutos * 60
+        anteriores = _nombres_anteriores()
+
+        revisados, huerfanos, liberados = 0, 0, 0
+        lote = []
+
+        def procesar(lote):
+            nonlocal huerfanos, liberados
+            for archivo in _huerfanos_del_lote(lote, anteriores):
+                if archivo.modificado > limite:
+                    continue
+                huerfanos += 1
+                liberados += archivo.tamano
+                print(f"🗑️ {archivo.nombre} ({archivo.tamano} bytes)")
+                if aplicar:
+                    almacenamiento().borrar(archivo.nombre)
+
+        # Los temporales (".subida-...") nunca tienen fila: si son viejos,
+        # son de una subida que no terminó
+        for archivo in archivos_de_imagenes():
+            revisados += 1
+            lote.append(archivo)
+            if len(lote) >= LOTE:
+                procesar(lote)
+                lote = []
+        if lote:
+            procesar(lote)
+
+        accion = "Borrados" if aplicar else "Se borrarían"
+        print(f"✅ {revisados} archivos revisados")
+        print(f"📦 {accion} {huerfanos} huérfanos ({liberados / 1048576:.1f} MB)")
+        if not aplicar and huerfanos:
+            print("ℹ️ Ejecuta con --aplicar para borrarlos")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recolecta uploads huérfanos.")
+    parser.add_argument("--aplicar", action="store_true", help="borrar los huérfanos (por defecto solo se listan)")
+    parser.add_argument("--minutos", type=int, default=60, help="respetar archivos más nuevos que esto")
+    argumentos = parser.parse_args()
+    recolectar_huerfanos(argumentos.aplicar, argumentos.minutos)
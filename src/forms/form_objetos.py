@@ -26,7 +26,6 @@ class ObjetoForm(FlaskForm):
         "Estado",
         choices=[
             ("Disponible", "Disponible 🟢"),
-            ("Reservado", "Reservado 🟡"),
             ("No Disponible", "No disponible 🔴"),
         ],
         validators=[DataRequired(message="Debe seleccionar un estado.")],
@@ -10,6 +10,9 @@ from models.incidencia import Incidencia
 from models.reserva import Reserva
 from models.pago import Pago
 from models.opinion import Opinion
+from src.services.categorias import invalidar_categorias
+from src.services.imagenes import archivos_de, liberar_en_segundo_plano
+from src.services.sugerencias import registrar_categoria, retirar_categoria, retirar_objeto
 from datetime import datetime, date, timedelta
 
 admin_bp = Blueprint("admin", __name__)
@@ -121,21 +124,28 @@ def eliminar_usuario(id):
     for reserva in reservas_no_activas:
         db.session.delete(reserva)
 
-    # 🔥 Eliminar opiniones
+    # 🔥 Eliminar opiniones (descontándolas de los agregados del objeto)
     for op in usuario.opiniones:
+        Objeto.ajustar_calificaciones(op.id_objeto, -op.calificacion, -1)
         db.session.delete(op)
 
     # 🔥 Eliminar incidencias
     for inc in usuario.incidencias:
         db.session.delete(inc)
 
-    # 🔥 Eliminar objetos
+    # 🔥 Eliminar objetos (sus archivos se borran en segundo plano tras el commit)
+    archivos, ids_objeto = [], []
     for obj in usuario.objetos:
+        archivos += [(img.hash_contenido, archivos_de(img)) for img in obj.imagenes]
+        ids_objeto.append(obj.id_objeto)
         db.session.delete(obj)
 
     # 🔥 Finalmente eliminar usuario
     db.session.delete(usuario)
     db.session.commit()
+    liberar_en_segundo_plano(archivos)
+    for id_objeto in ids_objeto:
+        retirar_objeto(id_objeto)
 
     return jsonify({"ok": True, "msg": "Usuario eliminado correctamente."})
 
@@ -243,7 +253,9 @@ def crear_categoria():
 
     nueva_categoria = Categoria(nombre=nombre, descripcion=descripcion)
     db.session.add(nueva_categoria)
+    invalidar_categorias()
     db.session.commit()
+    registrar_categoria(nueva_categoria)
 
     flash("Categoría creada correctamente", "success")
     return redirect(url_for("admin.categorias"))
@@ -270,7 +282,9 @@ def editar_categoria():
 
     categoria.nombre = nombre
     categoria.descripcion = descripcion
+    invalidar_categorias()
     db.session.commit()
+    registrar_categoria(categoria)
 
     flash("Categoría actualizada correctamente", "success")
     return redirect(url_for("admin.categorias"))
@@ -287,7 +301,9 @@ def eliminar_categoria(id):
         return redirect(url_for("admin.categorias"))
 
     db.session.delete(categoria)
+    invalidar_categorias()
     db.session.commit()
+    retirar_categoria(id)
 
     flash("Categoría eliminada correctamente", "success")
     return redirect(url_for("admin.categorias"))
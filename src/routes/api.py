@@ -0,0 +1,150 @@
+import json
+import zlib
+from datetime import date
+from decimal import Decimal
+import brotli
+from flask import (
+    Blueprint,
+    Response,
+    current_app,
+    jsonify,
+    request,
+    stream_with_context,
+)
+from sqlalchemy import select
+from extensions import db
+from models.imagen_objeto import ImagenObjeto
+from models.objeto import Objeto
+from models.usuario import Usuario
+from src.routes.objetos import filtros_catalogo
+from src.services.catalogo import codificar_cursor, consulta_pagina, filtrar_catalogo
+from src.services.imagenes import url_upload
+
+api_bp = Blueprint("api", __name__)
+
+# Máximo de objetos por página que puede pedir un cliente
+LIMITE_MAXIMO = 100
+
+# Calidad de brotli para respuestas dinámicas: la 11 (por defecto) tarda
+# decenas de ms por página; la 5 comprime casi igual en una fracción
+CALIDAD_BROTLI = 5
+
+# Campos disponibles con ?fields= y la columna que se consulta para cada uno
+CAMPOS = {
+    "id_objeto": Objeto.id_objeto,
+    "nombre": Objeto.nombre,
+    "descripcion": Objeto.descripcion,
+    "precio": Objeto.precio,
+    "estado": Objeto.estado,
+    "fecha_publicacion": Objeto.fecha_publicacion,
+    "id_categoria": Objeto.id_categoria,
+    "promedio_calificacion": Objeto.promedio_calificacion,
+    "total_opiniones": Objeto.total_opiniones,
+    "propietario": Usuario.nombre,
+    "ubicacion": Usuario.direccion,
+    # Portada: primera imagen del objeto (usa ix_imagen_objeto_objeto_id)
+    "imagen": (
+        select(ImagenObjeto.nombre_archivo)
+        .where(ImagenObjeto.objeto_id == Objeto.id_objeto)
+        .order_by(ImagenObjeto.id)
+        .limit(1)
+        .scalar_subquery()
+    ),
+}
+CAMPOS_DEL_PROPIETARIO = {"propietario", "ubicacion"}
+
+
+def _valor_json(campo, valor):
+    if valor is None:
+        return None
+    if campo == "imagen":
+        return url_upload(valor)
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, date):
+        return valor.isoformat()
+    return valor
+
+
+def _comprimir(partes, codificacion):
+    """Comprime el cuerpo a medida que se genera (gzip o brotli)."""
+    if codificacion == "br":
+        compresor = brotli.Compressor(quality=CALIDAD_BROTLI)
+        comprimir, terminar = compresor.process, compresor.finish
+    else:
+        compresor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        comprimir, terminar = compresor.compress, compresor.flush
+
+    for parte in partes:
+        bloque = comprimir(parte.encode())
+        if bloque:
+            yield bloque
+    yield terminar()
+
+
+# -----------------------------
+# Catálogo para la app móvil
+# -----------------------------
+@api_bp.route("/objetos")
+def listar_objetos():
+    """
+    Mismo catálogo que objetos.listar_objetos (mismos filtros y cursores),
+    pero solo con las columnas pedidas: filas de Core sin instancias del ORM,
+    escritas en el JSON a medida que llegan de la base de datos.
+    """
+    pedidos = [c.strip() for c in request.args.get("fields", "").split(",") if c.strip()]
+    pedidos = list(dict.fromkeys(pedidos)) or list(CAMPOS)
+    desconocidos = [c for c in pedidos if c not in CAMPOS]
+    if desconocidos:
+        return jsonify({"error": "Campos desconocidos: " + ", ".join(desconocidos)}), 400
+
+    limite = request.args.get("limite", current_app.config["CATALOGO_POR_PAGINA"], type=int)
+    limite = min(max(limite, 1), LIMITE_MAXIMO)
+
+    consulta = select(*[CAMPOS[c].label(c) for c in pedidos]).select_from(Objeto)
+    if CAMPOS_DEL_PROPIETARIO.intersection(pedidos):
+        consulta = consulta.join(Usuario, Usuario.id_usuario == Objeto.id_usuario)
+
+    filtros = filtros_catalogo()
+    consulta, orden = filtrar_catalogo(
+        consulta,
+        filtros.get("categoria"),
+        filtros.get("busqueda", ""),
+        filtros.get("precio_min"),
+        filtros.get("precio_max"),
+        filtros.get("orden"),
+        filtros.get("desde"),
+        filtros.get("hasta"),
+    )
+    consulta = consulta_pagina(
+        consulta, request.args.get("cursor"), limite, orden
+    ).execution_options(stream_results=True)
+
+    def generar():
+        filas = db.session.execute(consulta)
+        siguiente, anterior = None, None
+
+        yield '{"objetos":['
+        for i, fila in enumerate(filas):
+            if i == limite:
+                # Hay más: el cursor son las columnas de orden de la última fila
+                siguiente = codificar_cursor(anterior[len(pedidos):])
+                break
+            objeto = {c: _valor_json(c, v) for c, v in zip(pedidos, fila)}
+            yield ("," if i else "") + json.dumps(
+                objeto, ensure_ascii=False, separators=(",", ":")
+            )
+            anterior = fila
+        filas.close()
+        yield '],"siguiente":' + json.dumps(siguiente) + "}"
+
+    cuerpo = stream_with_context(generar())
+    codificacion = request.accept_encodings.best_match(["br", "gzip"])
+    if codificacion:
+        cuerpo = _comprimir(cuerpo, codificacion)
+
+    respuesta = Response(cuerpo, mimetype="application/json")
+    if codificacion:
+        respuesta.headers["Content-Encoding"] = codificacion
+    respuesta.vary.add("Accept-Encoding")
+    return respuesta
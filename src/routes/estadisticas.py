@@ -8,7 +8,6 @@ from models.categoria import Categoria
 from models.incidencia import Incidencia
 from models.reserva import Reserva
 from models.pago import Pago
-from models.opinion import Opinion
 from datetime import datetime, date, timedelta
 
 estadisticas_bp = Blueprint("estadisticas", __name__)
@@ -119,25 +118,15 @@ def index():
         .subquery()
     )
 
-    # Subconsulta promedio calificaciones (puede no tener rango)
-    opin_sub = (
-        db.session.query(
-            Opinion.id_objeto.label("id_objeto"),
-            func.avg(Opinion.calificacion).label("avg_calif")
-        )
-        .group_by(Opinion.id_objeto)
-        .subquery()
-    )
-
+    # Promedio de calificaciones: agregado mantenido en cada objeto
     objs_pop_q = (
         db.session.query(
             Objeto,
             func.coalesce(res_sub.c.cnt_reservas, 0).label("total_reservas"),
-            func.coalesce(opin_sub.c.avg_calif, 0).label("promedio_calificacion")
+            Objeto.promedio_calificacion
         )
         .outerjoin(res_sub, Objeto.id_objeto == res_sub.c.id_objeto)
-        .outerjoin(opin_sub, Objeto.id_objeto == opin_sub.c.id_objeto)
-        .order_by(func.coalesce(res_sub.c.cnt_reservas, 0).desc(), func.coalesce(opin_sub.c.avg_calif, 0).desc())
+        .order_by(func.coalesce(res_sub.c.cnt_reservas, 0).desc(), Objeto.promedio_calificacion.desc())
         .limit(10)
         .all()
     )
@@ -1,10 +1,33 @@
-from flask import Blueprint, render_template
-from models.objeto import Objeto
+from flask import Blueprint, current_app, render_template, session
+from flask_login import current_user
+from src.services.cache import cache_de_aplicacion
+from src.services.catalogo import (
+    CLAVE_CATALOGO,
+    cargar_portadas,
+    consulta_catalogo,
+    paginar,
+)
 
 main_bp = Blueprint("main", __name__)
 
 
+def _renderizar_inicio():
+    query, orden = consulta_catalogo()
+    objetos, _ = paginar(query, limite=8, orden=orden)
+    return render_template(
+        "index.html", objetos=objetos, portadas=cargar_portadas(objetos)
+    )
+
+
 @main_bp.route("/")
 def index():
-    objetos = Objeto.query.filter_by(estado="Disponible").limit(8).all()
-    return render_template("index.html", objetos=objetos)
+    ttl = current_app.config["CACHE_INICIO_TTL"]
+
+    # La barra de navegación y los mensajes flash cambian por visitante:
+    # solo se cachea la versión anónima sin mensajes pendientes
+    if not ttl or current_user.is_authenticated or session.get("_flashes"):
+        return _renderizar_inicio()
+
+    return cache_de_aplicacion(
+        "inicio_anonimo", _renderizar_inicio, clave=CLAVE_CATALOGO, ttl=ttl
+    ).obtener()
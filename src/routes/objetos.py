@@ -1,4 +1,3 @@
-import os
 from flask import (
     Blueprint,
     render_template,
@@ -7,47 +6,178 @@ from flask import (
     flash,
     current_app,
     request,
+    jsonify,
 )
 from flask_login import login_required, current_user
-from werkzeug.utils import secure_filename
 from extensions import db
 from models.objeto import Objeto
-from models.categoria import Categoria
 from models.imagen_objeto import ImagenObjeto
 from src.forms.form_objetos import ObjetoForm
+from src.services.cache import columna_version, version_actual
+from src.services.catalogo import (
+    CLAVE_CATALOGO,
+    ORDENES,
+    cargar_portadas,
+    consulta_catalogo,
+    contar_facetas,
+    paginar,
+)
+from src.services.categorias import CLAVE_CATEGORIAS, obtener_categorias
+from src.services.condicional import responder_condicional
+from src.services.disponibilidad import CLAVE_RESERVAS
+from src.services.imagenes import (
+    SubidaInvalida,
+    archivos_de,
+    descartar_subidas,
+    instalar_subida,
+    liberar_en_segundo_plano,
+    procesar_imagen,
+    recibir_subidas,
+    srcset_imagen,
+    url_imagen,
+    variantes_guardadas,
+)
+from src.services.sugerencias import obtener_indice, registrar_objeto, retirar_objeto
 from datetime import date
 from models.opinion import Opinion
 objetos_bp = Blueprint("objetos", __name__)
+objetos_bp.add_app_template_global(url_imagen)
+objetos_bp.add_app_template_global(srcset_imagen)
+
+# -----------------------------
+# Filtros del catálogo (URL)
+# -----------------------------
+def filtros_catalogo():
+    """Filtros presentes en la URL; los vacíos o inválidos se omiten."""
+    filtros = {
+        "categoria": request.args.get("categoria"),
+        "busqueda": request.args.get("busqueda", "").strip(),
+        "precio_min": request.args.get("precio_min", type=float),
+        "precio_max": request.args.get("precio_max", type=float),
+        "orden": request.args.get("orden") if request.args.get("orden") in ORDENES else None,
+        "desde": request.args.get("desde", type=date.fromisoformat),
+        "hasta": request.args.get("hasta", type=date.fromisoformat),
+    }
+
+    # Con una sola fecha se busca ese día; un rango al revés se ignora
+    filtros["desde"] = filtros["desde"] or filtros["hasta"]
+    filtros["hasta"] = filtros["hasta"] or filtros["desde"]
+    if filtros["desde"] and filtros["desde"] > filtros["hasta"]:
+        filtros["desde"] = filtros["hasta"] = None
+
+    return {clave: valor for clave, valor in filtros.items() if valor not in (None, "")}
+
+
+def consultar_catalogo(filtros):
+    return consulta_catalogo(
+        filtros.get("categoria"),
+        filtros.get("busqueda", ""),
+        filtros.get("precio_min"),
+        filtros.get("precio_max"),
+        filtros.get("orden"),
+        filtros.get("desde"),
+        filtros.get("hasta"),
+    )
+
 
 # -----------------------------
 # Listar objetos publicados
 # -----------------------------
 @objetos_bp.route("/")
 def listar_objetos():
-    categoria_id = request.args.get("categoria")
-    busqueda = request.args.get("busqueda", "").strip()
-    
-    query = Objeto.query.filter_by(estado="Disponible", publicado=True)
-
-    # Filtro por categoría
-    if categoria_id:
-        query = query.filter_by(id_categoria=categoria_id)
-
-    # Filtro por nombre (buscador)
-    if busqueda:
-        query = query.filter(Objeto.nombre.ilike(f"%{busqueda}%"))
-
-    objetos = query.all()
-    categorias = Categoria.query.all()
-    
-    return render_template(
-        "objetos/listar.html", 
-        objetos=objetos, 
-        categorias=categorias,
-        categoria_seleccionada=categoria_id,
-        busqueda=busqueda
+    filtros = filtros_catalogo()
+    categoria_id = filtros.get("categoria")
+    busqueda = filtros.get("busqueda", "")
+    cursor = request.args.get("cursor")
+
+    def renderizar():
+        query, orden = consultar_catalogo(filtros)
+        objetos, siguiente = paginar(
+            query, cursor, current_app.config["CATALOGO_POR_PAGINA"], orden
+        )
+        categorias = obtener_categorias()
+
+        return render_template(
+            "objetos/listar.html",
+            objetos=objetos,
+            portadas=cargar_portadas(objetos),
+            categorias=categorias,
+            facetas=contar_facetas(
+                busqueda, categoria_id, filtros.get("desde"), filtros.get("hasta")
+            ),
+            categoria_seleccionada=categoria_id,
+            busqueda=busqueda,
+            filtros=filtros,
+            siguiente=siguiente,
+        )
+
+    # El listado cambia con cualquier objeto del catálogo o con las categorías
+    # (y, si se filtra por fechas, con cualquier reserva)
+    etag = "catalogo-{}-{}-{}-{}".format(
+        version_actual(CLAVE_CATALOGO),
+        version_actual(CLAVE_CATEGORIAS),
+        version_actual(CLAVE_RESERVAS) if "desde" in filtros else "",
+        request.query_string.decode(),
+    )
+    return responder_condicional(etag, None, renderizar)
+
+
+# -----------------------------
+# Página siguiente del catálogo (JSON para scroll infinito)
+# -----------------------------
+@objetos_bp.route("/pagina")
+def listar_objetos_json():
+    cursor = request.args.get("cursor")
+
+    query, orden = consultar_catalogo(filtros_catalogo())
+    objetos, siguiente = paginar(
+        query, cursor, current_app.config["CATALOGO_POR_PAGINA"], orden
     )
 
+    portadas = cargar_portadas(objetos)
+
+    return jsonify({
+        "objetos": [_tarjeta_json(o, portadas.get(o.id_objeto)) for o in objetos],
+        "siguiente": siguiente,
+    })
+
+
+def _tarjeta_json(objeto, portada):
+    return {
+        "id_objeto": objeto.id_objeto,
+        "nombre": objeto.nombre,
+        "descripcion": objeto.descripcion or "",
+        "precio": float(objeto.precio),
+        "estado": objeto.estado,
+        "imagen": url_imagen(portada) if portada else None,
+        "srcset": srcset_imagen(portada) if portada else "",
+        # Para reservar el espacio y mostrar la vista previa mientras carga
+        "ancho": portada.ancho if portada else None,
+        "alto": portada.alto if portada else None,
+        "placeholder": portada.placeholder if portada else None,
+        "url": url_for("objetos.detalle_objeto", id_objeto=objeto.id_objeto),
+        # Propietario y ubicación, como en las tarjetas renderizadas en el servidor
+        "propietario": objeto.usuario.nombre,
+        "ubicacion": objeto.usuario.direccion.split(",")[0] if objeto.usuario.direccion else None,
+    }
+
+
+# -----------------------------
+# Sugerencias del buscador (autocompletado)
+# -----------------------------
+@objetos_bp.route("/sugerencias")
+def sugerencias():
+    q = request.args.get("q", "").strip()
+    resultados = obtener_indice().buscar(q) if q else []
+
+    for r in resultados:
+        r["url"] = (
+            url_for("objetos.detalle_objeto", id_objeto=r["id"])
+            if r["tipo"] == "objeto"
+            else url_for("objetos.listar_objetos", categoria=r["id"])
+        )
+
+    return jsonify({"sugerencias": resultados})
 
 
 # -----------------------------
@@ -61,10 +191,18 @@ def crear_objeto():
         return redirect(url_for("main.index"))
 
     form = ObjetoForm()
-    categorias = Categoria.query.all()
+    categorias = obtener_categorias()
     form.id_categoria.choices = [(c.id_categoria, c.nombre) for c in categorias]
 
     if form.validate_on_submit():
+        # Imágenes primero (en paralelo): si alguna no es válida no se crea nada
+        archivos = [img for img in request.files.getlist("imagenes")[:5] if img]
+        try:
+            subidas = recibir_subidas(archivos)
+        except SubidaInvalida as error:
+            flash(str(error), "danger")
+            return render_template("objetos/crear.html", form=form)
+
         nuevo_objeto = Objeto(
             nombre=form.nombre.data,
             descripcion=form.descripcion.data,
@@ -76,23 +214,39 @@ def crear_objeto():
             fecha_publicacion=date.today() if request.form.get("publicar") == "on" else None,
         )
         db.session.add(nuevo_objeto)
-        db.session.commit()
-
-        # Guardar imágenes
-        imagenes = request.files.getlist("imagenes")
-        for img in imagenes[:5]:
-            if img:
-                filename = secure_filename(img.filename)
-                upload_folder = os.path.join(current_app.root_path, "static", "uploads")
-                os.makedirs(upload_folder, exist_ok=True)
-                img.save(os.path.join(upload_folder, filename))
-
-                nueva_imagen = ImagenObjeto(
-                    nombre_archivo=filename,
-                    objeto_id=nuevo_objeto.id_objeto
-                )
-                db.session.add(nueva_imagen)
-        db.session.commit()
+
+        # Guardar imágenes (por contenido: los archivos repetidos se comparten)
+        imagenes = []
+        for subida in subidas:
+            nueva_imagen = ImagenObjeto(
+                nombre_archivo=subida.nombre_archivo,
+                hash_contenido=subida.hash_contenido,
+                ancho=subida.ancho,
+                alto=subida.alto,
+                tamano_bytes=subida.tamano_bytes,
+            )
+            # Mismo contenido ya procesado: se reutilizan variantes y vista previa
+            guardadas = variantes_guardadas(subida.hash_contenido)
+            if guardadas:
+                nueva_imagen.variantes, nueva_imagen.placeholder = guardadas
+            nuevo_objeto.imagenes.append(nueva_imagen)
+            imagenes.append(nueva_imagen)
+
+        # Objeto e imágenes en una sola transacción
+        try:
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            descartar_subidas(subidas)
+            raise
+        registrar_objeto(nuevo_objeto)
+
+        # Los archivos pasan a su lugar ya confirmadas las filas (ver
+        # instalar_subida); miniaturas y WebP fuera de la petición
+        for subida, imagen in zip(subidas, imagenes):
+            instalar_subida(subida)
+            if imagen.variantes is None:
+                procesar_imagen(imagen)
 
         flash("Objeto creado correctamente.", "success")
         return redirect(
@@ -109,15 +263,30 @@ def crear_objeto():
 # -----------------------------
 @objetos_bp.route("/objeto/<int:id_objeto>")
 def detalle_objeto(id_objeto):
-    objeto = Objeto.query.get_or_404(id_objeto)
+    # Solo el sello de versión: basta para responder 304 sin cargar relaciones.
+    # El nombre de la categoría también se muestra, así que va su versión
+    sello = (
+        Objeto.query.with_entities(
+            Objeto.version,
+            Objeto.fecha_actualizacion,
+            columna_version(CLAVE_CATEGORIAS).label("categorias"),
+        )
+        .filter_by(id_objeto=id_objeto)
+        .first_or_404()
+    )
 
-    calificaciones = [op.calificacion for op in objeto.opiniones]
-    promedio = sum(calificaciones) / len(calificaciones) if calificaciones else 0
+    def renderizar():
+        objeto = Objeto.query.get_or_404(id_objeto)
+        return render_template(
+            "objetos/detalle.html",
+            objeto=objeto,
+            promedio=objeto.promedio_calificacion
+        )
 
-    return render_template(
-        "objetos/detalle.html",
-        objeto=objeto,
-        promedio=promedio
+    return responder_condicional(
+        f"objeto-{id_objeto}-{sello.version}-{sello.categorias}",
+        sello.fecha_actualizacion,
+        renderizar,
     )
 
 
@@ -153,6 +322,7 @@ def publicar_objeto(id):
     objeto.publicado = True
     objeto.fecha_publicacion = date.today()
     db.session.commit()
+    registrar_objeto(objeto)
 
     flash("Objeto publicado correctamente.", "success")
     return redirect(url_for("objetos.listar_objetos"))
@@ -170,16 +340,13 @@ def eliminar_objeto(id):
         flash("No tienes permiso para eliminar este objeto.", "danger")
         return redirect(url_for("objetos.ver_borradores"))
 
-    for img in objeto.imagenes:
-        try:
-            os.remove(
-                os.path.join(current_app.root_path, "static/uploads", img.nombre_archivo)
-            )
-        except FileNotFoundError:
-            pass
+    # Los archivos solo se borran si ninguna otra imagen comparte el contenido
+    archivos = [(img.hash_contenido, archivos_de(img)) for img in objeto.imagenes]
 
     db.session.delete(objeto)
     db.session.commit()
+    retirar_objeto(id)
+    liberar_en_segundo_plano(archivos)
 
     flash("Borrador eliminado correctamente.", "success")
     return redirect(url_for("objetos.ver_borradores"))
@@ -205,6 +372,7 @@ def agregar_opinion(id_objeto):
     )
 
     db.session.add(nueva_opinion)
+    Objeto.ajustar_calificaciones(id_objeto, calificacion, 1)
     db.session.commit()
 
     flash("¡Tu opinión fue guardada correctamente!", "success")
@@ -233,6 +401,7 @@ def crear_opinion(id_objeto):
     )
 
     db.session.add(nueva_opinion)
+    Objeto.ajustar_calificaciones(id_objeto, nueva_opinion.calificacion, 1)
     db.session.commit()
 
     flash("Opinión enviada correctamente.", "success")
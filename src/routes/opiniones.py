@@ -3,6 +3,7 @@ from flask_login import login_required, current_user
 from extensions import db
 from models.opinion import Opinion
 from models.reserva import Reserva
+from models.objeto import Objeto
 from src.forms.form_opinion import OpinionForm
 from datetime import date
 
@@ -21,7 +22,7 @@ def crear_opinion(id_objeto):
         flash(
             "Solo puedes opinar sobre objetos que hayas reservado y finalizado", "error"
         )
-        return redirect(url_for("objetos.detalle_objeto", id=id_objeto))
+        return redirect(url_for("objetos.detalle_objeto", id_objeto=id_objeto))
 
     # Verificar si ya existe una opinión para esta reserva
     opinion_existente = Opinion.query.filter_by(
@@ -30,7 +31,7 @@ def crear_opinion(id_objeto):
 
     if opinion_existente:
         flash("Ya has opinado sobre este objeto", "info")
-        return redirect(url_for("objetos.detalle_objeto", id=id_objeto))
+        return redirect(url_for("objetos.detalle_objeto", id_objeto=id_objeto))
 
     form = OpinionForm()
 
@@ -44,10 +45,11 @@ def crear_opinion(id_objeto):
         )
 
         db.session.add(opinion)
+        Objeto.ajustar_calificaciones(id_objeto, opinion.calificacion, 1)
         db.session.commit()
 
         flash("Opinión publicada exitosamente", "success")
-        return redirect(url_for("objetos.detalle_objeto", id=id_objeto))
+        return redirect(url_for("objetos.detalle_objeto", id_objeto=id_objeto))
 
     return render_template("opiniones/crear.html", form=form, id_objeto=id_objeto)
 
@@ -60,18 +62,22 @@ def editar_opinion(id):
     # Verificar que el usuario sea el dueño de la opinión
     if opinion.id_usuario != current_user.id_usuario:
         flash("No tienes permisos para editar esta opinión", "error")
-        return redirect(url_for("objetos.detalle_objeto", id=opinion.id_objeto))
+        return redirect(url_for("objetos.detalle_objeto", id_objeto=opinion.id_objeto))
 
     form = OpinionForm(obj=opinion)
 
     if form.validate_on_submit():
+        calificacion_anterior = opinion.calificacion
         opinion.comentario = form.comentario.data
         opinion.calificacion = form.calificacion.data
         opinion.fecha = date.today()
 
+        Objeto.ajustar_calificaciones(
+            opinion.id_objeto, opinion.calificacion - calificacion_anterior, 0
+        )
         db.session.commit()
         flash("Opinión actualizada exitosamente", "success")
-        return redirect(url_for("objetos.detalle_objeto", id=opinion.id_objeto))
+        return redirect(url_for("objetos.detalle_objeto", id_objeto=opinion.id_objeto))
 
     return render_template("opiniones/editar.html", form=form, opinion=opinion)
 
@@ -85,10 +91,11 @@ def eliminar_opinion(id):
     # Verificar que el usuario sea el dueño de la opinión
     if opinion.id_usuario != current_user.id_usuario:
         flash("No tienes permisos para eliminar esta opinión", "error")
-        return redirect(url_for("objetos.detalle_objeto", id=id_objeto))
+        return redirect(url_for("objetos.detalle_objeto", id_objeto=id_objeto))
 
+    Objeto.ajustar_calificaciones(id_objeto, -opinion.calificacion, -1)
     db.session.delete(opinion)
     db.session.commit()
 
     flash("Opinión eliminada exitosamente", "success")
-    return redirect(url_for("objetos.detalle_objeto", id=id_objeto))
+    return redirect(url_for("objetos.detalle_objeto", id_objeto=id_objeto))
@@ -1,12 +1,43 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify, current_app
 from flask_login import login_required, current_user
+from flask_wtf.csrf import generate_csrf, validate_csrf
+from wtforms import ValidationError
 from extensions import db
 from models.reserva import Reserva
 from models.objeto import Objeto
 from src.forms.form_reservas import ReservaForm
-from datetime import date
+from src.services.condicional import responder_condicional
+from src.services.disponibilidad import (
+    FechasOcupadas,
+    ReservaEnConflicto,
+    ocupacion_del_mes,
+    reservar,
+)
+from src.services.catalogo import cargar_portadas, paginar
+from src.services.reservas import (
+    DECISIONES,
+    ESTADOS,
+    LOTE_MAXIMO,
+    ORDEN_RESERVAS,
+    consulta_reservas_de,
+    resolver_solicitudes,
+)
+from datetime import date, datetime
 
 reservas_bp = Blueprint("reservas", __name__)
+# Formularios sin FlaskForm (gestionar.html): {{ csrf_token() }}
+reservas_bp.add_app_template_global(generate_csrf, "csrf_token")
+
+
+def _csrf_valido():
+    """Token del campo csrf_token o de la cabecera X-CSRFToken (peticiones JSON)."""
+    if not current_app.config.get("WTF_CSRF_ENABLED", True):
+        return True
+    try:
+        validate_csrf(request.form.get("csrf_token") or request.headers.get("X-CSRFToken"))
+    except ValidationError:
+        return False
+    return True
 
 
 @reservas_bp.route("/")
@@ -16,9 +47,22 @@ def listar_reservas():
         flash("Los administradores y propietarios no tienen acceso a esta sección.", "danger")
         return redirect(url_for("main.index"))
     
-    # Mostrar reservas del usuario actual
-    reservas = Reserva.query.filter_by(id_usuario=current_user.id_usuario).all()
-    return render_template("reservas/listar.html", reservas=reservas)
+    # Reservas del usuario actual, de a una página y opcionalmente por estado
+    estado = request.args.get("estado") if request.args.get("estado") in ESTADOS else None
+    reservas, siguiente = paginar(
+        consulta_reservas_de(current_user.id_usuario, estado),
+        request.args.get("cursor"),
+        current_app.config["RESERVAS_POR_PAGINA"],
+        ORDEN_RESERVAS,
+    )
+    return render_template(
+        "reservas/listar.html",
+        reservas=reservas,
+        portadas=cargar_portadas([r.objeto for r in reservas]),
+        estados=ESTADOS,
+        estado=estado,
+        siguiente=siguiente,
+    )
 
 
 @reservas_bp.route("/nueva/<int:id_objeto>", methods=["GET", "POST"])
@@ -34,10 +78,10 @@ def crear_reserva(id_objeto):
     form = ReservaForm()
 
     if form.validate_on_submit():
-        # Verificar que el objeto esté disponible
+        # Verificar que el propietario lo tenga disponible
         if objeto.estado != "Disponible":
             flash("Este objeto no está disponible para reservar", "error")
-            return redirect(url_for("objetos.detalle_objeto", id=id_objeto))
+            return redirect(url_for("objetos.detalle_objeto", id_objeto=id_objeto))
 
         # Verificar que las fechas sean válidas
         if form.fecha_inicio.data >= form.fecha_fin.data:
@@ -49,20 +93,19 @@ def crear_reserva(id_objeto):
             flash("La fecha de inicio debe ser hoy o posterior", "error")
             return render_template("reservas/crear.html", form=form, objeto=objeto)
 
-        reserva = Reserva(
-            fecha_reserva=date.today(),
-            fecha_inicio=form.fecha_inicio.data,
-            fecha_fin=form.fecha_fin.data,
-            estado="Pendiente",
-            id_usuario=current_user.id_usuario,
-            id_objeto=id_objeto,
-        )
-
-        # Cambiar estado del objeto a Reservado
-        objeto.estado = "Reservado"
-
-        db.session.add(reserva)
-        db.session.commit()
+        # Reservar si nadie tiene esas fechas (sin carreras entre peticiones)
+        try:
+            reservar(id_objeto, current_user.id_usuario, form.fecha_inicio.data, form.fecha_fin.data)
+        except FechasOcupadas as error:
+            flash(
+                f"El objeto ya está reservado del {error.reserva.fecha_inicio:%d/%m/%Y} "
+                f"al {error.reserva.fecha_fin:%d/%m/%Y}. Elige otras fechas.",
+                "error",
+            )
+            return render_template("reservas/crear.html", form=form, objeto=objeto), 409
+        except ReservaEnConflicto:
+            flash("Otras personas están reservando este objeto ahora mismo. Inténtalo de nuevo.", "warning")
+            return render_template("reservas/crear.html", form=form, objeto=objeto), 409
 
         flash("¡Solicitud de reserva enviada! Espera a que el propietario la acepte para proceder al pago.", "info")
         return redirect(url_for("reservas.listar_reservas"))
@@ -70,6 +113,33 @@ def crear_reserva(id_objeto):
     return render_template("reservas/crear.html", form=form, objeto=objeto)
 
 
+# -----------------------------
+# Días ocupados de un objeto (calendario del formulario)
+# -----------------------------
+@reservas_bp.route("/disponibilidad/<int:id_objeto>")
+def disponibilidad_objeto(id_objeto):
+    mes = request.args.get("mes") or date.today().strftime("%Y-%m")
+    try:
+        mes = datetime.strptime(mes, "%Y-%m").date()
+    except ValueError:
+        return jsonify({"error": "El mes debe tener el formato AAAA-MM"}), 400
+
+    # Objeto.version cambia con cada reserva del objeto: es la clave de la
+    # cache y del ETag, así que una consulta por clave primaria basta para el 304
+    sello = (
+        Objeto.query.with_entities(Objeto.version, Objeto.fecha_actualizacion)
+        .filter_by(id_objeto=id_objeto)
+        .first_or_404()
+    )
+
+    def generar():
+        return jsonify(ocupacion_del_mes(id_objeto, sello.version, mes.year, mes.month))
+
+    return responder_condicional(
+        f"disponibilidad-{id_objeto}-{sello.version}-{mes:%Y-%m}", sello.fecha_actualizacion, generar
+    )
+
+
 @reservas_bp.route("/<int:id>/cancelar")
 @login_required
 def cancelar_reserva(id):
@@ -85,11 +155,7 @@ def cancelar_reserva(id):
         flash("Solo puedes cancelar reservas pendientes o activas", "warning")
         return redirect(url_for("reservas.listar_reservas"))
 
-    # Liberar el objeto
-    objeto = Objeto.query.get(reserva.id_objeto)
-    objeto.estado = "Disponible"
-
-    # Cambiar estado de la reserva
+    # Cambiar estado de la reserva (sus fechas quedan libres)
     reserva.estado = "Cancelada"
 
     db.session.commit()
@@ -129,6 +195,61 @@ def gestionar_reservas():
     return render_template("reservas/gestionar.html", reservas=reservas)
 
 
+@reservas_bp.route("/gestionar/lote", methods=["POST"])
+@login_required
+def resolver_en_lote():
+    """
+    Acepta o rechaza varias solicitudes a la vez. Recibe "ids" y "accion"
+    ("aceptar" o "rechazar") como formulario (gestionar.html) o JSON; en
+    JSON responde el resultado de cada id.
+    """
+    if request.is_json:
+        # Solo {"ids": [enteros], "accion": "..."}; cualquier otra forma es un 400
+        datos = request.get_json(silent=True)
+        datos = datos if isinstance(datos, dict) else {}
+        ids, accion = datos.get("ids"), datos.get("accion")
+        if not isinstance(ids, list) or not all(type(i) is int for i in ids):
+            ids = None
+        if not isinstance(accion, str):
+            accion = None
+    else:
+        accion = request.form.get("accion")
+        try:
+            ids = [int(i) for i in request.form.getlist("ids")]
+        except ValueError:
+            ids = None
+    error = None
+    if not _csrf_valido():
+        error, estado = "La página caducó; vuelve a cargarla e inténtalo de nuevo.", 400
+    elif current_user.id_rol != 3:  # Solo propietarios
+        error, estado = "Acceso no autorizado.", 403
+    elif accion not in DECISIONES or not ids:
+        error, estado = "Indica la acción y al menos una reserva.", 400
+    elif len(ids) > LOTE_MAXIMO:
+        error, estado = f"Como máximo {LOTE_MAXIMO} reservas por vez.", 400
+
+    if error:
+        if request.is_json:
+            return jsonify({"ok": False, "msg": error}), estado
+        flash(error, "danger" if estado == 403 else "warning")
+        return redirect(url_for("reservas.gestionar_reservas"))
+
+    resultados = resolver_solicitudes(current_user.id_usuario, ids, accion)
+    resueltas = sum(r.ok for r in resultados)
+    mensaje = "{} de {} solicitudes {}.".format(
+        resueltas, len(resultados), "aceptadas" if accion == "aceptar" else "rechazadas"
+    )
+
+    if request.is_json:
+        return jsonify({
+            "ok": resueltas == len(resultados),
+            "msg": mensaje,
+            "resultados": [r._asdict() for r in resultados],
+        })
+    flash(mensaje, "success" if resueltas == len(resultados) else "warning")
+    return redirect(url_for("reservas.gestionar_reservas"))
+
+
 @reservas_bp.route("/aprobar/<int:id>")
 @login_required
 def aprobar_reserva(id):
@@ -156,9 +277,8 @@ def rechazar_reserva(id):
         flash("No tienes permiso para rechazar esta reserva.", "error")
         return redirect(url_for("reservas.gestionar_reservas"))
 
-    reserva.estado = "Rechazada"
-    objeto.estado = "Disponible"  # Liberar el objeto
+    reserva.estado = "Rechazada"  # Sus fechas quedan libres
     db.session.commit()
 
-    flash("Reserva rechazada y objeto liberado.", "success")
+    flash("Reserva rechazada y fechas liberadas.", "success")
     return redirect(url_for("reservas.gestionar_reservas"))
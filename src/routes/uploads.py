@@ -0,0 +1,78 @@
+import os
+from flask import Blueprint, Response, abort, current_app, request
+from werkzeug.utils import send_file
+from src.services.almacenamiento import (
+    HUELLA,
+    AlmacenamientoLocal,
+    almacenamiento,
+    tipo_de,
+)
+from src.services.imagenes import url_upload
+
+uploads_bp = Blueprint("uploads", __name__)
+uploads_bp.add_app_template_global(url_upload)
+
+# Un año: el máximo que respetan navegadores y CDNs
+UN_ANIO = 365 * 24 * 3600
+
+
+# -----------------------------
+# Imágenes subidas
+# -----------------------------
+@uploads_bp.route("/<path:archivo>")
+def servir_upload(archivo):
+    """
+    Sirve un archivo subido. Los guardados por contenido se cachean un año
+    como immutable; el resto (nombres anteriores, avatares) UPLOADS_MAX_AGE
+    segundos y se revalida con ETag / Last-Modified.
+
+    En disco local, con UPLOADS_SENDFILE = "x-accel" (nginx) o "x-sendfile"
+    (Apache, lighttpd) el worker solo responde las cabeceras y el proxy
+    envía el archivo; si no, lo envía Flask (con Range y peticiones
+    condicionales). Con otros almacenamientos (S3 sin URL pública, memoria)
+    los bytes se leen de ahí.
+    """
+    almacen = almacenamiento()
+    inmutable = HUELLA.match(archivo) is not None
+    max_age = UN_ANIO if inmutable else current_app.config["UPLOADS_MAX_AGE"]
+
+    if isinstance(almacen, AlmacenamientoLocal):
+        respuesta = _enviar_local(almacen, archivo, max_age)
+    else:
+        try:
+            datos = almacen.leer(archivo)
+        except FileNotFoundError:
+            abort(404)
+        respuesta = Response(datos, mimetype=tipo_de(archivo))
+        respuesta.add_etag()
+        respuesta.make_conditional(request, accept_ranges=True, complete_length=len(datos))
+
+    respuesta.cache_control.public = True
+    respuesta.cache_control.max_age = max_age
+    if inmutable:
+        respuesta.cache_control.immutable = True
+    return respuesta
+
+
+def _enviar_local(almacen, archivo, max_age):
+    ruta = almacen.ruta_local(archivo)
+    if ruta is None or not os.path.isfile(ruta):
+        abort(404)
+
+    modo = current_app.config["UPLOADS_SENDFILE"]
+    if modo == "x-accel":
+        # nginx resuelve Range y las condicionales con su location interna
+        respuesta = Response(mimetype=tipo_de(archivo))
+        respuesta.headers["X-Accel-Redirect"] = (
+            current_app.config["UPLOADS_ACCEL_PREFIJO"].rstrip("/") + "/" + archivo
+        )
+        return respuesta
+
+    return send_file(
+        ruta,
+        request.environ,
+        use_x_sendfile=modo == "x-sendfile",
+        conditional=True,
+        max_age=max_age,
+        response_class=current_app.response_class,
+    )
@@ -0,0 +1,284 @@
+import mimetypes
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from flask import current_app, url_for
+from werkzeug.security import safe_join
+
+# Archivos guardados por contenido ("ab/cd/<sha256>.jpg" y sus variantes
+# "_640.webp"): el contenido de esa ruta no cambia nunca
+HUELLA = re.compile(r"^[0-9a-f]{2}/[0-9a-f]{2}/(?P<hash>[0-9a-f]{64})(_\d+)?\.[a-z0-9]+$")
+
+# Cabecera de cache de los archivos que no cambian nunca
+CACHE_INMUTABLE = "public, max-age=31536000, immutable"
+
+# Un archivo al listar el almacenamiento (modificado: timestamp Unix)
+Archivo = namedtuple("Archivo", "nombre tamano modificado")
+
+
+def tipo_de(nombre):
+    """Content-Type según la extensión."""
+    return mimetypes.guess_type(nombre)[0] or "application/octet-stream"
+
+
+# -----------------------------
+# Interfaz
+# -----------------------------
+class Almacenamiento:
+    """
+    Dónde viven los archivos subidos. Los nombres son rutas relativas con
+    "/" ("ab/cd/<sha256>.jpg", "avatars/x.png"), las mismas que se guardan
+    en ImagenObjeto.nombre_archivo.
+    """
+
+    def carpeta_temporal(self):
+        """Carpeta local donde se reciben las subidas antes de guardarlas."""
+        return tempfile.gettempdir()
+
+    def guardar(self, nombre, temporal):
+        """Guarda el archivo local `temporal` como `nombre` (y lo consume)."""
+        raise NotImplementedError
+
+    def guardar_bytes(self, nombre, datos):
+        raise NotImplementedError
+
+    def leer(self, nombre):
+        """Bytes del archivo; FileNotFoundError si no existe."""
+        raise NotImplementedError
+
+    def existe(self, nombre):
+        raise NotImplementedError
+
+    def borrar(self, nombre):
+        """Borra el archivo; no falla si ya no existe."""
+        raise NotImplementedError
+
+    def listar(self):
+        """Genera un Archivo por cada archivo guardado, sin cargarlos todos."""
+        raise NotImplementedError
+
+    def ruta_local(self, nombre):
+        """Ruta en este disco (None si el almacenamiento no es local)."""
+        return None
+
+    def url(self, nombre):
+        """URL pública; por defecto la sirve uploads.servir_upload."""
+        return url_for("uploads.servir_upload", archivo=nombre)
+
+
+# -----------------------------
+# Disco local (UPLOAD_FOLDER)
+# -----------------------------
+class AlmacenamientoLocal(Almacenamiento):
+    def __init__(self, carpeta):
+        self.carpeta = carpeta
+
+    def carpeta_temporal(self):
+        # En la misma carpeta: guardar() es un os.replace, sin copiar
+        os.makedirs(self.carpeta, exist_ok=True)
+        return self.carpeta
+
+    def ruta_local(self, nombre):
+        return safe_join(self.carpeta, nombre)
+
+    def _destino(self, nombre):
+        destino = self.ruta_local(nombre)
+        if destino is None:
+            raise ValueError(f"Nombre de archivo no válido: {nombre}")
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        return destino
+
+    def guardar(self, nombre, temporal):
+        os.replace(temporal, self._destino(nombre))
+
+    def guardar_bytes(self, nombre, datos):
+        # Temporal + os.replace: nadie lee nunca un archivo a medio escribir
+        destino = self._destino(nombre)
+        descriptor, temporal = tempfile.mkstemp(dir=os.path.dirname(destino), prefix=".subida-")
+        try:
+            with os.fdopen(descriptor, "wb") as archivo:
+                archivo.write(datos)
+            os.replace(temporal, destino)
+        except BaseException:
+            os.unlink(temporal)
+            raise
+
+    def leer(self, nombre):
+        ruta = self.ruta_local(nombre)
+        if ruta is None:
+            raise FileNotFoundError(nombre)
+        with open(ruta, "rb") as archivo:
+            return archivo.read()
+
+    def existe(self, nombre):
+        ruta = self.ruta_local(nombre)
+        return ruta is not None and os.path.isfile(ruta)
+
+    def borrar(self, nombre):
+        ruta = self.ruta_local(nombre)
+        try:
+            if ruta is not None:
+                os.remove(ruta)
+        except FileNotFoundError:
+            pass
+
+    def listar(self):
+        # os.scandir directorio a directorio: nunca la carpeta entera en memoria
+        pendientes = [""]
+        while pendientes:
+            relativa = pendientes.pop()
+            try:
+                entradas = os.scandir(os.path.join(self.carpeta, relativa))
+            except FileNotFoundError:
+                continue
+            with entradas:
+                for entrada in entradas:
+                    nombre = f"{relativa}/{entrada.name}" if relativa else entrada.name
+                    if entrada.is_dir(follow_symlinks=False):
+                        pendientes.append(nombre)
+                    elif entrada.is_file(follow_symlinks=False):
+                        estado = entrada.stat(follow_symlinks=False)
+                        yield Archivo(nombre, estado.st_size, estado.st_mtime)
+
+
+# -----------------------------
+# Memoria (pruebas)
+# -----------------------------
+class AlmacenamientoMemoria(Almacenamiento):
+    """Archivos en un dict del proceso: solo para pruebas y desarrollo."""
+
+    def __init__(self):
+        self.archivos = {}  # nombre -> (bytes, modificado)
+        self._lock = threading.Lock()
+
+    def guardar(self, nombre, temporal):
+        with open(temporal, "rb") as archivo:
+            self.guardar_bytes(nombre, archivo.read())
+        os.unlink(temporal)
+
+    def guardar_bytes(self, nombre, datos):
+        with self._lock:
+            self.archivos[nombre] = (bytes(datos), time.time())
+
+    def leer(self, nombre):
+        try:
+            return self.archivos[nombre][0]
+        except KeyError:
+            raise FileNotFoundError(nombre)
+
+    def existe(self, nombre):
+        return nombre in self.archivos
+
+    def borrar(self, nombre):
+        with self._lock:
+            self.archivos.pop(nombre, None)
+
+    def listar(self):
+        with self._lock:
+            copia = list(self.archivos.items())
+        for nombre, (datos, modificado) in copia:
+            yield Archivo(nombre, len(datos), modificado)
+
+
+# -----------------------------
+# S3 y compatibles (MinIO, R2, Spaces...)
+# -----------------------------
+class AlmacenamientoS3(Almacenamiento):
+    """
+    Archivos en un bucket. `cliente` es un cliente de boto3 (o cualquier
+    objeto con put_object, get_object, delete_object y list_objects_v2).
+    Con `url_publica` (bucket público o CDN delante) las plantillas enlazan
+    directo ahí; si no, las imágenes pasan por uploads.servir_upload.
+    """
+
+    def __init__(self, cliente, bucket, prefijo="", url_publica=None):
+        self.cliente = cliente
+        self.bucket = bucket
+        self.prefijo = prefijo
+        self.url_publica = url_publica.rstrip("/") if url_publica else None
+
+    def guardar(self, nombre, temporal):
+        with open(temporal, "rb") as archivo:
+            self._subir(nombre, archivo)
+        os.unlink(temporal)
+
+    def guardar_bytes(self, nombre, datos):
+        self._subir(nombre, datos)
+
+    def _subir(self, nombre, cuerpo):
+        extra = {"CacheControl": CACHE_INMUTABLE} if HUELLA.match(nombre) else {}
+        self.cliente.put_object(
+            Bucket=self.bucket,
+            Key=self.prefijo + nombre,
+            Body=cuerpo,
+            ContentType=tipo_de(nombre),
+            **extra,
+        )
+
+    def leer(self, nombre):
+        try:
+            respuesta = self.cliente.get_object(Bucket=self.bucket, Key=self.prefijo + nombre)
+        except self.cliente.exceptions.NoSuchKey:
+            raise FileNotFoundError(nombre)
+        return respuesta["Body"].read()
+
+    def existe(self, nombre):
+        clave = self.prefijo + nombre
+        respuesta = self.cliente.list_objects_v2(Bucket=self.bucket, Prefix=clave, MaxKeys=1)
+        return any(o["Key"] == clave for o in respuesta.get("Contents", []))
+
+    def borrar(self, nombre):
+        # DeleteObject no falla si la clave no existe
+        self.cliente.delete_object(Bucket=self.bucket, Key=self.prefijo + nombre)
+
+    def listar(self):
+        # Páginas de hasta 1000 claves (el máximo de ListObjectsV2)
+        argumentos = {"Bucket": self.bucket, "Prefix": self.prefijo}
+        while True:
+            pagina = self.cliente.list_objects_v2(**argumentos)
+            for objeto in pagina.get("Contents", []):
+                yield Archivo(
+                    objeto["Key"][len(self.prefijo):],
+                    objeto["Size"],
+                    objeto["LastModified"].timestamp(),
+                )
+            if not pagina.get("IsTruncated"):
+                return
+            argumentos["ContinuationToken"] = pagina["NextContinuationToken"]
+
+    def url(self, nombre):
+        if self.url_publica:
+            return f"{self.url_publica}/{self.prefijo}{nombre}"
+        return super().url(nombre)
+
+
+# -----------------------------
+# Almacenamiento de la app
+# -----------------------------
+def crear_almacenamiento(app):
+    """Almacenamiento según ALMACENAMIENTO: "local" (por defecto), "s3" o "memoria"."""
+    tipo = app.config["ALMACENAMIENTO"]
+    if tipo == "memoria":
+        return AlmacenamientoMemoria()
+    if tipo == "s3":
+        import boto3  # solo hace falta con ALMACENAMIENTO=s3
+
+        cliente = boto3.client("s3", endpoint_url=app.config["S3_ENDPOINT_URL"] or None)
+        return AlmacenamientoS3(
+            cliente,
+            app.config["S3_BUCKET"],
+            app.config["S3_PREFIJO"],
+            app.config["S3_URL_PUBLICA"] or None,
+        )
+    return AlmacenamientoLocal(os.path.join(app.root_path, app.config["UPLOAD_FOLDER"]))
+
+
+def almacenamiento():
+    """Almacenamiento de la app actual (se crea en el primer uso)."""
+    extensiones = current_app.extensions
+    if "rentflow_almacenamiento" not in extensiones:
+        extensiones["rentflow_almacenamiento"] = crear_almacenamiento(current_app)
+    return extensiones["rentflow_almacenamiento"]
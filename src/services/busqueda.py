@@ -0,0 +1,156 @@
+import re
+from sqlalchemy import event, func, or_, select, literal, literal_column, text
+from sqlalchemy import Table, Column, Integer, Float, MetaData
+from models.objeto import Objeto
+
+# Configuración de texto en PostgreSQL: español con stemming y sin acentos
+CONFIG_PG = "rentflow_es"
+
+# Peso del nombre frente a la descripción al ordenar por relevancia
+PESO_NOMBRE = 10.0
+PESO_DESCRIPCION = 1.0
+
+# Tabla FTS5 de SQLite. Vive fuera de db.metadata para que create_all/drop_all
+# no la traten como una tabla normal; se crea junto a "objeto" (ver abajo).
+objeto_fts = Table(
+    "objeto_fts",
+    MetaData(),
+    Column("rowid", Integer),
+)
+
+DDL_SQLITE = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS objeto_fts USING fts5(
+        nombre, descripcion,
+        content='objeto', content_rowid='id_objeto',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS objeto_fts_ai AFTER INSERT ON objeto BEGIN
+        INSERT INTO objeto_fts(rowid, nombre, descripcion)
+        VALUES (new.id_objeto, new.nombre, new.descripcion);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS objeto_fts_ad AFTER DELETE ON objeto BEGIN
+        INSERT INTO objeto_fts(objeto_fts, rowid, nombre, descripcion)
+        VALUES ('delete', old.id_objeto, old.nombre, old.descripcion);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS objeto_fts_au AFTER UPDATE OF nombre, descripcion ON objeto BEGIN
+        INSERT INTO objeto_fts(objeto_fts, rowid, nombre, descripcion)
+        VALUES ('delete', old.id_objeto, old.nombre, old.descripcion);
+        INSERT INTO objeto_fts(rowid, nombre, descripcion)
+        VALUES (new.id_objeto, new.nombre, new.descripcion);
+    END
+    """,
+    "INSERT INTO objeto_fts(objeto_fts) VALUES ('rebuild')",
+]
+
+DDL_POSTGRESQL = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    f"""
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = '{CONFIG_PG}') THEN
+            CREATE TEXT SEARCH CONFIGURATION {CONFIG_PG} (COPY = spanish);
+            ALTER TEXT SEARCH CONFIGURATION {CONFIG_PG}
+                ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem;
+        END IF;
+    END
+    $$
+    """,
+    f"""
+    ALTER TABLE objeto ADD COLUMN IF NOT EXISTS busqueda_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{CONFIG_PG}', coalesce(nombre, '')), 'A') ||
+        setweight(to_tsvector('{CONFIG_PG}', coalesce(descripcion, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_objeto_busqueda_vector ON objeto USING gin (busqueda_vector)",
+]
+
+
+# -----------------------------
+# Creación del índice junto a la tabla objeto
+# -----------------------------
+def crear_indice_busqueda(target, connection, **kw):
+    """Crea la estructura de búsqueda del motor en uso (create_all y migraciones)."""
+    sentencias = {
+        "sqlite": DDL_SQLITE,
+        "postgresql": DDL_POSTGRESQL,
+    }.get(connection.dialect.name, [])
+
+    for sentencia in sentencias:
+        connection.execute(text(sentencia))
+
+
+def eliminar_indice_busqueda(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        connection.execute(text("DROP TABLE IF EXISTS objeto_fts"))
+
+
+event.listen(Objeto.__table__, "after_create", crear_indice_busqueda)
+event.listen(Objeto.__table__, "before_drop", eliminar_indice_busqueda)
+
+
+# -----------------------------
+# Consulta
+# -----------------------------
+def terminos(busqueda):
+    """Palabras del texto buscado, sin signos ni operadores."""
+    return re.findall(r"\w+", busqueda or "")
+
+
+def aplicar_busqueda(query, busqueda, dialecto):
+    """
+    Restringe la consulta de objetos al texto buscado.
+
+    Devuelve (query, rango): rango es una expresión "mayor es mejor" para
+    ordenar por relevancia.
+    """
+    palabras = terminos(busqueda)
+
+    if dialecto == "postgresql":
+        # Igual que en SQLite: todas las palabras, cada una como prefijo
+        # ("tala" encuentra "taladro"); terminos() ya quitó los operadores
+        consulta = func.to_tsquery(CONFIG_PG, " & ".join(f"{p}:*" for p in palabras))
+        vector = literal_column("objeto.busqueda_vector")
+        query = query.filter(vector.op("@@")(consulta))
+        return query, func.ts_rank_cd(vector, consulta, type_=Float)
+
+    if dialecto == "sqlite":
+        # Cada palabra como prefijo: "tala" encuentra "taladro" y "taladros"
+        expresion = " ".join(f'"{p}"*' for p in palabras)
+        coincidencias = (
+            select(
+                objeto_fts.c.rowid.label("id_objeto"),
+                (
+                    -func.bm25(
+                        literal_column("objeto_fts"),
+                        PESO_NOMBRE,
+                        PESO_DESCRIPCION,
+                        type_=Float,
+                    )
+                ).label("rango"),
+            )
+            .where(literal_column("objeto_fts").op("MATCH")(expresion))
+            .subquery()
+        )
+        query = query.join(
+            coincidencias, coincidencias.c.id_objeto == Objeto.id_objeto
+        )
+        return query, coincidencias.c.rango
+
+    # Otros motores: sin índice, pero al menos nombre y descripción
+    for palabra in palabras:
+        query = query.filter(
+            or_(
+                Objeto.nombre.ilike(f"%{palabra}%"),
+                Objeto.descripcion.ilike(f"%{palabra}%"),
+            )
+        )
+    return query, literal(0.0, Float)
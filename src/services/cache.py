@@ -0,0 +1,207 @@
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, has_app_context
+from sqlalchemy import event, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from extensions import db
+from models.version_cache import VersionCache
+
+# Claves pendientes de descartar localmente cuando la transacción se confirme
+_OBSOLETAS = "rentflow_cache_obsoletas"
+
+# Claves cuya versión se escribe al confirmar la transacción
+_PENDIENTES = "rentflow_cache_pendientes"
+
+# Motores con INSERT ... ON CONFLICT DO UPDATE
+_INSERT_O_ACTUALIZAR = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+# -----------------------------
+# Versiones compartidas entre workers
+# -----------------------------
+def version_actual(clave):
+    """Versión de `clave` en la base de datos (0 si nunca se invalidó)."""
+    version = (
+        db.session.query(VersionCache.version)
+        .filter(VersionCache.clave == clave)
+        .scalar()
+    )
+    return version or 0
+
+
+def columna_version(clave):
+    """version_actual como subconsulta, para leerla en la misma consulta que otros datos."""
+    return func.coalesce(
+        select(VersionCache.version).where(VersionCache.clave == clave).scalar_subquery(), 0
+    )
+
+
+def incrementar_version(clave, session=None):
+    """
+    Marca como obsoletas las copias de `clave` en todos los workers. Se
+    anota en la transacción en curso y se escribe al confirmarla (ver
+    _escribir_versiones): solo tiene efecto si se confirma, y en ese
+    momento este worker descarta también su copia local.
+    """
+    session = session or db.session
+    session.info.setdefault(_PENDIENTES, set()).add(clave)
+    session.info.setdefault(_OBSOLETAS, set()).add(clave)
+
+
+def _escribir_version(conexion, clave):
+    tabla = VersionCache.__table__
+    insertar = _INSERT_O_ACTUALIZAR.get(conexion.dialect.name)
+    if insertar:
+        # Una sola sentencia: la primera vez crea la fila sin chocar con otra
+        # transacción que haga lo mismo
+        conexion.execute(
+            insertar(tabla)
+            .values(clave=clave, version=1)
+            .on_conflict_do_update(
+                index_elements=[tabla.c.clave], set_={"version": tabla.c.version + 1}
+            )
+        )
+        return
+
+    resultado = conexion.execute(
+        update(tabla).where(tabla.c.clave == clave).values(version=tabla.c.version + 1)
+    )
+    if not resultado.rowcount:
+        conexion.execute(tabla.insert().values(clave=clave, version=1))
+
+
+@event.listens_for(Session, "before_commit")
+def _escribir_versiones(session):
+    """
+    Escribe las versiones anotadas después del último flush y por orden de
+    clave. Así toda transacción bloquea las filas de version_cache al final,
+    después de las de objeto, reserva..., y siempre en el mismo orden: dos
+    transacciones no pueden esperarse la una a la otra.
+    """
+    # El flush puede anotar más claves (listeners before_flush)
+    session.flush()
+    claves = session.info.pop(_PENDIENTES, None)
+    if not claves:
+        return
+    conexion = session.connection()
+    for clave in sorted(claves):
+        _escribir_version(conexion, clave)
+
+
+@event.listens_for(Session, "after_commit")
+def _descartar_confirmadas(session):
+    claves = session.info.pop(_OBSOLETAS, None)
+    if not claves or not has_app_context():
+        return
+    for cache in current_app.extensions.get("rentflow_cache", {}).values():
+        if cache.clave in claves:
+            cache.descartar()
+
+
+@event.listens_for(Session, "after_rollback")
+def _olvidar_revertidas(session):
+    session.info.pop(_PENDIENTES, None)
+    session.info.pop(_OBSOLETAS, None)
+
+
+# -----------------------------
+# Cache del proceso
+# -----------------------------
+class CacheVersionada:
+    """
+    Valores calculados una vez por worker y reutilizados entre peticiones.
+
+    Como mucho cada CACHE_VERIFICAR_CADA segundos se compara su versión con
+    la de la base de datos (una lectura por clave primaria) y, si otro worker
+    la incrementó, se descartan todas las entradas. Cada combinación de
+    argumentos de `obtener` es una entrada; se guardan como mucho `maximo`
+    (las menos usadas salen primero). Con `ttl` cada entrada además caduca
+    pasados esos segundos aunque la versión no cambie.
+    """
+
+    def __init__(self, clave, cargar, ttl=None, maximo=1):
+        self.clave = clave
+        self.ttl = ttl
+        self.maximo = maximo
+        self._cargar = cargar
+        self._entradas = OrderedDict()  # argumentos -> (valor, cargado_en)
+        self._cargando = {}  # argumentos -> Event de la carga en curso
+        self._version = None
+        self._generacion = 0  # cambia al descartar: cargas en curso no se guardan
+        self._verificado_en = 0.0
+        # Solo protege los diccionarios: nunca se consulta la base con él tomado
+        self._lock = threading.Lock()
+
+    def _verificar_version(self, ahora):
+        intervalo = current_app.config["CACHE_VERIFICAR_CADA"]
+        with self._lock:
+            if self._version is not None and ahora - self._verificado_en < intervalo:
+                return
+            # Las demás peticiones siguen con lo que hay mientras esta verifica
+            self._verificado_en = ahora
+
+        version = version_actual(self.clave)
+        with self._lock:
+            if version != self._version:
+                self._entradas.clear()
+                self._generacion += 1
+                self._version = version
+
+    def obtener(self, *argumentos):
+        ahora = time.monotonic()
+        self._verificar_version(ahora)
+
+        with self._lock:
+            entrada = self._entradas.get(argumentos)
+            if entrada and (self.ttl is None or ahora - entrada[1] < self.ttl):
+                self._entradas.move_to_end(argumentos)
+                return entrada[0]
+
+            # Una sola carga por entrada: las demás peticiones de los mismos
+            # argumentos la esperan; las de otros argumentos no se enteran
+            carga = self._cargando.get(argumentos)
+            propia = carga is None
+            if propia:
+                carga = self._cargando[argumentos] = threading.Event()
+            generacion = self._generacion
+
+        if not propia:
+            carga.wait()
+            with self._lock:
+                entrada = self._entradas.get(argumentos)
+            # Sin entrada si la carga falló o se descartó entre medias
+            return entrada[0] if entrada else self._cargar(*argumentos)
+
+        try:
+            valor = self._cargar(*argumentos)
+            with self._lock:
+                if generacion == self._generacion:
+                    self._entradas[argumentos] = (valor, ahora)
+                    self._entradas.move_to_end(argumentos)
+                    while len(self._entradas) > self.maximo:
+                        self._entradas.popitem(last=False)
+            return valor
+        finally:
+            with self._lock:
+                self._cargando.pop(argumentos, None)
+            carga.set()
+
+    def descartar(self):
+        """Olvida las copias locales; la próxima lectura vuelve a cargar."""
+        with self._lock:
+            self._entradas.clear()
+            self._generacion += 1
+            self._version = None
+
+
+def cache_de_aplicacion(nombre, cargar, clave=None, ttl=None, maximo=1):
+    """
+    CacheVersionada `nombre` de la aplicación actual (una por app). Varias
+    caches pueden compartir la misma `clave` de versión.
+    """
+    caches = current_app.extensions.setdefault("rentflow_cache", {})
+    if nombre not in caches:
+        caches[nombre] = CacheVersionada(clave or nombre, cargar, ttl, maximo)
+    return caches[nombre]
@@ -0,0 +1,254 @@
+import base64
+import binascii
+import itertools
+import json
+from collections import namedtuple
+from datetime import date
+from sqlalchemy import Date, case, event, func, literal_column, select, tuple_
+from sqlalchemy.orm import Session, joinedload
+from extensions import db
+from models.imagen_objeto import ImagenObjeto
+from models.objeto import Objeto
+from models.usuario import Usuario
+from src.services.busqueda import aplicar_busqueda, terminos
+from src.services.cache import cache_de_aplicacion, incrementar_version, version_actual
+from src.services.disponibilidad import CLAVE_RESERVAS, libre_entre
+from src.services.sugerencias import normalizar
+from src.services.versiones import cambia_lo_mostrado
+
+
+# Columnas de orden del catálogo (la última debe ser única) y su sentido
+Orden = namedtuple("Orden", "columnas descendente")
+
+
+# Órdenes disponibles en el catálogo (parámetro "orden" de la URL)
+ORDEN_RECIENTES = Orden((Objeto.fecha_publicacion, Objeto.id_objeto), True)
+ORDENES = {
+    "recientes": ORDEN_RECIENTES,
+    "precio_asc": Orden((Objeto.precio, Objeto.id_objeto), False),
+    "precio_desc": Orden((Objeto.precio, Objeto.id_objeto), True),
+    "calificacion": Orden((Objeto.promedio_calificacion, Objeto.id_objeto), True),
+}
+
+# Versión compartida de todo lo que se cachea a partir del catálogo público
+CLAVE_CATALOGO = "catalogo"
+
+# Tramos de precio de los filtros: (desde, hasta), "hasta" no incluido
+TRAMOS_PRECIO = ((0, 500), (500, 1000), (1000, 2000), (2000, None))
+
+# Búsquedas distintas cuyas facetas se guardan en cada worker
+FACETAS_EN_CACHE = 256
+
+
+# -----------------------------
+# Consulta base del catálogo
+# -----------------------------
+def consulta_catalogo(
+    categoria_id=None, busqueda="", precio_min=None, precio_max=None, orden=None, desde=None, hasta=None
+):
+    """
+    Objetos publicados y disponibles, con los filtros del buscador.
+
+    Devuelve (query, orden). `orden` es una clave de ORDENES; sin ella el
+    orden es por relevancia si hay texto buscado y por fecha si no.
+    """
+    query = Objeto.query.options(
+        # Propietario de cada tarjeta en la misma consulta (solo lo que se muestra)
+        joinedload(Objeto.usuario).load_only(
+            Usuario.id_usuario, Usuario.nombre, Usuario.direccion
+        )
+    )
+    return filtrar_catalogo(query, categoria_id, busqueda, precio_min, precio_max, orden, desde, hasta)
+
+
+def filtrar_catalogo(
+    consulta, categoria_id=None, busqueda="", precio_min=None, precio_max=None, orden=None, desde=None, hasta=None
+):
+    """
+    Aplica los filtros del catálogo a una consulta sobre objeto, sea una
+    Query del ORM o un select() de Core. Devuelve (consulta, orden).
+    Con `desde` y `hasta` solo quedan los objetos libres en esas fechas.
+    """
+    consulta = consulta.filter(Objeto.estado == "Disponible", Objeto.publicado == True)  # noqa: E712
+    elegido = ORDENES.get(orden, ORDEN_RECIENTES)
+
+    # Filtro por categoría
+    if categoria_id:
+        consulta = consulta.filter(Objeto.id_categoria == categoria_id)
+
+    # Rango de precio (ambos extremos incluidos)
+    if precio_min is not None:
+        consulta = consulta.filter(Objeto.precio >= precio_min)
+    if precio_max is not None:
+        consulta = consulta.filter(Objeto.precio <= precio_max)
+
+    # Libres en las fechas pedidas (ambas incluidas)
+    if desde and hasta:
+        consulta = consulta.filter(libre_entre(desde, hasta))
+
+    # Búsqueda de texto completo en nombre y descripción
+    if terminos(busqueda):
+        consulta, rango = aplicar_busqueda(consulta, busqueda, db.engine.dialect.name)
+        if orden not in ORDENES:
+            elegido = Orden((rango, Objeto.id_objeto), True)
+
+    return consulta, elegido
+
+
+# -----------------------------
+# Cursores (paginación keyset)
+# -----------------------------
+def codificar_cursor(valores):
+    """Cursor opaco con los valores de orden de la última fila de la página."""
+    valores = [v.isoformat() if isinstance(v, date) else v for v in valores]
+    crudo = json.dumps(valores, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(crudo.encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor, orden):
+    """Devuelve los valores del cursor con el tipo de cada columna de orden, o None."""
+    if not cursor:
+        return None
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        if not isinstance(valores, list) or len(valores) != len(orden.columnas):
+            return None
+        return tuple(
+            date.fromisoformat(v) if isinstance(c.type, Date) else c.type.python_type(v)
+            for v, c in zip(valores, orden.columnas)
+        )
+    except (ValueError, TypeError, ArithmeticError, NotImplementedError, binascii.Error):
+        return None
+
+
+def consulta_pagina(query, cursor=None, limite=24, orden=ORDEN_RECIENTES):
+    """
+    Consulta de una página (Query del ORM o select() de Core; las columnas
+    de orden se agregan al final de cada fila). Continúa justo después de
+    la última fila de la anterior (sin OFFSET), así que el costo es el mismo
+    en la página 1 y en la 1000. Todas las columnas de `orden` van en el
+    mismo sentido para que un solo índice compuesto sirva la página sin
+    ordenar la tabla.
+    """
+    columnas = orden.columnas
+    posicion = decodificar_cursor(cursor, orden)
+    if posicion:
+        fila = tuple_(*columnas)
+        query = query.filter(fila < posicion if orden.descendente else fila > posicion)
+
+    return (
+        query.add_columns(*columnas)
+        .order_by(*[c.desc() if orden.descendente else c.asc() for c in columnas])
+        .limit(limite + 1)
+    )
+
+
+def paginar(query, cursor=None, limite=24, orden=ORDEN_RECIENTES):
+    """Devuelve (objetos, cursor de la página siguiente o None)."""
+    filas = consulta_pagina(query, cursor, limite, orden).all()
+
+    siguiente = codificar_cursor(filas[limite - 1][1:]) if len(filas) > limite else None
+    return [fila[0] for fila in filas[:limite]], siguiente
+
+
+# -----------------------------
+# Datos de las tarjetas
+# -----------------------------
+def cargar_portadas(objetos):
+    """
+    Primera imagen de cada objeto de la página, en una sola consulta.
+
+    Devuelve {id_objeto: ImagenObjeto}; los objetos sin imágenes no aparecen.
+    """
+    ids = [o.id_objeto for o in objetos]
+    if not ids:
+        return {}
+
+    primeras = (
+        select(func.min(ImagenObjeto.id))
+        .where(ImagenObjeto.objeto_id.in_(ids))
+        .group_by(ImagenObjeto.objeto_id)
+    )
+    imagenes = ImagenObjeto.query.filter(ImagenObjeto.id.in_(primeras)).all()
+    return {img.objeto_id: img for img in imagenes}
+
+
+# -----------------------------
+# Facetas (conteos por categoría y por precio)
+# -----------------------------
+def _contar_facetas(busqueda, desde=None, hasta=None, version_reservas=None):
+    """
+    Una sola consulta agrupada por (categoría, tramo de precio) sobre los
+    resultados de la búsqueda y las fechas, sin los filtros de categoría ni
+    de precio. `version_reservas` solo forma parte de la clave de la cache.
+    """
+    tramo = case(
+        *[(Objeto.precio < hasta, i) for i, (_, hasta) in enumerate(TRAMOS_PRECIO) if hasta],
+        else_=len(TRAMOS_PRECIO) - 1,
+    ).label("tramo")
+    query = (
+        db.session.query(Objeto.id_categoria, tramo, func.count(Objeto.id_objeto))
+        .select_from(Objeto)
+        .filter(Objeto.estado == "Disponible", Objeto.publicado.is_(True))
+    )
+    if desde and hasta:
+        query = query.filter(libre_entre(desde, hasta))
+    if busqueda:
+        query, _ = aplicar_busqueda(query, busqueda, db.engine.dialect.name)
+
+    # Agrupar por el alias: PostgreSQL no reconoce el CASE repetido como la
+    # misma expresión porque cada aparición lleva sus propios parámetros
+    filas = query.group_by(Objeto.id_categoria, literal_column("tramo")).all()
+    return tuple(tuple(fila) for fila in filas)
+
+
+def contar_facetas(busqueda="", categoria_id=None, desde=None, hasta=None):
+    """
+    Conteos para la barra de filtros: cuántos resultados hay en cada
+    categoría y en cada tramo de precio (este último dentro de la categoría
+    elegida). Se cachea por búsqueda normalizada hasta que cambia el catálogo;
+    con fechas, también por fechas y versión de las reservas.
+    """
+    clave = " ".join(normalizar(p) for p in terminos(busqueda))
+    fechas = (desde, hasta, version_actual(CLAVE_RESERVAS)) if desde and hasta else ()
+    celdas = cache_de_aplicacion(
+        "facetas", _contar_facetas, clave=CLAVE_CATALOGO, maximo=FACETAS_EN_CACHE
+    ).obtener(clave, *fechas)
+
+    categoria_id = int(categoria_id) if str(categoria_id or "").isdigit() else None
+    por_categoria, por_tramo = {}, [0] * len(TRAMOS_PRECIO)
+    for id_categoria, tramo, total in celdas:
+        por_categoria[id_categoria] = por_categoria.get(id_categoria, 0) + total
+        if categoria_id is None or id_categoria == categoria_id:
+            por_tramo[tramo] += total
+
+    return {
+        "categorias": por_categoria,
+        "precios": [
+            {"desde": desde, "hasta": hasta, "total": total}
+            for (desde, hasta), total in zip(TRAMOS_PRECIO, por_tramo)
+        ],
+    }
+
+
+# -----------------------------
+# Invalidación de caches del catálogo
+# -----------------------------
+@event.listens_for(Session, "before_flush")
+def _invalidar_catalogo(session, contexto, instancias):
+    """
+    Cualquier alta, baja o cambio de un objeto o de sus imágenes (publicar,
+    eliminar, una reserva que cambia el estado...), o del nombre o la
+    dirección de un usuario (las tarjetas muestran al propietario), invalida
+    las caches del catálogo en la misma transacción.
+    """
+    cambios = itertools.chain(
+        session.new,
+        session.deleted,
+        (o for o in session.dirty if session.is_modified(o)),
+    )
+    if any(isinstance(o, (Objeto, ImagenObjeto)) for o in cambios) or any(
+        isinstance(o, Usuario) and cambia_lo_mostrado(o) for o in session.dirty
+    ):
+        incrementar_version(CLAVE_CATALOGO, session)
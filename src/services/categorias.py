@@ -0,0 +1,28 @@
+from collections import namedtuple
+from extensions import db
+from models.categoria import Categoria
+from src.services.cache import cache_de_aplicacion, incrementar_version
+
+CLAVE_CATEGORIAS = "categorias"
+
+# Copia inmutable de una categoría: se comparte entre peticiones sin sesión
+CategoriaResumen = namedtuple("CategoriaResumen", "id_categoria nombre descripcion")
+
+
+def _cargar_categorias():
+    filas = (
+        db.session.query(Categoria.id_categoria, Categoria.nombre, Categoria.descripcion)
+        .order_by(Categoria.id_categoria)
+        .all()
+    )
+    return tuple(CategoriaResumen(*fila) for fila in filas)
+
+
+def obtener_categorias():
+    """Categorías desde la cache del worker (sin consulta en la mayoría de peticiones)."""
+    return cache_de_aplicacion(CLAVE_CATEGORIAS, _cargar_categorias).obtener()
+
+
+def invalidar_categorias():
+    """Llamar en la misma transacción que cualquier cambio en categoria."""
+    incrementar_version(CLAVE_CATEGORIAS)
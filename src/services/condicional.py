@@ -0,0 +1,42 @@
+import hashlib
+from datetime import timezone
+from flask import current_app, make_response, request, session
+from flask_login import current_user
+
+
+def responder_condicional(etag, modificado, generar):
+    """
+    GET condicional: si el navegador (o la CDN) ya tiene esta versión responde
+    304 sin llamar a `generar`, que solo se ejecuta cuando hace falta el cuerpo.
+
+    El ETag final incluye al usuario, porque la barra de navegación y las
+    acciones disponibles cambian según quién mira la página. If-Modified-Since
+    solo se respeta para visitantes anónimos por el mismo motivo.
+    """
+    # Los mensajes flash se consumen al renderizar: con mensajes pendientes
+    # siempre se genera la página
+    if session.get("_flashes"):
+        return generar()
+
+    usuario = current_user.get_id() if current_user.is_authenticated else "anonimo"
+    etag = hashlib.sha1(f"{etag}|{usuario}".encode()).hexdigest()
+    if modificado is not None:
+        modificado = modificado.replace(microsecond=0, tzinfo=timezone.utc)
+
+    if request.if_none_match:
+        vigente = request.if_none_match.contains_weak(etag)
+    else:
+        vigente = (
+            modificado is not None
+            and not current_user.is_authenticated
+            and request.if_modified_since is not None
+            and modificado <= request.if_modified_since
+        )
+
+    respuesta = current_app.response_class(status=304) if vigente else make_response(generar())
+    respuesta.set_etag(etag, weak=True)
+    if modificado is not None:
+        respuesta.last_modified = modificado
+    respuesta.cache_control.no_cache = True
+    respuesta.vary.add("Cookie")
+    return respuesta
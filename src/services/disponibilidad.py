@@ -0,0 +1,242 @@
+import calendar
+import itertools
+import random
+import time
+from datetime import date, datetime, timedelta
+from sqlalchemy import and_, event, exists, select, update
+from sqlalchemy.orm import Session
+from extensions import db
+from models.objeto import Objeto
+from models.reserva import Reserva
+from src.services.cache import cache_de_aplicacion, incrementar_version
+from src.services.versiones import sellar_objetos
+
+# Estados en los que una reserva ocupa el objeto en sus fechas; las
+# Rechazadas, Canceladas y Finalizadas ya no bloquean a nadie
+ESTADOS_ACTIVOS = ("Pendiente", "Aceptada", "Confirmada", "Activa")
+
+# Veces que se reintenta una reserva cuando otra del mismo objeto se
+# confirmó entre la comprobación de fechas y el commit
+REINTENTOS_RESERVA = 5
+
+# Segundos de espera base entre reintentos; se duplica en cada uno y se
+# elige al azar hasta ese máximo para que las peticiones que chocaron no
+# vuelvan a chocar
+ESPERA_REINTENTO = 0.01
+
+# Versión de todo lo que depende de las fechas ocupadas (catálogo filtrado
+# por fechas); cambia con cada alta, baja o cambio de una reserva
+CLAVE_RESERVAS = "reservas"
+
+# Meses (objeto, versión, mes) de ocupación que se guardan en cada worker
+MESES_EN_CACHE = 1024
+
+
+# -----------------------------
+# Solapamiento de intervalos
+# -----------------------------
+def solapa(desde, hasta):
+    """
+    Condición "la reserva ocupa algún día entre desde y hasta" (ambos
+    extremos incluidos) para una reserva activa.
+
+    fecha_fin >= desde va primero a propósito: con ix_reserva_objeto_fin
+    (id_objeto, fecha_fin) es un rango del índice que empieza en `desde`,
+    así que el historial pasado de un objeto, por largo que sea, no se
+    recorre: solo una búsqueda en el índice más las reservas futuras.
+    """
+    return and_(
+        Reserva.fecha_fin >= desde,
+        Reserva.fecha_inicio <= hasta,
+        Reserva.estado.in_(ESTADOS_ACTIVOS),
+    )
+
+
+def reservas_solapadas(id_objeto, desde, hasta):
+    """Reservas activas del objeto que ocupan algún día del intervalo."""
+    return Reserva.query.filter(Reserva.id_objeto == id_objeto, solapa(desde, hasta))
+
+
+def conflicto(id_objeto, desde, hasta):
+    """Primera reserva activa que choca con el intervalo (None si está libre)."""
+    return reservas_solapadas(id_objeto, desde, hasta).order_by(Reserva.fecha_inicio).first()
+
+
+def esta_disponible(id_objeto, desde, hasta):
+    return conflicto(id_objeto, desde, hasta) is None
+
+
+def libre_entre(desde, hasta):
+    """
+    Condición para consultas sobre objeto: ninguna reserva activa ocupa
+    esas fechas. Es un NOT EXISTS correlacionado (anti-join): por cada
+    objeto candidato, una búsqueda en ix_reserva_objeto_fin que se detiene
+    en la primera reserva que choca, sin traer reservas a Python.
+    """
+    return ~exists().where(Reserva.id_objeto == Objeto.id_objeto, solapa(desde, hasta))
+
+
+# -----------------------------
+# Ocupación por mes (calendarios)
+# -----------------------------
+def _ocupacion_del_mes(id_objeto, version, anio, mes):
+    """
+    Días ocupados del mes en una sola consulta de rango: las reservas
+    activas que lo solapan, recortadas al mes. `version` (Objeto.version)
+    solo forma parte de la clave de la cache.
+    """
+    primero = date(anio, mes, 1)
+    dias = calendar.monthrange(anio, mes)[1]
+    ultimo = primero + timedelta(days=dias - 1)
+
+    intervalos = (
+        reservas_solapadas(id_objeto, primero, ultimo)
+        .with_entities(Reserva.fecha_inicio, Reserva.fecha_fin)
+        .order_by(Reserva.fecha_inicio)
+        .all()
+    )
+
+    ocupados = bytearray(b"0" * dias)
+    for inicio, fin in intervalos:
+        desde, hasta = max(inicio, primero).day, min(fin, ultimo).day
+        ocupados[desde - 1:hasta] = b"1" * (hasta - desde + 1)
+    ocupados = ocupados.decode()
+
+    # Los mismos días como tramos consecutivos [inicio, fin]
+    tramos, dia = [], 0
+    for valor, grupo in itertools.groupby(ocupados):
+        largo = len(list(grupo))
+        if valor == "1":
+            tramos.append([
+                (primero + timedelta(days=dia)).isoformat(),
+                (primero + timedelta(days=dia + largo - 1)).isoformat(),
+            ])
+        dia += largo
+
+    return {"mes": f"{anio:04d}-{mes:02d}", "dias": dias, "ocupados": ocupados, "tramos": tramos}
+
+
+def ocupacion_del_mes(id_objeto, version, anio, mes):
+    """
+    {"mes", "dias", "ocupados": "0011100...", "tramos": [[inicio, fin], ...]}.
+    Se cachea por objeto, versión y mes: cualquier cambio de una reserva del
+    objeto sube Objeto.version y deja atrás las entradas anteriores.
+    """
+    return cache_de_aplicacion(
+        "ocupacion_mensual", _ocupacion_del_mes, maximo=MESES_EN_CACHE
+    ).obtener(id_objeto, version, anio, mes)
+
+
+# -----------------------------
+# Reservar sin carreras
+# -----------------------------
+class FechasOcupadas(Exception):
+    """Otra reserva activa ocupa alguna de las fechas pedidas."""
+
+    def __init__(self, reserva):
+        super().__init__(f"Ocupado del {reserva.fecha_inicio} al {reserva.fecha_fin}")
+        self.reserva = reserva
+
+
+class ReservaEnConflicto(Exception):
+    """El objeto cambió en cada uno de los reintentos (mucha demanda)."""
+
+
+def consulta_version(id_objeto):
+    """
+    Versión actual del objeto. Bloquea su fila hasta el commit (SELECT ...
+    FOR UPDATE) donde el motor lo permite: en PostgreSQL las reservas del
+    mismo objeto esperan aquí en vez de fallar después. SQLite no tiene
+    bloqueo de fila y lo omite; ahí decide _reclamar_objeto.
+    """
+    return select(Objeto.version).where(Objeto.id_objeto == id_objeto).with_for_update()
+
+
+def _reclamar_objeto(id_objeto, version):
+    """
+    Sube Objeto.version solo si sigue siendo `version`. Cualquier reserva
+    nueva o modificada del objeto también la sube (src/services/versiones.py),
+    así que si no afecta a ninguna fila alguien reservó entre medias.
+
+    Con la fila bloqueada (consulta_version) siempre afecta a una; en SQLite
+    el bloqueo de escritura serializa los UPDATE.
+    """
+    resultado = db.session.execute(
+        update(Objeto)
+        .where(Objeto.id_objeto == id_objeto, Objeto.version == version)
+        .values(version=Objeto.version + 1, fecha_actualizacion=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    return resultado.rowcount == 1
+
+
+def _ocupada(id_objeto, desde, hasta):
+    """FechasOcupadas si alguna reserva activa choca (liberando antes el bloqueo)."""
+    ocupada = conflicto(id_objeto, desde, hasta)
+    if ocupada:
+        db.session.rollback()
+        raise FechasOcupadas(ocupada)
+
+
+def reservar(id_objeto, id_usuario, desde, hasta, reintentos=REINTENTOS_RESERVA):
+    """
+    Crea y confirma una reserva Pendiente si las fechas están libres.
+
+    Se lee (y en PostgreSQL se bloquea) la versión del objeto, se comprueban
+    las fechas y se reclama el objeto con un UPDATE condicional en la misma
+    transacción que inserta la reserva. Si otra transacción cambió el objeto
+    entre medias, se deshace y se vuelven a comprobar las fechas: si ahora
+    están ocupadas no se reintenta; si siguen libres se reintenta tras una
+    pausa aleatoria. FechasOcupadas si las fechas chocan; ReservaEnConflicto
+    si se agotan los reintentos.
+    """
+    for intento in range(reintentos):
+        version = db.session.execute(consulta_version(id_objeto)).scalar_one()
+        _ocupada(id_objeto, desde, hasta)
+
+        if _reclamar_objeto(id_objeto, version):
+            reserva = Reserva(
+                fecha_reserva=date.today(),
+                fecha_inicio=desde,
+                fecha_fin=hasta,
+                estado="Pendiente",
+                id_usuario=id_usuario,
+                id_objeto=id_objeto,
+            )
+            db.session.add(reserva)
+            db.session.commit()
+            return reserva
+
+        db.session.rollback()
+        _ocupada(id_objeto, desde, hasta)
+        if intento + 1 < reintentos:
+            time.sleep(random.uniform(0, ESPERA_REINTENTO * 2 ** intento))
+
+    raise ReservaEnConflicto()
+
+
+# -----------------------------
+# Invalidación
+# -----------------------------
+@event.listens_for(Session, "before_flush")
+def _invalidar_reservas(session, contexto, instancias):
+    """Cualquier alta, baja o cambio de una reserva cambia las fechas ocupadas."""
+    cambios = itertools.chain(
+        session.new,
+        session.deleted,
+        (o for o in session.dirty if session.is_modified(o)),
+    )
+    if any(isinstance(o, Reserva) for o in cambios):
+        incrementar_version(CLAVE_RESERVAS, session)
+
+
+def reservas_cambiadas(ids_objeto, session=None):
+    """
+    Llamar en la misma transacción que un UPDATE masivo de reserva: sube
+    Objeto.version de sus objetos y la versión de las fechas ocupadas, lo
+    que el ORM hace solo cuando las reservas cambian de una en una.
+    """
+    session = session or db.session
+    if ids_objeto:
+        sellar_objetos(ids_objeto, session)
+        incrementar_version(CLAVE_RESERVAS, session)
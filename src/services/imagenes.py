@@ -0,0 +1,435 @@
+import base64
+import hashlib
+import io
+import multiprocessing
+import os
+import queue
+import tempfile
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from flask import current_app
+from PIL import Image, ImageOps
+from extensions import db
+from models.imagen_objeto import ImagenObjeto
+from src.services.almacenamiento import almacenamiento
+
+# Anchos (px) de las variantes WebP: tarjetas, detalle y detalle en pantallas densas
+ANCHOS_WEBP = (320, 640, 1280)
+
+# Variante JPEG para el src de <img> (navegadores sin WebP)
+ANCHO_JPEG = 640
+
+CALIDAD_WEBP = 80
+CALIDAD_JPEG = 82
+
+# Primeros bytes de cada formato aceptado y su extensión (WebP aparte:
+# "RIFF", tamaño y "WEBP")
+FIRMAS = (
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"GIF87a", ".gif"),
+    (b"GIF89a", ".gif"),
+)
+
+# Tamaño de los bloques con que se copia cada subida
+TAMANO_BLOQUE = 64 * 1024
+
+# Lado mayor (px) de la vista previa que va en línea en el HTML
+LADO_PLACEHOLDER = 16
+
+# Archivo recibido y aún en su temporal (se mueve a nombre_archivo tras el commit)
+Subida = namedtuple("Subida", "hash_contenido nombre_archivo temporal tamano_bytes ancho alto")
+
+# Orientaciones EXIF en las que la foto está girada 90° (ancho y alto se cruzan)
+ORIENTACIONES_GIRADAS = {5, 6, 7, 8}
+
+
+# -----------------------------
+# Generación (en el pool de procesos)
+# -----------------------------
+def _redimensionar(imagen, ancho):
+    if imagen.width <= ancho:
+        return imagen
+    alto = max(1, round(imagen.height * ancho / imagen.width))
+    return imagen.resize((ancho, alto), Image.LANCZOS)
+
+
+def _vista_previa(imagen):
+    """Vista previa de LADO_PLACEHOLDER px como data URI WebP de unos cientos de bytes."""
+    vista = imagen.copy()
+    vista.thumbnail((LADO_PLACEHOLDER, LADO_PLACEHOLDER))
+    salida = io.BytesIO()
+    vista.save(salida, "WEBP", quality=50)
+    return "data:image/webp;base64," + base64.b64encode(salida.getvalue()).decode()
+
+
+def generar_variantes(origen):
+    """
+    Genera las variantes de una imagen subida y su vista previa. Recibe la
+    ruta del original (o sus bytes) y devuelve bytes para poder ejecutarse
+    en otro proceso sin acceso a la app ni a la base de datos.
+
+    Devuelve ([(ancho, formato, bytes)], placeholder); nunca amplía una
+    imagen pequeña.
+    """
+    if isinstance(origen, bytes):
+        origen = io.BytesIO(origen)
+    with Image.open(origen) as original:
+        # Las fotos de celular guardan la rotación en EXIF
+        imagen = ImageOps.exif_transpose(original)
+        imagen = imagen.convert("RGBA" if "A" in imagen.getbands() or imagen.mode == "P" else "RGB")
+
+    variantes = []
+    for ancho in sorted({min(a, imagen.width) for a in ANCHOS_WEBP}):
+        salida = io.BytesIO()
+        _redimensionar(imagen, ancho).save(salida, "WEBP", quality=CALIDAD_WEBP, method=4)
+        variantes.append((ancho, "webp", salida.getvalue()))
+
+    ancho = min(ANCHO_JPEG, imagen.width)
+    salida = io.BytesIO()
+    _redimensionar(imagen, ancho).convert("RGB").save(
+        salida, "JPEG", quality=CALIDAD_JPEG, optimize=True, progressive=True
+    )
+    variantes.append((ancho, "jpeg", salida.getvalue()))
+    return variantes, _vista_previa(imagen)
+
+
+def medir_imagen(origen):
+    """
+    Devuelve (ancho, alto): las medidas con que se muestra la imagen (con la
+    rotación EXIF aplicada). Solo lee la cabecera, sin decodificar píxeles.
+    """
+    with Image.open(origen) as imagen:
+        ancho, alto = imagen.size
+        # Solo el EXIF de la cabecera: getexif() de un PNG sin él decodifica la imagen
+        exif = imagen.getexif() if "exif" in imagen.info else {}
+        if exif.get(0x0112) in ORIENTACIONES_GIRADAS:
+            ancho, alto = alto, ancho
+    return ancho, alto
+
+
+def vista_previa(origen):
+    """
+    Vista previa de una imagen ya guardada sin pasar por generar_variantes
+    (scripts/medir_imagenes.py). Los JPEG se decodifican a 1/8 del tamaño.
+    """
+    with Image.open(origen) as imagen:
+        imagen.draft("RGB", (LADO_PLACEHOLDER * 8, LADO_PLACEHOLDER * 8))
+        vista = ImageOps.exif_transpose(imagen)
+        vista = vista.convert("RGBA" if "A" in vista.getbands() or vista.mode == "P" else "RGB")
+    return _vista_previa(vista)
+
+
+# -----------------------------
+# Recepción de subidas
+# -----------------------------
+class SubidaInvalida(ValueError):
+    """El archivo no es una imagen aceptada o supera IMAGEN_MAX_BYTES o IMAGEN_MAX_PIXELES."""
+
+
+def extension_por_firma(cabecera):
+    """Extensión según los primeros bytes del archivo (None si no es una imagen aceptada)."""
+    for firma, extension in FIRMAS:
+        if cabecera.startswith(firma):
+            return extension
+    if cabecera[:4] == b"RIFF" and cabecera[8:12] == b"WEBP":
+        return ".webp"
+    return None
+
+
+def recibir_subida(flujo, nombre_subido, carpeta, maximo, maximo_pixeles):
+    """
+    Copia un archivo subido por bloques a un temporal en `carpeta`,
+    calculando su SHA-256 por el camino. Valida solo la cabecera y corta en
+    cuanto pasa de `maximo` bytes; una vez copiado lee sus dimensiones de la
+    cabecera (medir_imagen) y lo rechaza si pasa de `maximo_pixeles`, antes
+    de que el pool de procesos lo decodifique. Corre en un hilo, sin
+    contexto de la app.
+
+    El archivo vive luego en "ab/cd/<sha256>.<ext>": el mismo contenido
+    siempre va al mismo lugar (se guarda una sola vez) y su URL nunca cambia
+    de contenido.
+    """
+    huella = hashlib.sha256()
+    extension, recibidos = None, 0
+    descriptor, temporal = tempfile.mkstemp(dir=carpeta, prefix=".subida-")
+    try:
+        with os.fdopen(descriptor, "wb") as destino:
+            while bloque := flujo.read(TAMANO_BLOQUE):
+                if extension is None:
+                    extension = extension_por_firma(bloque)
+                    if extension is None:
+                        raise SubidaInvalida(
+                            f"«{nombre_subido}» no es una imagen JPG, PNG, GIF o WebP."
+                        )
+                recibidos += len(bloque)
+                if recibidos > maximo:
+                    raise SubidaInvalida(
+                        f"«{nombre_subido}» supera el máximo de {maximo / 1048576:g} MB por imagen."
+                    )
+                huella.update(bloque)
+                destino.write(bloque)
+        if extension is None:
+            raise SubidaInvalida(f"«{nombre_subido}» está vacío.")
+        try:
+            ancho, alto = medir_imagen(temporal)
+        except (OSError, ValueError, Image.DecompressionBombError):
+            raise SubidaInvalida(f"«{nombre_subido}» está dañado o no se puede leer.")
+        if ancho * alto > maximo_pixeles:
+            raise SubidaInvalida(
+                f"«{nombre_subido}» supera el máximo de {maximo_pixeles / 1e6:g} megapíxeles."
+            )
+    except BaseException:
+        os.unlink(temporal)
+        raise
+
+    huella = huella.hexdigest()
+    return Subida(
+        huella,
+        f"{huella[:2]}/{huella[2:4]}/{huella}{extension}",
+        temporal,
+        recibidos,
+        ancho,
+        alto,
+    )
+
+
+def recibir_subidas(archivos):
+    """
+    Recibe a la vez (un hilo por archivo) los FileStorage de un formulario.
+    Si alguno no es válido se descartan todos y se lanza SubidaInvalida.
+    """
+    if not archivos:
+        return []
+
+    carpeta = almacenamiento().carpeta_temporal()
+    maximo = current_app.config["IMAGEN_MAX_BYTES"]
+    maximo_pixeles = current_app.config["IMAGEN_MAX_PIXELES"]
+    with ThreadPoolExecutor(max_workers=len(archivos)) as hilos:
+        futuros = [
+            hilos.submit(recibir_subida, a.stream, a.filename, carpeta, maximo, maximo_pixeles)
+            for a in archivos
+        ]
+
+    subidas = [f.result() for f in futuros if f.exception() is None]
+    errores = [f.exception() for f in futuros if f.exception() is not None]
+    if errores:
+        descartar_subidas(subidas)
+        raise errores[0]
+    return subidas
+
+
+def instalar_subida(subida):
+    """
+    Pasa el temporal al almacenamiento. Se llama después de confirmar la
+    fila y aunque el archivo ya exista: si otra petición lo borró al
+    quedarse sin referencias justo antes, vuelve a estar.
+    """
+    almacenamiento().guardar(subida.nombre_archivo, subida.temporal)
+
+
+def descartar_subidas(subidas):
+    """Borra los temporales de unas subidas que no se van a guardar."""
+    for subida in subidas:
+        try:
+            os.unlink(subida.temporal)
+        except FileNotFoundError:
+            pass
+
+
+# -----------------------------
+# Almacenamiento por contenido
+# -----------------------------
+def variantes_guardadas(huella):
+    """
+    (variantes, placeholder) ya generados para ese contenido (None si no
+    hay). También None si falta alguno de sus archivos (borrado al quedarse
+    sin referencias justo antes): así procesar_imagen los vuelve a generar.
+    """
+    guardadas = (
+        db.session.query(ImagenObjeto.variantes, ImagenObjeto.placeholder)
+        .filter(
+            ImagenObjeto.hash_contenido == huella,
+            ImagenObjeto.variantes.isnot(None),
+        )
+        .first()
+    )
+    if guardadas and all(almacenamiento().existe(v["archivo"]) for v in guardadas[0]):
+        return guardadas
+    return None
+
+
+def liberar_archivos(imagenes):
+    """
+    Borra del almacenamiento los archivos que se quedaron sin referencias. Recibe
+    [(hash_contenido, archivos)] tomados antes de eliminar las filas y se
+    llama después del commit; las imágenes anteriores al almacenamiento por
+    contenido (sin hash) no se comparten y se borran siempre.
+    """
+    por_borrar = set()
+    for huella, archivos in imagenes:
+        if huella is None or not ImagenObjeto.referencias(huella):
+            por_borrar.update(archivos)
+
+    for archivo in por_borrar:
+        almacenamiento().borrar(archivo)
+
+
+# -----------------------------
+# Borrado en segundo plano
+# -----------------------------
+_lock_borrados = threading.Lock()
+
+
+def _borrar_pendientes(app, cola):
+    """Hilo de fondo: libera los archivos de cada eliminación encolada."""
+    while True:
+        imagenes = cola.get()
+        try:
+            with app.app_context():
+                try:
+                    liberar_archivos(imagenes)
+                except Exception:
+                    app.logger.exception("No se pudieron borrar los archivos de %s", imagenes)
+                finally:
+                    db.session.remove()
+        finally:
+            cola.task_done()
+
+
+def _cola_de_borrados():
+    with _lock_borrados:
+        cola = current_app.extensions.get("rentflow_borrados")
+        if cola is None:
+            cola = queue.Queue()
+            threading.Thread(
+                target=_borrar_pendientes,
+                args=(current_app._get_current_object(), cola),
+                name="rentflow-borrados",
+                daemon=True,
+            ).start()
+            current_app.extensions["rentflow_borrados"] = cola
+        return cola
+
+
+def liberar_en_segundo_plano(imagenes):
+    """
+    Encola liberar_archivos para que la petición no espere al disco. Con
+    BORRADO_EN_SEGUNDO_PLANO = 0 se borra en el acto. Lo que quede en la
+    cola si el proceso termina lo recoge scripts/recolectar_huerfanos.py.
+    """
+    if not imagenes:
+        return
+    if not current_app.config["BORRADO_EN_SEGUNDO_PLANO"]:
+        liberar_archivos(imagenes)
+        return
+    _cola_de_borrados().put(list(imagenes))
+
+
+def esperar_borrados():
+    """Bloquea hasta que la cola de borrados de la app está vacía."""
+    cola = current_app.extensions.get("rentflow_borrados")
+    if cola is not None:
+        cola.join()
+
+
+# -----------------------------
+# Registro de variantes
+# -----------------------------
+def _guardar_variantes(id_imagen, nombre_archivo, generado):
+    """
+    Escribe los archivos de las variantes y los anota en ImagenObjeto.variantes,
+    junto con la vista previa. `generado` es lo que devuelve generar_variantes.
+    """
+    variantes, placeholder = generado
+    imagen = db.session.get(ImagenObjeto, id_imagen)
+    if imagen is None:
+        # El objeto se eliminó mientras se procesaba
+        return
+
+    # "ab/cd/<sha256>_640.webp": las comparten todas las filas con ese contenido
+    base = os.path.splitext(nombre_archivo)[0]
+    registros = []
+    for ancho, formato, datos in variantes:
+        archivo = f"{base}_{ancho}.{'jpg' if formato == 'jpeg' else formato}"
+        almacenamiento().guardar_bytes(archivo, datos)
+        registros.append({"archivo": archivo, "ancho": ancho, "formato": formato})
+
+    imagen.variantes = registros
+    imagen.placeholder = placeholder
+    db.session.commit()
+
+
+def _al_terminar(app, id_imagen, nombre_archivo, futuro):
+    """Callback del pool: corre en un hilo del proceso web, fuera de la petición."""
+    with app.app_context():
+        try:
+            _guardar_variantes(id_imagen, nombre_archivo, futuro.result())
+        except Exception:
+            db.session.rollback()
+            app.logger.exception("No se pudieron generar las variantes de la imagen %s", id_imagen)
+        finally:
+            db.session.remove()
+
+
+def _pool():
+    pool = current_app.extensions.get("rentflow_imagenes")
+    if pool is None:
+        # spawn: no hereda los hilos ni las conexiones del worker web
+        pool = ProcessPoolExecutor(
+            max_workers=current_app.config["IMAGENES_PROCESOS"],
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        current_app.extensions["rentflow_imagenes"] = pool
+    return pool
+
+
+def procesar_imagen(imagen):
+    """
+    Genera las variantes de una ImagenObjeto ya guardada (con id) a partir
+    de su archivo (la ruta si es local; si no, sus bytes). Con
+    IMAGENES_PROCESOS = 0 se procesa en el acto.
+
+    Devuelve el Future del pool (None si se procesó en el acto).
+    """
+    almacen = almacenamiento()
+    original = almacen.ruta_local(imagen.nombre_archivo) or almacen.leer(imagen.nombre_archivo)
+    if not current_app.config["IMAGENES_PROCESOS"]:
+        _guardar_variantes(imagen.id, imagen.nombre_archivo, generar_variantes(original))
+        return None
+
+    futuro = _pool().submit(generar_variantes, original)
+    futuro.add_done_callback(
+        partial(_al_terminar, current_app._get_current_object(), imagen.id, imagen.nombre_archivo)
+    )
+    return futuro
+
+
+def archivos_de(imagen):
+    """Original y variantes de una imagen (para borrarlos del almacenamiento)."""
+    return [imagen.nombre_archivo] + [v["archivo"] for v in imagen.variantes or []]
+
+
+# -----------------------------
+# Plantillas
+# -----------------------------
+def url_upload(nombre_archivo):
+    """URL de un archivo subido, según el almacenamiento configurado."""
+    return almacenamiento().url(nombre_archivo.replace("\\", "/"))
+
+
+def url_imagen(imagen):
+    """URL de la variante JPEG, o del original mientras no hay variantes."""
+    jpeg = [v for v in imagen.variantes or [] if v["formato"] == "jpeg"]
+    return url_upload(jpeg[0]["archivo"] if jpeg else imagen.nombre_archivo)
+
+
+def srcset_imagen(imagen):
+    """Atributo srcset con las variantes WebP ("" si aún no se generaron)."""
+    return ", ".join(
+        f"{url_upload(v['archivo'])} {v['ancho']}w"
+        for v in imagen.variantes or []
+        if v["formato"] == "webp"
+    )
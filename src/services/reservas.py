@@ -0,0 +1,181 @@
+import time
+from collections import namedtuple
+from datetime import date
+from sqlalchemy import and_, select, update
+from sqlalchemy.orm import joinedload
+from extensions import db
+from models.objeto import Objeto
+from models.reserva import Reserva
+from src.services.catalogo import Orden
+from src.services.disponibilidad import reservas_cambiadas
+
+# Todos los estados por los que pasa una reserva (filtro de "Mis reservas")
+ESTADOS = (
+    "Pendiente", "Aceptada", "Confirmada", "Activa",
+    "Finalizada", "Rechazada", "Cancelada", "Expirada",
+)
+
+# "Mis reservas": las más recientes primero, con cursor como el catálogo
+ORDEN_RESERVAS = Orden((Reserva.fecha_reserva, Reserva.id_reserva), True)
+
+# Reservas que se pueden resolver en una sola petición
+LOTE_MAXIMO = 200
+
+# Lo que le pasó a cada id de un lote (estado nuevo si ok, si no el motivo)
+Resultado = namedtuple("Resultado", "id_reserva ok estado motivo")
+
+# Decisión del propietario -> estado nuevo de la reserva
+DECISIONES = {"aceptar": "Aceptada", "rechazar": "Rechazada"}
+
+# Veces que se repite el lote si otra petición cambió alguna reserva
+# entre la lectura y el UPDATE
+REINTENTOS_LOTE = 3
+
+# Reservas que cambia cada UPDATE del barrido (y cada commit)
+LOTE_BARRIDO = 500
+
+
+# -----------------------------
+# Reservas de un cliente
+# -----------------------------
+def consulta_reservas_de(id_usuario, estado=None):
+    """
+    Reservas del usuario (para paginar con ORDEN_RESERVAS), con objeto,
+    categoría y pago en la misma consulta: la página entera no hace una
+    consulta más por fila.
+    """
+    query = Reserva.query.options(
+        joinedload(Reserva.objeto).joinedload(Objeto.categoria),
+        joinedload(Reserva.pago),
+    ).filter(Reserva.id_usuario == id_usuario)
+    if estado:
+        query = query.filter(Reserva.estado == estado)
+    return query
+
+
+# -----------------------------
+# Aprobar / rechazar en lote
+# -----------------------------
+def _clasificar(id_propietario, ids):
+    """
+    Una sola consulta con join a objeto: dueño y estado de cada reserva.
+    Devuelve ({id: Resultado} de las que no se pueden resolver,
+    {id: id_objeto} de las que sí).
+    """
+    filas = db.session.execute(
+        select(Reserva.id_reserva, Reserva.estado, Reserva.id_objeto, Objeto.id_usuario)
+        .join(Objeto, Objeto.id_objeto == Reserva.id_objeto)
+        .where(Reserva.id_reserva.in_(ids))
+    ).all()
+    encontradas = {fila.id_reserva: fila for fila in filas}
+
+    rechazos, validas = {}, {}
+    for id_reserva in ids:
+        fila = encontradas.get(id_reserva)
+        if fila is None:
+            rechazos[id_reserva] = Resultado(id_reserva, False, None, "No existe")
+        elif fila.id_usuario != id_propietario:
+            rechazos[id_reserva] = Resultado(id_reserva, False, fila.estado, "No es de tus objetos")
+        elif fila.estado != "Pendiente":
+            rechazos[id_reserva] = Resultado(id_reserva, False, fila.estado, "Ya no está pendiente")
+        else:
+            validas[id_reserva] = fila.id_objeto
+    return rechazos, validas
+
+
+def resolver_solicitudes(id_propietario, ids, decision):
+    """
+    Acepta o rechaza (`decision`: clave de DECISIONES) las reservas
+    pendientes de `ids` que sean de objetos de `id_propietario`, con un
+    UPDATE por conjunto y un solo commit. Rechazar libera sus fechas: la
+    disponibilidad sale de las reservas activas.
+
+    Devuelve un Resultado por id, en el orden recibido (sin repetidos).
+    """
+    nuevo_estado = DECISIONES[decision]
+    ids = list(dict.fromkeys(ids))
+
+    for _ in range(REINTENTOS_LOTE):
+        rechazos, validas = _clasificar(id_propietario, ids)
+        if validas:
+            # estado = Pendiente otra vez: si otra petición ya la resolvió
+            # entre medias, no se pisa y el lote se vuelve a clasificar
+            resultado = db.session.execute(
+                update(Reserva)
+                .where(Reserva.id_reserva.in_(validas), Reserva.estado == "Pendiente")
+                .values(estado=nuevo_estado)
+                .execution_options(synchronize_session=False)
+            )
+            if resultado.rowcount != len(validas):
+                db.session.rollback()
+                continue
+            reservas_cambiadas(set(validas.values()))
+            db.session.commit()
+        break
+    else:
+        # Siempre hubo una carrera: nada se aplicó
+        return [Resultado(i, False, None, "Cambió mientras se procesaba, inténtalo de nuevo") for i in ids]
+
+    return [rechazos.get(i) or Resultado(i, True, nuevo_estado, None) for i in ids]
+
+
+# -----------------------------
+# Ciclo de vida (barrido periódico)
+# -----------------------------
+def transiciones_vencidas(hoy):
+    """
+    (estado nuevo, condición) de cada paso del barrido, en orden. Cada
+    condición es un rango sobre un índice (estado, fecha):
+
+    - Confirmadas y activas cuyo último día ya pasó -> "Finalizada"
+      (ix_reserva_estado_fin); desde ahí el cliente puede opinar.
+    - Pendientes y aceptadas sin pagar cuyo primer día ya pasó -> "Expirada"
+      (ix_reserva_estado_inicio); dejan de ocupar sus fechas.
+    """
+    return [
+        ("Finalizada", and_(Reserva.estado.in_(("Confirmada", "Activa")), Reserva.fecha_fin < hoy)),
+        ("Expirada", and_(Reserva.estado.in_(("Pendiente", "Aceptada")), Reserva.fecha_inicio < hoy)),
+    ]
+
+
+def _barrer(nuevo_estado, condicion, lote, pausa):
+    """
+    Aplica una transición en lotes de `lote` reservas, un commit por lote:
+    ningún UPDATE bloquea reserva más que lo que tarda en cambiar esas filas.
+    """
+    cambiadas = 0
+    while True:
+        filas = db.session.execute(
+            select(Reserva.id_reserva, Reserva.id_objeto).where(condicion).limit(lote)
+        ).all()
+        if not filas:
+            return cambiadas
+
+        # La condición se repite: si algo cambió desde la lectura, no se pisa
+        resultado = db.session.execute(
+            update(Reserva)
+            .where(Reserva.id_reserva.in_([f.id_reserva for f in filas]), condicion)
+            .values(estado=nuevo_estado)
+            .execution_options(synchronize_session=False)
+        )
+        reservas_cambiadas({f.id_objeto for f in filas})
+        db.session.commit()
+        cambiadas += resultado.rowcount
+
+        if len(filas) < lote:
+            return cambiadas
+        if pausa:
+            time.sleep(pausa)
+
+
+def barrer_reservas(hoy=None, lote=LOTE_BARRIDO, pausa=0):
+    """
+    Mueve las reservas vencidas a su estado final. Devuelve
+    {estado nuevo: reservas cambiadas}. Se puede correr tantas veces como
+    se quiera: lo ya barrido no vuelve a cumplir ninguna condición.
+    """
+    hoy = hoy or date.today()
+    return {
+        nuevo_estado: _barrer(nuevo_estado, condicion, lote, pausa)
+        for nuevo_estado, condicion in transiciones_vencidas(hoy)
+    }
@@ -0,0 +1,155 @@
+import bisect
+import threading
+import time
+import unicodedata
+from flask import current_app
+from extensions import db
+from models.categoria import Categoria
+from models.objeto import Objeto
+
+
+def normalizar(texto):
+    """Minúsculas y sin acentos: "Cámara Réflex" -> "camara reflex"."""
+    descompuesto = unicodedata.normalize("NFKD", texto or "")
+    sin_acentos = "".join(c for c in descompuesto if not unicodedata.combining(c))
+    return " ".join(sin_acentos.casefold().split())
+
+
+class IndiceSugerencias:
+    """
+    Índice de prefijos en memoria sobre un arreglo ordenado.
+
+    Cada nombre se indexa desde el inicio de cada una de sus palabras, así
+    "perc" encuentra "Taladro percutor". Las búsquedas son O(log n) con bisect.
+    """
+
+    def __init__(self):
+        self._claves = []  # (clave, tipo, id) ordenadas
+        self._textos = {}  # (tipo, id) -> texto original
+        self._lock = threading.Lock()
+        # Lo toma la petición que reconstruye (ver obtener_indice)
+        self.reconstruyendo = threading.Lock()
+        self.construido_en = 0.0
+
+    @staticmethod
+    def _claves_de(texto):
+        palabras = normalizar(texto).split()
+        return [" ".join(palabras[i:]) for i in range(len(palabras))]
+
+    def agregar(self, tipo, id_, texto):
+        with self._lock:
+            self._quitar(tipo, id_)
+            self._textos[(tipo, id_)] = texto
+            for clave in self._claves_de(texto):
+                bisect.insort(self._claves, (clave, tipo, id_))
+
+    def quitar(self, tipo, id_):
+        with self._lock:
+            self._quitar(tipo, id_)
+
+    def _quitar(self, tipo, id_):
+        texto = self._textos.pop((tipo, id_), None)
+        if texto is None:
+            return
+        for clave in self._claves_de(texto):
+            posicion = bisect.bisect_left(self._claves, (clave, tipo, id_))
+            if posicion < len(self._claves) and self._claves[posicion] == (clave, tipo, id_):
+                del self._claves[posicion]
+
+    def buscar(self, prefijo, limite=8):
+        prefijo = normalizar(prefijo)
+        if not prefijo:
+            return []
+
+        resultados, vistos = [], set()
+        with self._lock:
+            posicion = bisect.bisect_left(self._claves, (prefijo,))
+            while posicion < len(self._claves) and len(resultados) < limite:
+                clave, tipo, id_ = self._claves[posicion]
+                if not clave.startswith(prefijo):
+                    break
+                if (tipo, id_) not in vistos:
+                    vistos.add((tipo, id_))
+                    resultados.append(
+                        {"tipo": tipo, "id": id_, "texto": self._textos[(tipo, id_)]}
+                    )
+                posicion += 1
+        return resultados
+
+    def cargar(self, objetos, categorias):
+        """Reemplaza todo el contenido del índice."""
+        claves, textos = [], {}
+        for tipo, filas in (("objeto", objetos), ("categoria", categorias)):
+            for id_, texto in filas:
+                textos[(tipo, id_)] = texto
+                claves.extend((clave, tipo, id_) for clave in self._claves_de(texto))
+        claves.sort()
+
+        with self._lock:
+            self._claves, self._textos = claves, textos
+            self.construido_en = time.monotonic()
+
+
+# -----------------------------
+# Índice del proceso (uno por aplicación)
+# -----------------------------
+def _vencido(indice, ttl):
+    return not indice.construido_en or time.monotonic() - indice.construido_en > ttl
+
+
+def obtener_indice():
+    """
+    Índice de la aplicación actual. Se construye en la primera consulta y se
+    reconstruye cada SUGERENCIAS_TTL segundos para recoger los cambios hechos
+    en otros workers; los de este worker se aplican al instante.
+
+    Solo una petición reconstruye: las demás siguen usando el índice
+    anterior (o esperan, si aún no hay ninguno).
+    """
+    indice = current_app.extensions.setdefault("rentflow_sugerencias", IndiceSugerencias())
+    ttl = current_app.config["SUGERENCIAS_TTL"]
+
+    if _vencido(indice, ttl) and indice.reconstruyendo.acquire(blocking=not indice.construido_en):
+        try:
+            if _vencido(indice, ttl):
+                # Lo mismo que muestra el catálogo (filtrar_catalogo)
+                objetos = (
+                    db.session.query(Objeto.id_objeto, Objeto.nombre)
+                    .filter(Objeto.publicado.is_(True), Objeto.estado == "Disponible")
+                    .all()
+                )
+                categorias = db.session.query(Categoria.id_categoria, Categoria.nombre).all()
+                indice.cargar(objetos, categorias)
+        finally:
+            indice.reconstruyendo.release()
+
+    return indice
+
+
+def registrar_objeto(objeto):
+    """Agrega (o actualiza) un objeto publicado y disponible en el índice."""
+    indice = current_app.extensions.get("rentflow_sugerencias")
+    if indice and indice.construido_en:
+        if objeto.publicado and objeto.estado == "Disponible":
+            indice.agregar("objeto", objeto.id_objeto, objeto.nombre)
+        else:
+            indice.quitar("objeto", objeto.id_objeto)
+
+
+def retirar_objeto(id_objeto):
+    indice = current_app.extensions.get("rentflow_sugerencias")
+    if indice and indice.construido_en:
+        indice.quitar("objeto", id_objeto)
+
+
+def registrar_categoria(categoria):
+    """Agrega (o actualiza) una categoría en el índice."""
+    indice = current_app.extensions.get("rentflow_sugerencias")
+    if indice and indice.construido_en:
+        indice.agregar("categoria", categoria.id_categoria, categoria.nombre)
+
+
+def retirar_categoria(id_categoria):
+    indice = current_app.extensions.get("rentflow_sugerencias")
+    if indice and indice.construido_en:
+        indice.quitar("categoria", id_categoria)
@@ -0,0 +1,100 @@
+import itertools
+from datetime import datetime
+from sqlalchemy import event, inspect, or_, select, update
+from sqlalchemy.orm import Session
+from models.categoria import Categoria
+from models.imagen_objeto import ImagenObjeto
+from models.objeto import Objeto
+from models.opinion import Opinion
+from models.reserva import Reserva
+from models.usuario import Usuario
+
+# Tablas hijas que forman parte de lo que se muestra de un objeto
+HIJOS = {
+    ImagenObjeto: "objeto_id",
+    Opinion: "id_objeto",
+    Reserva: "id_objeto",
+}
+
+# Columnas de otras tablas que se muestran junto al objeto (detalle y
+# tarjetas): el propietario, los autores de opiniones y la categoría
+MOSTRADOS = {
+    Usuario: ("nombre", "apellido", "direccion"),
+    Categoria: ("nombre",),
+}
+
+
+def cambia_lo_mostrado(obj):
+    """True si cambió alguna columna de MOSTRADOS de esa instancia."""
+    campos = MOSTRADOS.get(type(obj))
+    if not campos:
+        return False
+    estado = inspect(obj)
+    return any(estado.attrs[campo].history.has_changes() for campo in campos)
+
+
+def _objetos_que_muestran(session, usuarios, categorias):
+    """Ids de los objetos de esos propietarios o categorías, u opinados por esos usuarios."""
+    opinados = select(Opinion.id_objeto).where(Opinion.id_usuario.in_(usuarios))
+    return session.connection().execute(
+        select(Objeto.id_objeto).where(
+            or_(
+                Objeto.id_usuario.in_(usuarios),
+                Objeto.id_categoria.in_(categorias),
+                Objeto.id_objeto.in_(opinados),
+            )
+        )
+    ).scalars()
+
+
+# -----------------------------
+# Sello de versión por objeto
+# -----------------------------
+@event.listens_for(Session, "before_flush")
+def _sellar_objetos(session, contexto, instancias):
+    """
+    Incrementa Objeto.version y fecha_actualizacion en la misma transacción
+    en que cambia el objeto o alguna de sus imágenes, opiniones o reservas,
+    o lo que se muestra de su propietario, su categoría o sus opinantes.
+    """
+    ahora = datetime.utcnow()
+    sellados, padres = set(), set()
+
+    for obj in session.dirty:
+        if isinstance(obj, Objeto) and session.is_modified(obj):
+            obj.version = Objeto.version + 1
+            obj.fecha_actualizacion = ahora
+            sellados.add(obj.id_objeto)
+
+    modificados = (o for o in session.dirty if session.is_modified(o))
+    for obj in itertools.chain(session.new, session.deleted, modificados):
+        atributo = HIJOS.get(type(obj))
+        if atributo and getattr(obj, atributo) is not None:
+            padres.add(getattr(obj, atributo))
+
+    mostrados = [o for o in session.dirty if cambia_lo_mostrado(o)]
+    usuarios = [o.id_usuario for o in mostrados if isinstance(o, Usuario)]
+    categorias = [o.id_categoria for o in mostrados if isinstance(o, Categoria)]
+    if usuarios or categorias:
+        padres.update(_objetos_que_muestran(session, usuarios, categorias))
+
+    padres -= sellados
+    if padres:
+        sellar_objetos(padres, session, ahora)
+
+
+def sellar_objetos(ids_objeto, session, ahora=None):
+    """
+    Sube la versión de esos objetos con un solo UPDATE. Para cambios hechos
+    con UPDATE masivos, que no pasan por before_flush.
+    """
+    ids_objeto = set(ids_objeto)
+    session.connection().execute(
+        update(Objeto.__table__)
+        .where(Objeto.id_objeto.in_(ids_objeto))
+        .values(version=Objeto.version + 1, fecha_actualizacion=ahora or datetime.utcnow())
+    )
+    # Las copias ya cargadas en la sesión se releen en el próximo acceso
+    for obj in session.identity_map.values():
+        if isinstance(obj, Objeto) and obj.id_objeto in ids_objeto:
+            session.expire(obj, ["version", "fecha_actualizacion"])
@@ -0,0 +1,254 @@
+import sys
+import os
+import io
+import shutil
+import tempfile
+import unittest
+from datetime import date, datetime, timezone
+from PIL import Image
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from models.usuario import Usuario
+from models.rol import Rol
+from models.objeto import Objeto
+from models.categoria import Categoria
+from src.services.almacenamiento import (
+    CACHE_INMUTABLE,
+    AlmacenamientoLocal,
+    AlmacenamientoMemoria,
+    AlmacenamientoS3,
+    almacenamiento,
+)
+
+HUELLA = 'ab' + 'cd' + '0' * 60
+
+class S3EnMemoria:
+    """Sustituto en proceso de un cliente S3 de boto3 (solo lo que se usa)."""
+
+    class exceptions:
+        class NoSuchKey(Exception):
+            pass
+
+    def __init__(self, por_pagina=1000):
+        self.objetos = {}  # (bucket, clave) -> dict
+        self.por_pagina = por_pagina
+
+    def put_object(self, Bucket, Key, Body, **extra):
+        datos = Body if isinstance(Body, bytes) else Body.read()
+        self.objetos[(Bucket, Key)] = dict(
+            extra, Body=datos, LastModified=datetime.now(timezone.utc)
+        )
+
+    def get_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objetos:
+            raise self.exceptions.NoSuchKey(Key)
+        return {'Body': io.BytesIO(self.objetos[(Bucket, Key)]['Body'])}
+
+    def delete_object(self, Bucket, Key):
+        self.objetos.pop((Bucket, Key), None)
+
+    def list_objects_v2(self, Bucket, Prefix='', MaxKeys=1000, ContinuationToken=None):
+        claves = sorted(k for b, k in self.objetos if b == Bucket and k.startswith(Prefix))
+        inicio = int(ContinuationToken or 0)
+        fin = inicio + min(MaxKeys, self.por_pagina)
+        pagina = {'Contents': [
+            {
+                'Key': clave,
+                'Size': len(self.objetos[(Bucket, clave)]['Body']),
+                'LastModified': self.objetos[(Bucket, clave)]['LastModified'],
+            }
+            for clave in claves[inicio:fin]
+        ], 'IsTruncated': fin < len(claves)}
+        if pagina['IsTruncated']:
+            pagina['NextContinuationToken'] = str(fin)
+        return pagina
+
+def jpeg(ancho, alto):
+    salida = io.BytesIO()
+    Image.new('RGB', (ancho, alto), (200, 30, 30)).save(salida, 'JPEG')
+    return salida.getvalue()
+
+
+class ContratoAlmacenamiento:
+    """Lo que cualquier almacenamiento tiene que cumplir."""
+
+    def temporal(self, datos):
+        descriptor, ruta = tempfile.mkstemp(dir=self.almacen.carpeta_temporal(), prefix='.subida-')
+        with os.fdopen(descriptor, 'wb') as archivo:
+            archivo.write(datos)
+        return ruta
+
+    def test_guardar_consume_el_temporal(self):
+        temporal = self.temporal(b'foto')
+        self.almacen.guardar(f'ab/cd/{HUELLA}.jpg', temporal)
+
+        self.assertFalse(os.path.exists(temporal))
+        self.assertEqual(self.almacen.leer(f'ab/cd/{HUELLA}.jpg'), b'foto')
+        self.assertTrue(self.almacen.existe(f'ab/cd/{HUELLA}.jpg'))
+
+    def test_guardar_bytes_y_borrar(self):
+        self.almacen.guardar_bytes('avatars/yo.png', b'avatar')
+        self.assertEqual(self.almacen.leer('avatars/yo.png'), b'avatar')
+
+        self.almacen.borrar('avatars/yo.png')
+        self.almacen.borrar('avatars/yo.png')  # ya no está: no falla
+        self.assertFalse(self.almacen.existe('avatars/yo.png'))
+        with self.assertRaises(FileNotFoundError):
+            self.almacen.leer('avatars/yo.png')
+
+    def test_listar(self):
+        for nombre in ('kayak.jpg', f'ab/cd/{HUELLA}.jpg', f'ab/cd/{HUELLA}_640.webp', 'avatars/yo.png'):
+            self.almacen.guardar_bytes(nombre, b'12345')
+
+        archivos = sorted(self.almacen.listar())
+        self.assertEqual(
+            [(a.nombre, a.tamano) for a in archivos],
+            [
+                (f'ab/cd/{HUELLA}.jpg', 5),
+                (f'ab/cd/{HUELLA}_640.webp', 5),
+                ('avatars/yo.png', 5),
+                ('kayak.jpg', 5),
+            ],
+        )
+        self.assertTrue(all(a.modificado > 0 for a in archivos))
+
+
+class TestAlmacenamientoMemoria(ContratoAlmacenamiento, unittest.TestCase):
+    def setUp(self):
+        self.almacen = AlmacenamientoMemoria()
+
+
+class TestAlmacenamientoLocal(ContratoAlmacenamiento, unittest.TestCase):
+    def setUp(self):
+        self.carpeta = tempfile.mkdtemp()
+        self.almacen = AlmacenamientoLocal(self.carpeta)
+
+    def tearDown(self):
+        shutil.rmtree(self.carpeta)
+
+    def test_no_sale_de_la_carpeta(self):
+        self.assertIsNone(self.almacen.ruta_local('../fuera.txt'))
+        with self.assertRaises(ValueError):
+            self.almacen.guardar_bytes('../fuera.txt', b'x')
+
+
+class TestAlmacenamientoS3(ContratoAlmacenamiento, unittest.TestCase):
+    def setUp(self):
+        # Páginas de 2 claves para recorrer la paginación de ListObjectsV2
+        self.cliente = S3EnMemoria(por_pagina=2)
+        self.almacen = AlmacenamientoS3(self.cliente, 'rentflow', 'uploads/')
+
+    def test_cabeceras_de_los_objetos(self):
+        self.almacen.guardar_bytes(f'ab/cd/{HUELLA}_640.webp', b'webp')
+        self.almacen.guardar_bytes('avatars/yo.png', b'png')
+
+        inmutable = self.cliente.objetos[('rentflow', f'uploads/ab/cd/{HUELLA}_640.webp')]
+        self.assertEqual(inmutable['ContentType'], 'image/webp')
+        self.assertEqual(inmutable['CacheControl'], CACHE_INMUTABLE)
+        self.assertNotIn('CacheControl', self.cliente.objetos[('rentflow', 'uploads/avatars/yo.png')])
+
+
+class TestAlmacenamientoDeLaApp(unittest.TestCase):
+    def setUp(self):
+        # Force SQLite for testing
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['WTF_CSRF_ENABLED'] = False
+        self.app.config['IMAGENES_PROCESOS'] = 0
+        self.app.config['BORRADO_EN_SEGUNDO_PLANO'] = 0
+        self.client = self.app.test_client()
+
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        db.session.add(Rol(id_rol=3, nombre='Propietario', descripcion='Propietario'))
+        self.categoria = Categoria(nombre='Herramientas', descripcion='Test')
+        self.propietario = Usuario(
+            nombre='Propietario', apellido='User', correo='propietario@test.com',
+            contrasena='password', telefono='123', direccion='Test', id_rol=3,
+            fecha_registro=date.today()
+        )
+        self.propietario.set_password('password')
+        db.session.add_all([self.categoria, self.propietario])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def usar(self, almacen):
+        self.app.extensions['rentflow_almacenamiento'] = almacen
+        return almacen
+
+    def crear_con_foto(self):
+        self.client.post('/auth/login', data=dict(
+            correo='propietario@test.com', contrasena='password'
+        ))
+        self.client.post('/objetos/nuevo', data={
+            'nombre': 'Kayak doble', 'descripcion': 'Desc', 'estado': 'Disponible',
+            'precio': '500', 'id_categoria': self.categoria.id_categoria, 'publicar': 'on',
+            'imagenes': [(io.BytesIO(jpeg(1600, 1200)), 'kayak.jpg')],
+        }, content_type='multipart/form-data')
+        return Objeto.query.filter_by(nombre='Kayak doble').one()
+
+    def test_por_defecto_disco_local(self):
+        self.app.config['UPLOAD_FOLDER'] = '/tmp/rentflow-uploads'
+        almacen = almacenamiento()
+
+        self.assertIsInstance(almacen, AlmacenamientoLocal)
+        self.assertEqual(almacen.carpeta, '/tmp/rentflow-uploads')
+
+    def test_memoria(self):
+        almacen = self.usar(AlmacenamientoMemoria())
+        objeto = self.crear_con_foto()
+        imagen = objeto.imagenes[0]
+
+        self.assertEqual(
+            sorted(almacen.archivos),
+            sorted([imagen.nombre_archivo] + [v['archivo'] for v in imagen.variantes]),
+        )
+
+        # /uploads lee del almacenamiento (con Range y condicionales)
+        respuesta = self.client.get(f'/uploads/{imagen.nombre_archivo}')
+        self.assertEqual(respuesta.data, almacen.leer(imagen.nombre_archivo))
+        self.assertTrue(respuesta.cache_control.immutable)
+        parcial = self.client.get(f'/uploads/{imagen.nombre_archivo}', headers={'Range': 'bytes=0-9'})
+        self.assertEqual(parcial.status_code, 206)
+        self.assertEqual(parcial.data, respuesta.data[:10])
+        condicional = self.client.get(f'/uploads/{imagen.nombre_archivo}', headers={
+            'If-None-Match': respuesta.headers['ETag'],
+        })
+        self.assertEqual(condicional.status_code, 304)
+
+        self.client.post(f'/objetos/eliminar/{objeto.id_objeto}')
+        self.assertEqual(almacen.archivos, {})
+        self.assertEqual(self.client.get(f'/uploads/{imagen.nombre_archivo}').status_code, 404)
+
+    def test_s3_con_url_publica(self):
+        cliente = S3EnMemoria()
+        self.usar(AlmacenamientoS3(cliente, 'rentflow', 'uploads/', 'https://cdn.example.com/'))
+        objeto = self.crear_con_foto()
+        imagen = objeto.imagenes[0]
+
+        claves = sorted(clave for _, clave in cliente.objetos)
+        self.assertEqual(claves, sorted(
+            'uploads/' + a for a in [imagen.nombre_archivo] + [v['archivo'] for v in imagen.variantes]
+        ))
+
+        jpeg_640 = [v['archivo'] for v in imagen.variantes if v['formato'] == 'jpeg'][0]
+        html = self.client.get('/objetos/').data
+        self.assertIn(f'src="https://cdn.example.com/uploads/{jpeg_640}"'.encode(), html)
+
+        self.client.post(f'/objetos/eliminar/{objeto.id_objeto}')
+        self.assertEqual(cliente.objetos, {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import sys
+import os
+import gzip
+import json
+import unittest
+from datetime import date, timedelta
+import brotli
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from models.usuario import Usuario
+from models.rol import Rol
+from models.objeto import Objeto
+from models.categoria import Categoria
+from models.imagen_objeto import ImagenObjeto
+
+class TestApiObjetos(unittest.TestCase):
+    def setUp(self):
+        # Force SQLite for testing
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['WTF_CSRF_ENABLED'] = False
+        self.client = self.app.test_client()
+
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        db.session.add(Rol(id_rol=3, nombre='Propietario', descripcion='Propietario'))
+        categoria = Categoria(nombre='Herramientas', descripcion='Test')
+        propietario = Usuario(
+            nombre='Propietario', apellido='User', correo='propietario@test.com',
+            contrasena='password', telefono='123', direccion='Santo Domingo', id_rol=3,
+            fecha_registro=date.today()
+        )
+        db.session.add_all([categoria, propietario])
+        db.session.commit()
+
+        for i in range(5):
+            objeto = Objeto(
+                nombre=f'Taladro {i}', descripcion='Desc', precio=100 + i,
+                estado='Disponible', publicado=True,
+                fecha_publicacion=date.today() - timedelta(days=i),
+                id_usuario=propietario.id_usuario, id_categoria=categoria.id_categoria,
+            )
+            db.session.add(objeto)
+            db.session.flush()
+            db.session.add_all([
+                ImagenObjeto(nombre_archivo=f'portada_{i}.jpg', objeto_id=objeto.id_objeto),
+                ImagenObjeto(nombre_archivo=f'otra_{i}.jpg', objeto_id=objeto.id_objeto),
+            ])
+        db.session.commit()
+        db.session.expunge_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_solo_los_campos_pedidos(self):
+        datos = self.client.get('/api/objetos?fields=nombre,precio,imagen,propietario').get_json()
+
+        self.assertEqual(datos['objetos'][0], {
+            'nombre': 'Taladro 0', 'precio': 100.0,
+            'imagen': '/uploads/portada_0.jpg', 'propietario': 'Propietario',
+        })
+
+    def test_campo_desconocido(self):
+        response = self.client.get('/api/objetos?fields=nombre,contrasena')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('contrasena', response.get_json()['error'])
+
+    def test_cursor_y_mismos_resultados_que_el_catalogo(self):
+        nombres, cursor = [], None
+        while True:
+            datos = self.client.get('/api/objetos', query_string={
+                'fields': 'nombre', 'limite': 2, 'orden': 'precio_desc', 'cursor': cursor,
+            }).get_json()
+            nombres.extend(o['nombre'] for o in datos['objetos'])
+            cursor = datos['siguiente']
+            if not cursor:
+                break
+
+        self.assertEqual(nombres, [f'Taladro {i}' for i in range(4, -1, -1)])
+
+    def test_no_carga_instancias_del_orm(self):
+        self.client.get('/api/objetos').get_data()
+        self.assertFalse(any(isinstance(o, Objeto) for o in db.session.identity_map.values()))
+
+    def test_compresion(self):
+        plano = self.client.get('/api/objetos').get_json()
+
+        response = self.client.get('/api/objetos', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(response.data)), plano)
+
+        response = self.client.get('/api/objetos', headers={'Accept-Encoding': 'gzip, br'})
+        self.assertEqual(response.headers['Content-Encoding'], 'br')
+        self.assertEqual(json.loads(brotli.decompress(response.data)), plano)
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+
+if __name__ == '__main__':
+    unittest.main()
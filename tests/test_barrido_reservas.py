@@ -0,0 +1,150 @@
+import sys
+import os
+import unittest
+from datetime import date, timedelta
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from sqlalchemy import event, select
+from models.usuario import Usuario
+from models.rol import Rol
+from models.objeto import Objeto
+from models.categoria import Categoria
+from models.reserva import Reserva
+from src.services.reservas import barrer_reservas, transiciones_vencidas
+
+HOY = date.today()
+
+
+def dia(n):
+    return HOY + timedelta(days=n)
+
+
+class TestBarridoReservas(unittest.TestCase):
+    def setUp(self):
+        # Force SQLite for testing
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['WTF_CSRF_ENABLED'] = False
+        self.client = self.app.test_client()
+
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        db.session.add_all([
+            Rol(id_rol=2, nombre='Cliente', descripcion='Cliente'),
+            Rol(id_rol=3, nombre='Propietario', descripcion='Propietario'),
+        ])
+        cat = Categoria(nombre='Herramientas', descripcion='Test')
+        self.cliente = Usuario(
+            nombre='Cliente', apellido='User', correo='cliente@test.com',
+            contrasena='password', telefono='123', direccion='Test', id_rol=2,
+            fecha_registro=HOY
+        )
+        self.cliente.set_password('password')
+        propietario = Usuario(
+            nombre='Propietario', apellido='User', correo='propietario@test.com',
+            contrasena='password', telefono='123', direccion='Test', id_rol=3,
+            fecha_registro=HOY
+        )
+        db.session.add_all([cat, self.cliente, propietario])
+        db.session.commit()
+
+        self.objeto = Objeto(
+            nombre='Taladro', descripcion='Desc', precio=100.0, estado='Disponible',
+            id_usuario=propietario.id_usuario, id_categoria=cat.id_categoria,
+            fecha_publicacion=HOY,
+        )
+        db.session.add(self.objeto)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def reservar(self, inicio, fin, estado):
+        reserva = Reserva(
+            fecha_reserva=dia(inicio - 5), fecha_inicio=dia(inicio), fecha_fin=dia(fin), estado=estado,
+            id_usuario=self.cliente.id_usuario, id_objeto=self.objeto.id_objeto,
+        )
+        db.session.add(reserva)
+        db.session.commit()
+        return reserva.id_reserva
+
+    def estado(self, id_reserva):
+        return db.session.get(Reserva, id_reserva).estado
+
+    def test_transiciones(self):
+        ids = {
+            'terminada': self.reservar(-10, -5, 'Confirmada'),
+            'activa_terminada': self.reservar(-3, -1, 'Activa'),
+            'en_curso': self.reservar(-2, 2, 'Confirmada'),
+            'termina_hoy': self.reservar(-2, 0, 'Confirmada'),
+            'pendiente_vencida': self.reservar(-4, 3, 'Pendiente'),
+            'aceptada_sin_pagar': self.reservar(-1, 1, 'Aceptada'),
+            'pendiente_futura': self.reservar(0, 3, 'Pendiente'),
+            'cancelada': self.reservar(-10, -5, 'Cancelada'),
+        }
+        version = self.objeto.version
+
+        cambios = barrer_reservas()
+
+        self.assertEqual(cambios, {'Finalizada': 2, 'Expirada': 2})
+        db.session.expire_all()
+        self.assertEqual({nombre: self.estado(i) for nombre, i in ids.items()}, {
+            'terminada': 'Finalizada',
+            'activa_terminada': 'Finalizada',
+            'en_curso': 'Confirmada',
+            'termina_hoy': 'Confirmada',
+            'pendiente_vencida': 'Expirada',
+            'aceptada_sin_pagar': 'Expirada',
+            'pendiente_futura': 'Pendiente',
+            'cancelada': 'Cancelada',
+        })
+        self.assertGreater(self.objeto.version, version)
+
+        # Ya barrido: nada más que hacer
+        self.assertEqual(barrer_reservas(), {'Finalizada': 0, 'Expirada': 0})
+
+    def test_lotes_acotados(self):
+        for _ in range(5):
+            self.reservar(-10, -5, 'Confirmada')
+
+        sentencias = []
+        def registrar(conn, cursor, sentencia, *args):
+            if sentencia.startswith('UPDATE reserva'):
+                sentencias.append(sentencia)
+        event.listen(db.engine, 'before_cursor_execute', registrar)
+        try:
+            cambios = barrer_reservas(lote=2)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', registrar)
+
+        self.assertEqual(cambios['Finalizada'], 5)
+        self.assertEqual(len(sentencias), 3)
+        self.assertEqual(Reserva.query.filter_by(estado='Finalizada').count(), 5)
+
+    def test_cada_paso_usa_su_indice(self):
+        indices = {'Finalizada': 'ix_reserva_estado_fin', 'Expirada': 'ix_reserva_estado_inicio'}
+        for nuevo_estado, condicion in transiciones_vencidas(HOY):
+            with self.subTest(nuevo_estado):
+                compilada = select(Reserva.id_reserva, Reserva.id_objeto).where(condicion).limit(500).compile(
+                    db.engine, compile_kwargs={'render_postcompile': True}
+                )
+                filas = db.session.connection().exec_driver_sql(
+                    'EXPLAIN QUERY PLAN ' + str(compilada),
+                    tuple(compilada.params[nombre] for nombre in compilada.positiontup),
+                ).all()
+                plan = ' '.join(fila[3] for fila in filas)
+                self.assertIn(f'INDEX {indices[nuevo_estado]} (estado=? AND', plan)
+
+
+if __name__ == '__main__':
+    unittest.main()
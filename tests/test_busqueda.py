@@ -0,0 +1,105 @@
+import sys
+import os
+import unittest
+from datetime import date
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from models.usuario import Usuario
+from models.rol import Rol
+from models.objeto import Objeto
+from models.categoria import Categoria
+from sqlalchemy.dialects import postgresql
+from src.services.busqueda import aplicar_busqueda
+
+class TestBusqueda(unittest.TestCase):
+    def setUp(self):
+        # Force SQLite for testing
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['WTF_CSRF_ENABLED'] = False
+        self.client = self.app.test_client()
+
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        db.session.add(Rol(id_rol=3, nombre='Propietario', descripcion='Propietario'))
+        self.herramientas = Categoria(nombre='Herramientas', descripcion='Test')
+        self.fotografia = Categoria(nombre='Fotografía', descripcion='Test')
+        db.session.add_all([self.herramientas, self.fotografia])
+
+        propietario = Usuario(
+            nombre='Propietario', apellido='User', correo='propietario@test.com',
+            contrasena='password', telefono='123', direccion='Test', id_rol=3,
+            fecha_registro=date.today()
+        )
+        db.session.add(propietario)
+        db.session.commit()
+
+        def objeto(nombre, descripcion, categoria):
+            o = Objeto(
+                nombre=nombre, descripcion=descripcion, precio=100,
+                estado='Disponible', publicado=True, fecha_publicacion=date.today(),
+                id_usuario=propietario.id_usuario, id_categoria=categoria.id_categoria,
+            )
+            db.session.add(o)
+            return o
+
+        self.taladro = objeto('Taladro percutor', 'Para concreto y madera', self.herramientas)
+        self.sierra = objeto('Sierra circular', 'Mejor que un taladro para cortar', self.herramientas)
+        self.camara = objeto('Cámara réflex', 'Incluye trípode', self.fotografia)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def buscar(self, **params):
+        datos = self.client.get('/objetos/pagina', query_string=params).get_json()
+        return [o['nombre'] for o in datos['objetos']]
+
+    def test_busca_en_nombre_y_descripcion_por_relevancia(self):
+        # El nombre pesa más que la descripción
+        self.assertEqual(self.buscar(busqueda='taladro'), ['Taladro percutor', 'Sierra circular'])
+
+    def test_ignora_acentos_y_acepta_prefijos(self):
+        self.assertEqual(self.buscar(busqueda='camara'), ['Cámara réflex'])
+        self.assertEqual(self.buscar(busqueda='TRÍPO'), ['Cámara réflex'])
+
+    def test_postgresql_busca_prefijos_de_todas_las_palabras(self):
+        query, _ = aplicar_busqueda(Objeto.query, 'TRÍPO "cám*', 'postgresql')
+        sql = query.statement.compile(dialect=postgresql.dialect())
+        self.assertIn('to_tsquery(', str(sql))
+        self.assertIn('TRÍPO:* & cám:*', sql.params.values())
+
+    def test_combina_con_categoria(self):
+        self.assertEqual(
+            self.buscar(busqueda='taladro', categoria=self.fotografia.id_categoria), []
+        )
+        self.assertEqual(
+            self.buscar(busqueda='cortar', categoria=self.herramientas.id_categoria),
+            ['Sierra circular'],
+        )
+
+    def test_indice_sigue_los_cambios(self):
+        self.camara.nombre = 'Proyector'
+        db.session.commit()
+        self.assertEqual(self.buscar(busqueda='proyector'), ['Proyector'])
+
+        db.session.delete(self.taladro)
+        db.session.commit()
+        self.assertEqual(self.buscar(busqueda='percutor'), [])
+
+    def test_signos_no_rompen_la_busqueda(self):
+        response = self.client.get('/objetos/', query_string={'busqueda': '"taladro* OR ('})
+        self.assertEqual(response.status_code, 200)
+
+if __name__ == '__main__':
+    unittest.main()
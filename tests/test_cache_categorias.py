@@ -0,0 +1,184 @@
+import sys
+import os
+import threading
+import time
+import unittest
+from datetime import date
+from sqlalchemy import event, update
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from models.usuario import Usuario
+from models.rol import Rol
+from models.categoria import Categoria
+from models.version_cache import VersionCache
+from src.services.cache import CacheVersionada, incrementar_version, version_actual
+from src.services.categorias import obtener_categorias
+
+class TestCacheCategorias(unittest.TestCase):
+    def setUp(self):
+        # Force SQLite for testing
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['WTF_CSRF_ENABLED'] = False
+        self.client = self.app.test_client()
+
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        db.session.add(Rol(id_rol=1, nombre='Admin', descripcion='Admin'))
+        self.admin = Usuario(
+            nombre='Admin', apellido='User', correo='admin@test.com',
+            contrasena='password', telefono='123', direccion='Test', id_rol=1,
+            fecha_registro=date.today()
+        )
+        self.admin.set_password('password')
+        db.session.add_all([self.admin, Categoria(nombre='Herramientas', descripcion='Test')])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def login(self, email, password):
+        return self.client.post('/auth/login', data=dict(
+            correo=email,
+            contrasena=password
+        ), follow_redirects=True)
+
+    def consultas_a_categoria(self, url):
+        consultas = []
+
+        def registrar(conn, cursor, statement, *args):
+            if 'FROM categoria' in statement:
+                consultas.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', registrar)
+        try:
+            response = self.client.get(url)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', registrar)
+
+        self.assertEqual(response.status_code, 200)
+        return len(consultas), response
+
+    def test_listado_no_consulta_categorias_en_cada_peticion(self):
+        primera, response = self.consultas_a_categoria('/objetos/')
+        segunda, _ = self.consultas_a_categoria('/objetos/')
+
+        self.assertEqual(primera, 1)
+        self.assertEqual(segunda, 0)
+        self.assertIn(b'Herramientas', response.data)
+
+    def test_crud_de_admin_invalida(self):
+        self.consultas_a_categoria('/objetos/')
+        self.login('admin@test.com', 'password')
+
+        self.client.post('/admin/categorias/crear', data={'nombre': 'Camping'})
+        _, response = self.consultas_a_categoria('/objetos/')
+        self.assertIn(b'Camping', response.data)
+
+        camping = Categoria.query.filter_by(nombre='Camping').first()
+        self.client.post('/admin/categorias/editar', data={
+            'categoria_id': camping.id_categoria, 'nombre': 'Acampar',
+        })
+        _, response = self.consultas_a_categoria('/objetos/')
+        self.assertIn(b'Acampar', response.data)
+        self.assertNotIn(b'Camping', response.data)
+
+        self.client.post(f'/admin/categorias/{camping.id_categoria}/eliminar')
+        _, response = self.consultas_a_categoria('/objetos/')
+        self.assertNotIn(b'Acampar', response.data)
+
+    def test_cambio_en_otro_worker(self):
+        self.assertEqual([c.nombre for c in obtener_categorias()], ['Herramientas'])
+
+        # Otro worker edita la categoría e incrementa la versión
+        db.session.execute(update(Categoria).values(nombre='Jardín'))
+        db.session.add(VersionCache(clave='categorias', version=1))
+        db.session.commit()
+
+        self.app.config['CACHE_VERIFICAR_CADA'] = 60
+        self.assertEqual([c.nombre for c in obtener_categorias()], ['Herramientas'])
+
+        self.app.config['CACHE_VERIFICAR_CADA'] = 0
+        self.assertEqual([c.nombre for c in obtener_categorias()], ['Jardín'])
+
+    def test_incrementar_una_clave_nueva_dos_veces(self):
+        # Dos veces en la misma transacción: una sola escritura al confirmar
+        incrementar_version('nueva')
+        incrementar_version('nueva')
+        db.session.commit()
+        self.assertEqual(version_actual('nueva'), 1)
+
+        incrementar_version('nueva')
+        db.session.commit()
+        self.assertEqual(version_actual('nueva'), 2)
+
+        incrementar_version('nueva')
+        db.session.rollback()
+        db.session.commit()
+        self.assertEqual(version_actual('nueva'), 2)
+
+    def cache_con_carga_lenta(self):
+        entrado, soltar = threading.Event(), threading.Event()
+        cargas = []
+
+        def cargar(argumento):
+            cargas.append(argumento)
+            if argumento == 'lento':
+                entrado.set()
+                soltar.wait(5)
+            return argumento.upper()
+
+        self.app.config['CACHE_VERIFICAR_CADA'] = 60
+        return CacheVersionada('categorias', cargar, maximo=4), cargas, entrado, soltar
+
+    def en_hilo(self, funcion, resultados):
+        def ejecutar():
+            with self.app.app_context():
+                resultados.append(funcion())
+        hilo = threading.Thread(target=ejecutar)
+        hilo.start()
+        return hilo
+
+    def test_carga_lenta_no_bloquea_otras_claves(self):
+        cache, _, entrado, soltar = self.cache_con_carga_lenta()
+        self.assertEqual(cache.obtener('rapido'), 'RAPIDO')
+
+        resultados = []
+        hilo = self.en_hilo(lambda: cache.obtener('lento'), resultados)
+        try:
+            self.assertTrue(entrado.wait(5))
+            inicio = time.monotonic()
+            self.assertEqual(cache.obtener('rapido'), 'RAPIDO')
+            self.assertLess(time.monotonic() - inicio, 1)
+        finally:
+            soltar.set()
+            hilo.join(5)
+        self.assertEqual(resultados, ['LENTO'])
+
+    def test_una_sola_carga_por_clave(self):
+        cache, cargas, entrado, soltar = self.cache_con_carga_lenta()
+
+        resultados = []
+        primero = self.en_hilo(lambda: cache.obtener('lento'), resultados)
+        self.assertTrue(entrado.wait(5))
+        segundo = self.en_hilo(lambda: cache.obtener('lento'), resultados)
+        time.sleep(0.1)
+        soltar.set()
+        primero.join(5)
+        segundo.join(5)
+
+        self.assertEqual(resultados, ['LENTO', 'LENTO'])
+        self.assertEqual(cargas, ['lento'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import sys
+import os
+import unittest
+from datetime import date
+from sqlalchemy import event, update
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from models.usuario import Usuario
+from models.rol import Rol
+from models.objeto import Objeto
+from models.categoria import Categoria
+from models.version_cache import VersionCache
+
+class TestCacheInicio(unittest.TestCase):
+    def setUp(self):
+        # Force SQLite for testing
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['WTF_CSRF_ENABLED'] = False
+        self.client = self.app.test_client()
+
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        db.session.add(Rol(id_rol=3, nombre='Propietario', descripcion='Propietario'))
+        categoria = Categoria(nombre='Herramientas', descripcion='Test')
+        self.propietario = Usuario(
+            nombre='Propietario', apellido='User', correo='propietario@test.com',
+            contrasena='password', telefono='123', direccion='Test', id_rol=3,
+            fecha_registro=date.today()
+        )
+        self.propietario.set_password('password')
+        db.session.add_all([categoria, self.propietario])
+        db.session.commit()
+
+        self.objeto = Objeto(
+            nombre='Taladro percutor', descripcion='Desc', precio=100,
+            estado='Disponible', publicado=True, fecha_publicacion=date.today(),
+            id_usuario=self.propietario.id_usuario, id_categoria=categoria.id_categoria,
+        )
+        db.session.add(self.objeto)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def login(self, email, password):
+        return self.client.post('/auth/login', data=dict(
+            correo=email,
+            contrasena=password
+        ), follow_redirects=True)
+
+    def contar_consultas(self, url):
+        consultas = []
+
+        def registrar(conn, cursor, statement, *args):
+            consultas.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', registrar)
+        try:
+            response = self.client.get(url)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', registrar)
+
+        self.assertEqual(response.status_code, 200)
+        return len(consultas), response
+
+    def test_visitante_anonimo_usa_cache(self):
+        self.client.get('/')
+        consultas, response = self.contar_consultas('/')
+
+        self.assertEqual(consultas, 0)
+        self.assertIn(b'Taladro percutor', response.data)
+
+    def test_cambio_de_estado_invalida(self):
+        self.client.get('/')
+
+        # Una reserva marca el objeto como no disponible
+        self.objeto.estado = 'Reservado'
+        db.session.commit()
+
+        self.assertNotIn(b'Taladro percutor', self.client.get('/').data)
+
+    def test_eliminar_invalida(self):
+        self.client.get('/')
+        self.login('propietario@test.com', 'password')
+        self.client.post(f'/objetos/eliminar/{self.objeto.id_objeto}')
+        self.client.get('/auth/logout')
+
+        self.assertNotIn(b'Taladro percutor', self.client.get('/').data)
+
+    def test_usuario_autenticado_no_usa_cache(self):
+        self.client.get('/')
+        self.login('propietario@test.com', 'password')
+
+        consultas, response = self.contar_consultas('/')
+        self.assertGreater(consultas, 0)
+        self.assertIn(b'propietario', response.data.lower())
+
+    def test_cambio_en_otro_worker(self):
+        self.client.get('/')
+
+        # Otro worker despublica el objeto con una sentencia directa
+        db.session.execute(update(Objeto).values(publicado=False))
+        db.session.execute(
+            update(VersionCache).where(VersionCache.clave == 'catalogo')
+            .values(version=VersionCache.version + 1)
+        )
+        db.session.commit()
+
+        self.app.config['CACHE_VERIFICAR_CADA'] = 0
+        self.assertNotIn(b'Taladro percutor', self.client.get('/').data)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+import sys
+import os
+import unittest
+from datetime import date
+from sqlalchemy import event
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from models.usuario import Usuario
+from models.rol import Rol
+from models.objeto import Objeto
+from models.categoria import Categoria
+from models.opinion import Opinion
+
+class TestCalificaciones(unittest.TestCase):
+    def setUp(self):
+        # Force SQLite for testing
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['WTF_CSRF_ENABLED'] = False
+        self.client = self.app.test_client()
+
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        r2 = Rol(id_rol=2, nombre='Cliente', descripcion='Cliente')
+        r3 = Rol(id_rol=3, nombre='Propietario', descripcion='Propietario')
+        db.session.add_all([r2, r3])
+        cat = Categoria(nombre='Test Cat', descripcion='Test')
+        db.session.add(cat)
+
+        self.cliente = Usuario(
+            nombre='Cliente', apellido='User', correo='cliente@test.com',
+            contrasena='password', telefono='123', direccion='Test', id_rol=2,
+            fecha_registro=date.today()
+        )
+        self.cliente.set_password('password')
+        propietario = Usuario(
+            nombre='Propietario', apellido='User', correo='propietario@test.com',
+            contrasena='password', telefono='123', direccion='Test', id_rol=3,
+            fecha_registro=date.today()
+        )
+        db.session.add_all([self.cliente, propietario])
+        db.session.commit()
+
+        self.objeto = Objeto(
+            nombre='Test Obj', descripcion='Desc', precio=100.0,
+            estado='Disponible', publicado=True, id_usuario=propietario.id_usuario,
+            id_categoria=cat.id_categoria, fecha_publicacion=date.today()
+        )
+        db.session.add(self.objeto)
+        db.session.commit()
+        self.id_objeto = self.objeto.id_objeto
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def login(self, email, password):
+        return self.client.post('/auth/login', data=dict(
+            correo=email,
+            contrasena=password
+        ), follow_redirects=True)
+
+    def agregados(self):
+        objeto = db.session.get(Objeto, self.id_objeto)
+        db.session.refresh(objeto)
+        return objeto.suma_calificaciones, objeto.total_opiniones, float(objeto.promedio_calificacion)
+
+    def test_escrituras_de_opiniones_mantienen_agregados(self):
+        self.login('cliente@test.com', 'password')
+
+        self.client.post(f'/objetos/objeto/{self.id_objeto}/opinion',
+                         data={'calificacion': '5', 'comentario': 'Excelente'})
+        self.client.post(f'/objetos/objeto/{self.id_objeto}/opinar',
+                         data={'calificacion': '2', 'comentario': 'Regular'})
+        self.assertEqual(self.agregados(), (7, 2, 3.5))
+
+        opinion = Opinion.query.filter_by(calificacion=2).first()
+        self.client.post(f'/opiniones/{opinion.id_opinion}/editar', data={
+            'comentario': 'Mejor de lo esperado', 'calificacion': '4',
+            'fecha': date.today().isoformat(),
+            'id_usuario': self.cliente.id_usuario, 'id_objeto': self.id_objeto,
+        })
+        self.assertEqual(self.agregados(), (9, 2, 4.5))
+
+        self.client.get(f'/opiniones/{opinion.id_opinion}/eliminar')
+        self.assertEqual(self.agregados(), (5, 1, 5.0))
+
+        response = self.client.get(f'/objetos/objeto/{self.id_objeto}')
+        self.assertIn(b'1 opiniones', response.data)
+
+    def test_recalcular_repara_agregados(self):
+        db.session.add_all([
+            Opinion(calificacion=4, comentario='a', fecha=date.today(),
+                    id_usuario=self.cliente.id_usuario, id_objeto=self.id_objeto),
+            Opinion(calificacion=1, comentario='b', fecha=date.today(),
+                    id_usuario=self.cliente.id_usuario, id_objeto=self.id_objeto),
+        ])
+        db.session.commit()
+        self.assertEqual(self.agregados(), (0, 0, 0.0))
+
+        Objeto.recalcular_calificaciones()
+        db.session.commit()
+        self.assertEqual(self.agregados(), (5, 2, 2.5))
+
+    def test_opinion_invalida_el_catalogo(self):
+        anonimo = self.app.test_client()
+        url = '/objetos/?orden=calificacion'
+        etag = anonimo.get(url).headers['ETag']
+        self.assertEqual(anonimo.get(url, headers={'If-None-Match': etag}).status_code, 304)
+
+        # Como en agregar_opinion (sin iniciar sesión: el usuario queda en g)
+        db.session.add(Opinion(
+            id_usuario=self.cliente.id_usuario, id_objeto=self.id_objeto,
+            calificacion=5, comentario='Excelente', fecha=date.today()
+        ))
+        Objeto.ajustar_calificaciones(self.id_objeto, 5, 1)
+        db.session.commit()
+
+        respuesta = anonimo.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertNotEqual(respuesta.headers['ETag'], etag)
+
+    def escrituras(self, funcion):
+        """Tablas que escribe cada UPDATE/INSERT ejecutado por `funcion`, en orden."""
+        tablas = []
+
+        def registrar(conn, cursor, sentencia, *args):
+            palabras = sentencia.split()
+            if palabras[0] in ('UPDATE', 'INSERT'):
+                tablas.append(palabras[1] if palabras[0] == 'UPDATE' else palabras[2])
+
+        event.listen(db.engine, 'before_cursor_execute', registrar)
+        try:
+            funcion()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', registrar)
+        return tablas
+
+    def test_version_cache_se_bloquea_al_final(self):
+        def opinar():
+            db.session.add(Opinion(
+                id_usuario=self.cliente.id_usuario, id_objeto=self.id_objeto,
+                calificacion=5, comentario='Excelente', fecha=date.today()
+            ))
+            Objeto.ajustar_calificaciones(self.id_objeto, 5, 1)
+            db.session.commit()
+
+        def editar():
+            db.session.get(Objeto, self.id_objeto).nombre = 'Otro nombre'
+            db.session.commit()
+
+        for funcion in (opinar, editar):
+            tablas = self.escrituras(funcion)
+            self.assertIn('objeto', tablas)
+            self.assertEqual(tablas[-1], 'version_cache')
+            self.assertEqual(tablas.index('version_cache'), len(tablas) - 1)
+
+if __name__ == '__main__':
+    unittest.main()
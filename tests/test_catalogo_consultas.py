@@ -0,0 +1,111 @@
+import sys
+import os
+import unittest
+from datetime import date
+
+from sqlalchemy import event
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from models.usuario import Usuario
+from models.rol import Rol
+from models.objeto import Objeto
+from models.categoria import Categoria
+from models.imagen_objeto import ImagenObjeto
+
+class TestCatalogoConsultas(unittest.TestCase):
+    def setUp(self):
+        # Force SQLite for testing
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['WTF_CSRF_ENABLED'] = False
+        self.client = self.app.test_client()
+
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        db.session.add(Rol(id_rol=3, nombre='Propietario', descripcion='Propietario'))
+        categoria = Categoria(nombre='Herramientas', descripcion='Test')
+        db.session.add(categoria)
+        db.session.commit()
+        self.id_categoria = categoria.id_categoria
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def crear_objetos(self, cantidad, desde=0):
+        # Cada objeto con su propio propietario y dos imágenes
+        for i in range(desde, desde + cantidad):
+            propietario = Usuario(
+                nombre=f'Propietario {i}', apellido='User', correo=f'p{i}@test.com',
+                contrasena='password', telefono='123', direccion=f'Sector {i}, Santiago',
+                id_rol=3, fecha_registro=date.today()
+            )
+            db.session.add(propietario)
+            db.session.flush()
+            objeto = Objeto(
+                nombre=f'Objeto {i}', descripcion='Desc', precio=100,
+                estado='Disponible', publicado=True, fecha_publicacion=date.today(),
+                id_usuario=propietario.id_usuario, id_categoria=self.id_categoria,
+            )
+            db.session.add(objeto)
+            db.session.flush()
+            db.session.add_all([
+                ImagenObjeto(nombre_archivo=f'portada_{i}.jpg', objeto_id=objeto.id_objeto),
+                ImagenObjeto(nombre_archivo=f'otra_{i}.jpg', objeto_id=objeto.id_objeto),
+            ])
+        db.session.commit()
+        db.session.expunge_all()
+
+    def contar_consultas(self, url):
+        consultas = []
+
+        def registrar(conn, cursor, statement, *args):
+            consultas.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', registrar)
+        try:
+            response = self.client.get(url)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', registrar)
+
+        self.assertEqual(response.status_code, 200)
+        return len(consultas), response
+
+    def test_listado_con_consultas_constantes(self):
+        self.crear_objetos(8)
+        # Las categorías se cachean en la primera petición
+        self.client.get('/objetos/')
+
+        self.app.config['CATALOGO_POR_PAGINA'] = 2
+        pocas, _ = self.contar_consultas('/objetos/')
+
+        self.app.config['CATALOGO_POR_PAGINA'] = 8
+        muchas, response = self.contar_consultas('/objetos/')
+
+        self.assertEqual(pocas, muchas)
+        self.assertIn(b'uploads/portada_7.jpg', response.data)
+        self.assertNotIn(b'uploads/otra_7.jpg', response.data)
+        self.assertIn(b'Propietario 7', response.data)
+        self.assertIn(b'Sector 7', response.data)
+
+    def test_inicio_con_consultas_constantes(self):
+        self.crear_objetos(2)
+        pocas, _ = self.contar_consultas('/')
+
+        self.crear_objetos(6, desde=2)
+        muchas, response = self.contar_consultas('/')
+
+        self.assertEqual(pocas, muchas)
+        self.assertIn(b'uploads/portada_5.jpg', response.data)
+
+if __name__ == '__main__':
+    unittest.main()
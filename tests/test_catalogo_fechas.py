@@ -0,0 +1,157 @@
+import sys
+import os
+import unittest
+from datetime import date, timedelta
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from models.usuario import Usuario
+from models.rol import Rol
+from models.objeto import Objeto
+from models.categoria import Categoria
+from models.reserva import Reserva
+from src.services.catalogo import consulta_catalogo, consulta_pagina
+
+HOY = date.today()
+
+
+def dia(n):
+    return HOY + timedelta(days=n)
+
+
+class TestCatalogoFechas(unittest.TestCase):
+    def setUp(self):
+        # Force SQLite for testing
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['WTF_CSRF_ENABLED'] = False
+        self.client = self.app.test_client()
+
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        db.session.add(Rol(id_rol=3, nombre='Propietario', descripcion='Propietario'))
+        self.herramientas = Categoria(nombre='Herramientas', descripcion='Test')
+        self.camping = Categoria(nombre='Camping', descripcion='Test')
+        self.propietario = Usuario(
+            nombre='Propietario', apellido='User', correo='propietario@test.com',
+            contrasena='password', telefono='123', direccion='Test', id_rol=3,
+            fecha_registro=HOY
+        )
+        db.session.add_all([self.herramientas, self.camping, self.propietario])
+        db.session.commit()
+
+        self.objetos = {}
+        for i, (nombre, categoria) in enumerate([
+            ('Taladro percutor', self.herramientas),
+            ('Sierra circular', self.herramientas),
+            ('Taladro inalámbrico', self.herramientas),
+            ('Tienda de campaña', self.camping),
+        ]):
+            objeto = Objeto(
+                nombre=nombre, descripcion='Desc', precio=100 + i,
+                estado='Disponible', publicado=True,
+                fecha_publicacion=HOY - timedelta(days=i),
+                id_usuario=self.propietario.id_usuario, id_categoria=categoria.id_categoria,
+            )
+            db.session.add(objeto)
+            self.objetos[nombre] = objeto
+        db.session.commit()
+
+        # Taladro percutor ocupado del 10 al 14; la sierra tuvo una reserva
+        # cancelada en esas fechas y una finalizada hace tiempo
+        self.reservar('Taladro percutor', 10, 14)
+        self.reservar('Sierra circular', 10, 14, 'Cancelada')
+        self.reservar('Sierra circular', -40, -30, 'Finalizada')
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def reservar(self, nombre, inicio, fin, estado='Aceptada'):
+        db.session.add(Reserva(
+            fecha_reserva=HOY, fecha_inicio=dia(inicio), fecha_fin=dia(fin), estado=estado,
+            id_usuario=self.propietario.id_usuario, id_objeto=self.objetos[nombre].id_objeto,
+        ))
+        db.session.commit()
+
+    def recorrer(self, **parametros):
+        """Nombres de todas las páginas del listado JSON, de 1 en 1."""
+        self.app.config['CATALOGO_POR_PAGINA'] = 1
+        nombres, cursor = [], None
+        while True:
+            datos = self.client.get('/objetos/pagina', query_string={**parametros, 'cursor': cursor}).get_json()
+            nombres.extend(o['nombre'] for o in datos['objetos'])
+            cursor = datos['siguiente']
+            if not cursor:
+                return nombres
+
+    def test_solo_objetos_libres(self):
+        nombres = self.recorrer(desde=dia(12).isoformat(), hasta=dia(20).isoformat())
+        self.assertEqual(nombres, ['Sierra circular', 'Taladro inalámbrico', 'Tienda de campaña'])
+
+        # Los extremos cuentan: el 14 todavía está ocupado, el 15 ya no
+        self.assertNotIn('Taladro percutor', self.recorrer(desde=dia(14).isoformat()))
+        self.assertIn('Taladro percutor', self.recorrer(desde=dia(15).isoformat(), hasta=dia(16).isoformat()))
+
+    def test_con_categoria_y_busqueda(self):
+        periodo = {'desde': dia(9).isoformat(), 'hasta': dia(11).isoformat()}
+        self.assertEqual(
+            self.recorrer(categoria=self.herramientas.id_categoria, **periodo),
+            ['Sierra circular', 'Taladro inalámbrico'],
+        )
+        self.assertEqual(self.recorrer(busqueda='taladro', **periodo), ['Taladro inalámbrico'])
+
+    def test_fechas_invalidas_se_ignoran(self):
+        self.assertEqual(len(self.recorrer(desde='mañana')), 4)
+        self.assertEqual(len(self.recorrer(desde=dia(14).isoformat(), hasta=dia(10).isoformat())), 4)
+
+    def test_api(self):
+        datos = self.client.get('/api/objetos', query_string={
+            'fields': 'nombre', 'desde': dia(10).isoformat(), 'hasta': dia(10).isoformat(),
+        }).get_json()
+        self.assertEqual(
+            [o['nombre'] for o in datos['objetos']],
+            ['Sierra circular', 'Taladro inalámbrico', 'Tienda de campaña'],
+        )
+
+    def test_el_listado_cambia_con_las_reservas(self):
+        url = f'/objetos/?desde={dia(20).isoformat()}&hasta={dia(21).isoformat()}'
+        etag = self.client.get(url).headers['ETag']
+        self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 304)
+
+        self.reservar('Tienda de campaña', 21, 25, 'Pendiente')
+
+        respuesta = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertNotIn('Tienda de campaña'.encode(), respuesta.data)
+
+    def test_anti_join_con_indice(self):
+        query, orden = consulta_catalogo(desde=dia(10), hasta=dia(14))
+        compilada = consulta_pagina(query, None, 24, orden).statement.compile(
+            db.engine, compile_kwargs={'render_postcompile': True}
+        )
+        filas = db.session.connection().exec_driver_sql(
+            'EXPLAIN QUERY PLAN ' + str(compilada),
+            tuple(compilada.params[nombre] for nombre in compilada.positiontup),
+        ).all()
+        plan = [fila[3] for fila in filas]
+
+        self.assertTrue(plan[0].startswith('SEARCH objeto USING INDEX ix_objeto_'), plan)
+        self.assertTrue(any('CORRELATED SCALAR SUBQUERY' in paso for paso in plan), plan)
+        self.assertTrue(
+            any(paso.startswith('SEARCH reserva USING INDEX ix_reserva_objeto_fin (id_objeto=? AND fecha_fin>?)')
+                for paso in plan),
+            plan,
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import sys
+import os
+import unittest
+from datetime import date, timedelta
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from models.usuario import Usuario
+from models.rol import Rol
+from models.objeto import Objeto
+from models.categoria import Categoria
+from src.services.catalogo import ORDENES, consulta_catalogo, consulta_pagina
+
+class TestCatalogoFiltros(unittest.TestCase):
+    def setUp(self):
+        # Force SQLite for testing
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['WTF_CSRF_ENABLED'] = False
+        self.client = self.app.test_client()
+
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        db.session.add(Rol(id_rol=3, nombre='Propietario', descripcion='Propietario'))
+        self.categoria = Categoria(nombre='Herramientas', descripcion='Test')
+        propietario = Usuario(
+            nombre='Propietario', apellido='User', correo='propietario@test.com',
+            contrasena='password', telefono='123', direccion='Test', id_rol=3,
+            fecha_registro=date.today()
+        )
+        db.session.add_all([self.categoria, propietario])
+        db.session.commit()
+
+        # Precios repetidos para probar el desempate por id entre páginas
+        for i, precio in enumerate([300, 100, 500, 100, 900, 700, 300]):
+            db.session.add(Objeto(
+                nombre=f'Objeto {i}', descripcion='Desc', precio=precio,
+                estado='Disponible', publicado=True,
+                fecha_publicacion=date.today() - timedelta(days=i),
+                promedio_calificacion=i % 3,
+                id_usuario=propietario.id_usuario, id_categoria=self.categoria.id_categoria,
+            ))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def recorrer(self, **parametros):
+        """Todas las páginas del listado JSON, de 2 en 2."""
+        self.app.config['CATALOGO_POR_PAGINA'] = 2
+        objetos, cursor = [], None
+        while True:
+            datos = self.client.get('/objetos/pagina', query_string={**parametros, 'cursor': cursor}).get_json()
+            objetos.extend(datos['objetos'])
+            cursor = datos['siguiente']
+            if not cursor:
+                return objetos
+
+    def test_ordenes_por_precio_entre_paginas(self):
+        ascendente = self.recorrer(orden='precio_asc')
+        self.assertEqual([o['precio'] for o in ascendente], [100, 100, 300, 300, 500, 700, 900])
+        ids = [o['id_objeto'] for o in ascendente]
+        self.assertEqual(ids[:2], sorted(ids[:2]))
+
+        descendente = self.recorrer(orden='precio_desc')
+        self.assertEqual([o['precio'] for o in descendente], [900, 700, 500, 300, 300, 100, 100])
+
+    def test_orden_por_calificacion(self):
+        objetos = self.recorrer(orden='calificacion')
+        promedios = [Objeto.query.get(o['id_objeto']).promedio_calificacion for o in objetos]
+        self.assertEqual(promedios, sorted(promedios, reverse=True))
+
+    def test_rango_de_precio(self):
+        objetos = self.recorrer(precio_min=300, precio_max=700, orden='precio_asc')
+        self.assertEqual([o['precio'] for o in objetos], [300, 300, 500, 700])
+
+    def test_parametros_invalidos_se_ignoran(self):
+        objetos = self.recorrer(precio_min='barato', orden='aleatorio')
+        self.assertEqual(len(objetos), 7)
+
+    def plan(self, categoria=None, precio_min=None, orden=None):
+        query, elegido = consulta_catalogo(categoria, '', precio_min, None, orden)
+        compilada = consulta_pagina(query, None, 24, elegido).statement.compile(db.engine)
+        filas = db.session.connection().exec_driver_sql(
+            'EXPLAIN QUERY PLAN ' + str(compilada),
+            tuple(compilada.params[nombre] for nombre in compilada.positiontup),
+        ).all()
+        return [fila[3] for fila in filas]
+
+    def test_cada_orden_usa_un_indice_sin_ordenar(self):
+        for categoria in (None, self.categoria.id_categoria):
+            for orden in ORDENES:
+                with self.subTest(categoria=categoria, orden=orden):
+                    plan = self.plan(categoria, orden=orden)
+                    self.assertTrue(plan[0].startswith('SEARCH objeto USING INDEX ix_objeto_'), plan)
+                    self.assertFalse(any('TEMP B-TREE' in paso for paso in plan), plan)
+
+    def test_rango_de_precio_usa_indice(self):
+        for categoria in (None, self.categoria.id_categoria):
+            for orden in ('precio_asc', 'precio_desc'):
+                with self.subTest(categoria=categoria, orden=orden):
+                    plan = self.plan(categoria, precio_min=100, orden=orden)
+                    self.assertIn('precio>?', plan[0])
+                    self.assertFalse(any('TEMP B-TREE' in paso for paso in plan), plan)
+
+            # Otros órdenes: recorrido de rango por precio, sin escanear la tabla
+            plan = self.plan(categoria, precio_min=100, orden='recientes')
+            self.assertTrue(plan[0].startswith('SEARCH objeto USING INDEX'), plan)
+
+if __name__ == '__main__':
+    unittest.main()
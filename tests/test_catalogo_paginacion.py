@@ -0,0 +1,118 @@
+import sys
+import os
+import unittest
+from datetime import date, timedelta
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from models.usuario import Usuario
+from models.rol import Rol
+from models.objeto import Objeto
+from models.categoria import Categoria
+
+class TestCatalogoPaginacion(unittest.TestCase):
+    def setUp(self):
+        # Force SQLite for testing
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['WTF_CSRF_ENABLED'] = False
+        self.app.config['CATALOGO_POR_PAGINA'] = 2
+        self.client = self.app.test_client()
+
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        db.session.add(Rol(id_rol=3, nombre='Propietario', descripcion='Propietario'))
+        self.herramientas = Categoria(nombre='Herramientas', descripcion='Test')
+        self.deportes = Categoria(nombre='Deportes', descripcion='Test')
+        db.session.add_all([self.herramientas, self.deportes])
+
+        self.propietario = Usuario(
+            nombre='Propietario', apellido='User', correo='propietario@test.com',
+            contrasena='password', telefono='123', direccion='Santo Domingo, DN', id_rol=3,
+            fecha_registro=date.today()
+        )
+        db.session.add(self.propietario)
+        db.session.commit()
+
+        # Varios objetos comparten fecha para ejercitar el desempate por id
+        hoy = date.today()
+        for i in range(5):
+            db.session.add(Objeto(
+                nombre=f'Taladro {i}', descripcion='Desc', precio=100 + i,
+                estado='Disponible', publicado=True,
+                fecha_publicacion=hoy - timedelta(days=i // 2),
+                id_usuario=self.propietario.id_usuario,
+                id_categoria=self.herramientas.id_categoria,
+            ))
+        db.session.add(Objeto(
+            nombre='Bicicleta', descripcion='Desc', precio=300,
+            estado='Disponible', publicado=True, fecha_publicacion=hoy,
+            id_usuario=self.propietario.id_usuario,
+            id_categoria=self.deportes.id_categoria,
+        ))
+        db.session.add(Objeto(
+            nombre='Borrador', descripcion='Desc', precio=50,
+            estado='Disponible', publicado=False,
+            id_usuario=self.propietario.id_usuario,
+            id_categoria=self.herramientas.id_categoria,
+        ))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def recorrer(self, **params):
+        ids, cursor, paginas = [], None, 0
+        while True:
+            if cursor:
+                params['cursor'] = cursor
+            datos = self.client.get('/objetos/pagina', query_string=params).get_json()
+            self.assertLessEqual(len(datos['objetos']), 2)
+            ids.extend(o['id_objeto'] for o in datos['objetos'])
+            paginas += 1
+            cursor = datos['siguiente']
+            if not cursor:
+                return ids, paginas
+
+    def test_recorre_todo_el_catalogo_sin_repetir(self):
+        ids, paginas = self.recorrer()
+
+        esperados = [
+            o.id_objeto for o in Objeto.query.filter_by(publicado=True)
+            .order_by(Objeto.fecha_publicacion.desc(), Objeto.id_objeto.desc())
+        ]
+        self.assertEqual(ids, esperados)
+        self.assertEqual(paginas, 3)
+
+    def test_cursor_respeta_filtros(self):
+        ids, _ = self.recorrer(categoria=self.herramientas.id_categoria, busqueda='taladro')
+        self.assertEqual(len(ids), 5)
+        self.assertEqual(len(set(ids)), 5)
+
+    def test_cursor_invalido_devuelve_primera_pagina(self):
+        primera = self.client.get('/objetos/pagina').get_json()
+        invalida = self.client.get('/objetos/pagina?cursor=no-es-un-cursor').get_json()
+        self.assertEqual(primera['objetos'], invalida['objetos'])
+
+    def test_tarjetas_json_con_propietario_y_ubicacion(self):
+        objeto = self.client.get('/objetos/pagina').get_json()['objetos'][0]
+        self.assertEqual(objeto['propietario'], 'Propietario')
+        self.assertEqual(objeto['ubicacion'], 'Santo Domingo')
+
+    def test_listado_html_enlaza_siguiente_pagina(self):
+        response = self.client.get('/objetos/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'id="cargarMas"', response.data)
+        self.assertIn(b'Bicicleta', response.data)
+
+if __name__ == '__main__':
+    unittest.main()
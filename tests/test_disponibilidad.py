@@ -0,0 +1,334 @@
+import sys
+import os
+import tempfile
+import threading
+import unittest
+import unittest.mock
+from datetime import date, timedelta
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from sqlalchemy import event, text
+from sqlalchemy.dialects import postgresql
+from models.usuario import Usuario
+from models.rol import Rol
+from models.objeto import Objeto
+from models.categoria import Categoria
+from models.reserva import Reserva
+from src.services.disponibilidad import (
+    ESPERA_REINTENTO,
+    FechasOcupadas,
+    ReservaEnConflicto,
+    conflicto,
+    consulta_version,
+    esta_disponible,
+    reservar,
+    reservas_solapadas,
+)
+
+HOY = date.today()
+
+
+def dia(n):
+    return HOY + timedelta(days=n)
+
+
+class TestDisponibilidad(unittest.TestCase):
+    URL_BASE = 'sqlite:///:memory:'
+
+    def setUp(self):
+        # Force SQLite for testing
+        os.environ['DATABASE_URL'] = self.URL_BASE
+
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['WTF_CSRF_ENABLED'] = False
+        self.client = self.app.test_client()
+
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        db.session.add_all([
+            Rol(id_rol=2, nombre='Cliente', descripcion='Cliente'),
+            Rol(id_rol=3, nombre='Propietario', descripcion='Propietario'),
+        ])
+        cat = Categoria(nombre='Herramientas', descripcion='Test')
+        self.cliente = Usuario(
+            nombre='Cliente', apellido='User', correo='cliente@test.com',
+            contrasena='password', telefono='123', direccion='Test', id_rol=2,
+            fecha_registro=HOY
+        )
+        self.cliente.set_password('password')
+        self.propietario = Usuario(
+            nombre='Propietario', apellido='User', correo='propietario@test.com',
+            contrasena='password', telefono='123', direccion='Test', id_rol=3,
+            fecha_registro=HOY
+        )
+        self.propietario.set_password('password')
+        db.session.add_all([cat, self.cliente, self.propietario])
+        db.session.commit()
+
+        self.objeto = Objeto(
+            nombre='Taladro', descripcion='Desc', precio=100.0,
+            estado='Disponible', id_usuario=self.propietario.id_usuario,
+            id_categoria=cat.id_categoria, fecha_publicacion=HOY
+        )
+        db.session.add(self.objeto)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def reservar(self, inicio, fin, estado='Aceptada'):
+        reserva = Reserva(
+            fecha_reserva=HOY, fecha_inicio=dia(inicio), fecha_fin=dia(fin),
+            estado=estado, id_usuario=self.cliente.id_usuario,
+            id_objeto=self.objeto.id_objeto,
+        )
+        db.session.add(reserva)
+        db.session.commit()
+        return reserva
+
+    def pedir(self, inicio, fin):
+        self.client.post('/auth/login', data=dict(
+            correo='cliente@test.com', contrasena='password'
+        ))
+        return self.client.post(f'/reservas/nueva/{self.objeto.id_objeto}', data={
+            'fecha_inicio': dia(inicio), 'fecha_fin': dia(fin),
+        }, follow_redirects=True)
+
+    def test_solapamiento_incluye_los_extremos(self):
+        ocupada = self.reservar(10, 14)
+        id_objeto = self.objeto.id_objeto
+
+        self.assertTrue(esta_disponible(id_objeto, dia(1), dia(9)))
+        self.assertTrue(esta_disponible(id_objeto, dia(15), dia(20)))
+        for desde, hasta in [(8, 10), (14, 16), (11, 12), (5, 20)]:
+            self.assertEqual(conflicto(id_objeto, dia(desde), dia(hasta)), ocupada)
+
+    def test_solo_bloquean_las_reservas_activas(self):
+        for estado in ('Rechazada', 'Cancelada', 'Finalizada'):
+            self.reservar(10, 14, estado)
+        self.assertTrue(esta_disponible(self.objeto.id_objeto, dia(10), dia(14)))
+
+        self.reservar(10, 14, 'Pendiente')
+        self.assertFalse(esta_disponible(self.objeto.id_objeto, dia(10), dia(14)))
+
+    def test_varias_reservas_sin_solapar(self):
+        self.assertIn(b'Solicitud de reserva enviada', self.pedir(1, 3).data)
+        self.assertIn(b'Solicitud de reserva enviada', self.pedir(5, 8).data)
+
+        db.session.refresh(self.objeto)
+        self.assertEqual(self.objeto.estado, 'Disponible')
+        self.assertEqual(Reserva.query.count(), 2)
+
+    def test_rechaza_fechas_ocupadas(self):
+        self.reservar(5, 8)
+
+        respuesta = self.pedir(7, 10)
+
+        fechas = f'del {dia(5):%d/%m/%Y} al {dia(8):%d/%m/%Y}'
+        self.assertIn(fechas.encode(), respuesta.data)
+        self.assertEqual(Reserva.query.count(), 1)
+
+    def test_cancelar_libera_las_fechas(self):
+        self.assertIn(b'Solicitud de reserva enviada', self.pedir(5, 8).data)
+        reserva = Reserva.query.one()
+        self.client.get(f'/reservas/{reserva.id_reserva}/cancelar')
+
+        self.assertIn(b'Solicitud de reserva enviada', self.pedir(5, 8).data)
+
+    def test_no_disponible_no_se_reserva(self):
+        self.objeto.estado = 'No Disponible'
+        db.session.commit()
+
+        respuesta = self.pedir(1, 3)
+
+        self.assertIn('no está disponible para reservar'.encode(), respuesta.data)
+        self.assertEqual(Reserva.query.count(), 0)
+
+    def test_usa_el_indice_de_fechas(self):
+        consulta = reservas_solapadas(self.objeto.id_objeto, dia(1), dia(3))
+        compilada = consulta.statement.compile(
+            db.engine, compile_kwargs={'literal_binds': True}
+        )
+        plan = db.session.execute(text(f'EXPLAIN QUERY PLAN {compilada}')).fetchall()
+        detalle = ' '.join(fila[-1] for fila in plan)
+
+        self.assertIn('ix_reserva_objeto_fin', detalle)
+        self.assertIn('fecha_fin>?', detalle)
+
+    def test_reservar_reintenta_si_el_objeto_cambio(self):
+        # Simula que otra reserva se confirmó entre la lectura y el UPDATE
+        original = db.session.execute
+        carreras = iter([True])
+
+        def execute(sentencia, *args, **kwargs):
+            if getattr(sentencia, 'is_update', False) and next(carreras, False):
+                self.reservar(20, 22)
+            return original(sentencia, *args, **kwargs)
+
+        db.session.execute = execute
+        try:
+            with self.assertRaises(FechasOcupadas):
+                reservar(self.objeto.id_objeto, self.cliente.id_usuario, dia(21), dia(23))
+            reserva = reservar(self.objeto.id_objeto, self.cliente.id_usuario, dia(1), dia(3))
+        finally:
+            db.session.execute = original
+
+        self.assertEqual(reserva.estado, 'Pendiente')
+        self.assertEqual(Reserva.query.count(), 2)
+
+    def test_reservar_agota_los_reintentos(self):
+        with self.assertRaises(ReservaEnConflicto):
+            reservar(self.objeto.id_objeto, self.cliente.id_usuario, dia(1), dia(3), reintentos=0)
+
+    def test_reintentos_con_espera_aleatoria(self):
+        with unittest.mock.patch('src.services.disponibilidad._reclamar_objeto', return_value=False), \
+                unittest.mock.patch('src.services.disponibilidad.time.sleep') as dormir:
+            with self.assertRaises(ReservaEnConflicto):
+                reservar(self.objeto.id_objeto, self.cliente.id_usuario, dia(1), dia(3), reintentos=3)
+
+        esperas = [c.args[0] for c in dormir.call_args_list]
+        self.assertEqual(len(esperas), 2)
+        for intento, espera in enumerate(esperas):
+            self.assertLessEqual(espera, ESPERA_REINTENTO * 2 ** intento)
+
+    def test_bloquea_la_fila_del_objeto_en_postgresql(self):
+        sql = str(consulta_version(1).compile(dialect=postgresql.dialect()))
+        self.assertIn('FOR UPDATE', sql)
+
+    def reservar_fechas(self, inicio, fin, estado='Aceptada'):
+        db.session.add(Reserva(
+            fecha_reserva=HOY, fecha_inicio=inicio, fecha_fin=fin, estado=estado,
+            id_usuario=self.cliente.id_usuario, id_objeto=self.objeto.id_objeto,
+        ))
+        db.session.commit()
+
+    def test_ocupacion_del_mes(self):
+        anio = HOY.year + 1
+        self.reservar_fechas(date(anio, 2, 27), date(anio, 3, 2))
+        self.reservar_fechas(date(anio, 3, 10), date(anio, 3, 12), 'Pendiente')
+        self.reservar_fechas(date(anio, 3, 20), date(anio, 3, 22), 'Cancelada')
+
+        datos = self.client.get(
+            f'/reservas/disponibilidad/{self.objeto.id_objeto}?mes={anio}-03'
+        ).get_json()
+
+        self.assertEqual(datos['mes'], f'{anio}-03')
+        self.assertEqual(datos['dias'], 31)
+        self.assertEqual(datos['ocupados'], '11' + '0' * 7 + '111' + '0' * 19)
+        self.assertEqual(datos['tramos'], [
+            [f'{anio}-03-01', f'{anio}-03-02'],
+            [f'{anio}-03-10', f'{anio}-03-12'],
+        ])
+
+    def test_ocupacion_en_cache_hasta_que_cambia_una_reserva(self):
+        anio = HOY.year + 1
+        url = f'/reservas/disponibilidad/{self.objeto.id_objeto}?mes={anio}-05'
+        self.reservar_fechas(date(anio, 5, 1), date(anio, 5, 3))
+        reserva = Reserva.query.one()
+
+        consultas = []
+        def contar(conn, cursor, sentencia, *args):
+            if 'FROM reserva' in sentencia:
+                consultas.append(sentencia)
+        event.listen(db.engine, 'before_cursor_execute', contar)
+        try:
+            primera = self.client.get(url)
+            self.client.get(url)
+            self.assertEqual(len(consultas), 1)
+
+            # Sin cambios: 304 sin calcular nada
+            self.assertEqual(
+                self.client.get(url, headers={'If-None-Match': primera.headers['ETag']}).status_code, 304
+            )
+
+            # Cancelar la reserva sube Objeto.version: nueva entrada y nuevo ETag
+            reserva.estado = 'Cancelada'
+            db.session.commit()
+            segunda = self.client.get(url, headers={'If-None-Match': primera.headers['ETag']})
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', contar)
+
+        self.assertEqual(segunda.status_code, 200)
+        self.assertEqual(segunda.get_json()['tramos'], [])
+        self.assertEqual(len(consultas), 2)
+
+    def test_ocupacion_parametros(self):
+        url = f'/reservas/disponibilidad/{self.objeto.id_objeto}'
+        self.assertEqual(self.client.get(url).get_json()['mes'], HOY.strftime('%Y-%m'))
+        self.assertEqual(self.client.get(url + '?mes=2026-13').status_code, 400)
+        self.assertEqual(self.client.get(url + '?mes=marzo').status_code, 400)
+        self.assertEqual(self.client.get('/reservas/disponibilidad/999').status_code, 404)
+
+
+class TestReservasConcurrentes(TestDisponibilidad):
+    """Las mismas pruebas más peticiones en paralelo, contra un archivo SQLite."""
+
+    def setUp(self):
+        descriptor, self.archivo = tempfile.mkstemp(suffix='.db')
+        os.close(descriptor)
+        self.URL_BASE = f'sqlite:///{self.archivo}'
+        super().setUp()
+
+    def tearDown(self):
+        super().tearDown()
+        os.unlink(self.archivo)
+
+    def en_paralelo(self, periodos):
+        """Un cliente con sesión por periodo; todos envían la reserva a la vez."""
+        clientes = []
+        for _ in periodos:
+            cliente = self.app.test_client()
+            cliente.post('/auth/login', data=dict(correo='cliente@test.com', contrasena='password'))
+            clientes.append(cliente)
+
+        url = f'/reservas/nueva/{self.objeto.id_objeto}'
+        salida = threading.Barrier(len(periodos))
+        estados = [None] * len(periodos)
+
+        def enviar(i, cliente, inicio, fin):
+            salida.wait()
+            respuesta = cliente.post(url, data={
+                'fecha_inicio': dia(inicio), 'fecha_fin': dia(fin),
+            })
+            estados[i] = respuesta.status_code
+
+        hilos = [
+            threading.Thread(target=enviar, args=(i, cliente, inicio, fin))
+            for i, (cliente, (inicio, fin)) in enumerate(zip(clientes, periodos))
+        ]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        db.session.remove()
+        return estados
+
+    def test_mismas_fechas_a_la_vez(self):
+        estados = self.en_paralelo([(5, 8)] * 8)
+
+        self.assertEqual(estados.count(302), 1)
+        self.assertEqual(estados.count(409), 7)
+        self.assertEqual(Reserva.query.count(), 1)
+
+    def test_fechas_distintas_a_la_vez(self):
+        periodos = [(1, 2), (4, 5), (7, 8), (10, 11)]
+        estados = self.en_paralelo(periodos)
+
+        self.assertEqual(estados, [302] * len(periodos))
+        self.assertEqual(
+            sorted((r.fecha_inicio, r.fecha_fin) for r in Reserva.query),
+            [(dia(a), dia(b)) for a, b in periodos],
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import sys
+import os
+import unittest
+from datetime import date
+from sqlalchemy import event
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from models.usuario import Usuario
+from models.rol import Rol
+from models.objeto import Objeto
+from models.categoria import Categoria
+from models.reserva import Reserva
+from src.services.catalogo import contar_facetas
+
+class TestFacetas(unittest.TestCase):
+    def setUp(self):
+        # Force SQLite for testing
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['WTF_CSRF_ENABLED'] = False
+        self.client = self.app.test_client()
+
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        db.session.add(Rol(id_rol=3, nombre='Propietario', descripcion='Propietario'))
+        self.herramientas = Categoria(nombre='Herramientas', descripcion='Test')
+        self.camping = Categoria(nombre='Camping', descripcion='Test')
+        self.propietario = Usuario(
+            nombre='Propietario', apellido='User', correo='propietario@test.com',
+            contrasena='password', telefono='123', direccion='Test', id_rol=3,
+            fecha_registro=date.today()
+        )
+        db.session.add_all([self.herramientas, self.camping, self.propietario])
+        db.session.commit()
+
+        for nombre, precio, categoria in [
+            ('Taladro percutor', 300, self.herramientas),
+            ('Taladro inalámbrico', 800, self.herramientas),
+            ('Sierra circular', 2500, self.herramientas),
+            ('Carpa familiar', 700, self.camping),
+            ('Linterna de taladro', 100, self.camping),
+        ]:
+            db.session.add(self.crear_objeto(nombre, precio, categoria))
+        # No publicado: no cuenta
+        borrador = self.crear_objeto('Taladro viejo', 100, self.herramientas)
+        borrador.publicado = False
+        db.session.add(borrador)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def crear_objeto(self, nombre, precio, categoria):
+        return Objeto(
+            nombre=nombre, descripcion='Desc', precio=precio,
+            estado='Disponible', publicado=True, fecha_publicacion=date.today(),
+            id_usuario=self.propietario.id_usuario, id_categoria=categoria.id_categoria,
+        )
+
+    def contar_consultas(self, funcion):
+        consultas = []
+
+        def registrar(conn, cursor, statement, *args):
+            if 'version_cache' not in statement:
+                consultas.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', registrar)
+        try:
+            resultado = funcion()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', registrar)
+        return len(consultas), resultado
+
+    def test_conteos_por_categoria_y_precio(self):
+        facetas = contar_facetas('taladro')
+
+        self.assertEqual(facetas['categorias'], {
+            self.herramientas.id_categoria: 2, self.camping.id_categoria: 1,
+        })
+        self.assertEqual([t['total'] for t in facetas['precios']], [2, 1, 0, 0])
+
+    def test_precios_dentro_de_la_categoria_elegida(self):
+        facetas = contar_facetas('', self.herramientas.id_categoria)
+
+        self.assertEqual(facetas['categorias'][self.camping.id_categoria], 2)
+        self.assertEqual([t['total'] for t in facetas['precios']], [1, 1, 0, 1])
+
+    def test_una_consulta_y_cache_por_busqueda_normalizada(self):
+        consultas, _ = self.contar_consultas(lambda: contar_facetas('Taladro'))
+        self.assertEqual(consultas, 1)
+
+        consultas, _ = self.contar_consultas(lambda: contar_facetas('  TALADRO!  '))
+        self.assertEqual(consultas, 0)
+
+        db.session.add(self.crear_objeto('Taladro de banco', 1500, self.herramientas))
+        db.session.commit()
+
+        consultas, facetas = self.contar_consultas(lambda: contar_facetas('taladro'))
+        self.assertEqual(consultas, 1)
+        self.assertEqual([t['total'] for t in facetas['precios']], [2, 1, 1, 0])
+
+    def test_conteos_con_fechas(self):
+        desde, hasta = date(2030, 3, 10), date(2030, 3, 12)
+        self.assertEqual(
+            contar_facetas('taladro', None, desde, hasta)['categorias'][self.herramientas.id_categoria], 2
+        )
+
+        taladro = Objeto.query.filter_by(nombre='Taladro percutor').one()
+        db.session.add(Reserva(
+            fecha_reserva=date.today(), fecha_inicio=date(2030, 3, 11), fecha_fin=date(2030, 3, 15),
+            estado='Aceptada', id_usuario=self.propietario.id_usuario, id_objeto=taladro.id_objeto,
+        ))
+        db.session.commit()
+
+        facetas = contar_facetas('taladro', None, desde, hasta)
+        self.assertEqual(facetas['categorias'][self.herramientas.id_categoria], 1)
+        self.assertEqual([t['total'] for t in facetas['precios']], [1, 1, 0, 0])
+        # Sin fechas el taladro reservado sigue contando
+        self.assertEqual(contar_facetas('taladro')['categorias'][self.herramientas.id_categoria], 2)
+
+        response = self.client.get('/objetos/?busqueda=taladro&desde=2030-03-10&hasta=2030-03-12')
+        self.assertIn(b'Herramientas (1)', response.data)
+
+    def test_listado_muestra_conteos(self):
+        response = self.client.get('/objetos/?busqueda=taladro')
+        self.assertIn(b'Herramientas (2)', response.data)
+        self.assertIn(b'Camping (1)', response.data)
+
+if __name__ == '__main__':
+    unittest.main()
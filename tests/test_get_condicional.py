@@ -0,0 +1,180 @@
+import sys
+import os
+import unittest
+from datetime import date, timedelta
+from sqlalchemy import event
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from models.usuario import Usuario
+from models.rol import Rol
+from models.objeto import Objeto
+from models.categoria import Categoria
+from models.imagen_objeto import ImagenObjeto
+from models.opinion import Opinion
+from models.reserva import Reserva
+
+class TestGetCondicional(unittest.TestCase):
+    def setUp(self):
+        # Force SQLite for testing
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['WTF_CSRF_ENABLED'] = False
+        self.client = self.app.test_client()
+
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        r2 = Rol(id_rol=2, nombre='Cliente', descripcion='Cliente')
+        r3 = Rol(id_rol=3, nombre='Propietario', descripcion='Propietario')
+        db.session.add_all([r2, r3])
+        categoria = Categoria(nombre='Herramientas', descripcion='Test')
+        db.session.add(categoria)
+
+        self.cliente = Usuario(
+            nombre='Cliente', apellido='User', correo='cliente@test.com',
+            contrasena='password', telefono='123', direccion='Test', id_rol=2,
+            fecha_registro=date.today()
+        )
+        self.cliente.set_password('password')
+        self.propietario = Usuario(
+            nombre='Propietario', apellido='User', correo='propietario@test.com',
+            contrasena='password', telefono='123', direccion='Test', id_rol=3,
+            fecha_registro=date.today()
+        )
+        self.propietario.set_password('password')
+        db.session.add_all([self.cliente, self.propietario])
+        db.session.commit()
+
+        self.objeto = Objeto(
+            nombre='Taladro percutor', descripcion='Desc', precio=100,
+            estado='Disponible', publicado=True, fecha_publicacion=date.today(),
+            id_usuario=self.propietario.id_usuario, id_categoria=categoria.id_categoria,
+        )
+        db.session.add(self.objeto)
+        db.session.commit()
+        self.url = f'/objetos/objeto/{self.objeto.id_objeto}'
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def login(self, email, password):
+        return self.client.post('/auth/login', data=dict(
+            correo=email,
+            contrasena=password
+        ), follow_redirects=True)
+
+    def revalidar(self, url, etag):
+        return self.client.get(url, headers={'If-None-Match': etag})
+
+    def test_detalle_responde_304_sin_cargar_el_objeto(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers['ETag']
+
+        consultas = []
+
+        def registrar(conn, cursor, statement, *args):
+            consultas.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', registrar)
+        try:
+            response = self.revalidar(self.url, etag)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', registrar)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+        self.assertEqual(len(consultas), 1)
+
+    def test_if_modified_since_para_anonimos(self):
+        response = self.client.get(self.url)
+        ultima = response.headers['Last-Modified']
+
+        response = self.client.get(self.url, headers={'If-Modified-Since': ultima})
+        self.assertEqual(response.status_code, 304)
+
+    def test_cambios_en_hijos_cambian_la_version(self):
+        etag = self.client.get(self.url).headers['ETag']
+        version = self.objeto.version
+
+        cambios = [
+            ImagenObjeto(nombre_archivo='foto.jpg', objeto_id=self.objeto.id_objeto),
+            Opinion(calificacion=5, comentario='Bien', fecha=date.today(),
+                    id_usuario=self.cliente.id_usuario, id_objeto=self.objeto.id_objeto),
+            Reserva(fecha_reserva=date.today(), fecha_inicio=date.today(),
+                    fecha_fin=date.today() + timedelta(days=2), estado='Pendiente',
+                    id_usuario=self.cliente.id_usuario, id_objeto=self.objeto.id_objeto),
+        ]
+        for cambio in cambios:
+            db.session.add(cambio)
+            db.session.commit()
+
+            self.assertGreater(self.objeto.version, version)
+            version = self.objeto.version
+            response = self.revalidar(self.url, etag)
+            self.assertEqual(response.status_code, 200)
+            etag = response.headers['ETag']
+
+    def test_cambios_en_categoria_y_propietario(self):
+        response = self.client.get(self.url)
+        etag = response.headers['ETag']
+        catalogo = self.client.get('/objetos/').headers['ETag']
+
+        self.objeto.categoria.nombre = 'Ferretería'
+        db.session.commit()
+        response = self.revalidar(self.url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Ferretería'.encode(), response.data)
+        etag = response.headers['ETag']
+
+        version = self.objeto.version
+        self.propietario.direccion = 'Santiago, RD'
+        db.session.commit()
+        self.assertGreater(self.objeto.version, version)
+        response = self.revalidar(self.url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'Santiago, RD', response.data)
+        self.assertNotEqual(self.client.get('/objetos/').headers['ETag'], catalogo)
+
+        # Cambios que no se muestran no tocan la versión
+        version = self.objeto.version
+        self.propietario.telefono = '999'
+        db.session.commit()
+        self.assertEqual(self.objeto.version, version)
+
+    def test_autor_de_opinion_cambia_la_version(self):
+        db.session.add(Opinion(calificacion=5, comentario='Bien', fecha=date.today(),
+                               id_usuario=self.cliente.id_usuario, id_objeto=self.objeto.id_objeto))
+        db.session.commit()
+        version = self.objeto.version
+
+        self.cliente.nombre = 'Clienta'
+        db.session.commit()
+        self.assertGreater(self.objeto.version, version)
+
+    def test_etag_distinto_por_usuario(self):
+        etag = self.client.get(self.url).headers['ETag']
+        self.login('cliente@test.com', 'password')
+
+        self.assertEqual(self.revalidar(self.url, etag).status_code, 200)
+
+    def test_listado_responde_304_hasta_que_cambia_el_catalogo(self):
+        etag = self.client.get('/objetos/?busqueda=taladro').headers['ETag']
+        self.assertEqual(self.revalidar('/objetos/?busqueda=taladro', etag).status_code, 304)
+        self.assertEqual(self.revalidar('/objetos/?busqueda=otro', etag).status_code, 200)
+
+        self.objeto.precio = 150
+        db.session.commit()
+        self.assertEqual(self.revalidar('/objetos/?busqueda=taladro', etag).status_code, 200)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,361 @@
+import sys
+import os
+import base64
+import hashlib
+import io
+import shutil
+import tempfile
+import time
+import unittest
+import unittest.mock
+from datetime import date
+from PIL import Image, ImageFile
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from models.usuario import Usuario
+from models.rol import Rol
+from models.objeto import Objeto
+from models.categoria import Categoria
+from models.imagen_objeto import ImagenObjeto
+from src.services.imagenes import (
+    esperar_borrados,
+    extension_por_firma,
+    generar_variantes,
+    medir_imagen,
+    procesar_imagen,
+    vista_previa,
+)
+
+def jpeg(ancho, alto, orientacion=None):
+    salida = io.BytesIO()
+    exif = Image.Exif()
+    if orientacion:
+        exif[0x0112] = orientacion
+    Image.new('RGB', (ancho, alto), (200, 30, 30)).save(salida, 'JPEG', exif=exif)
+    return salida.getvalue()
+
+def png(ancho, alto):
+    salida = io.BytesIO()
+    Image.new('RGBA', (ancho, alto), (0, 90, 200, 128)).save(salida, 'PNG')
+    return salida.getvalue()
+
+def archivos(carpeta):
+    return sorted(
+        os.path.relpath(os.path.join(raiz, nombre), carpeta).replace(os.sep, '/')
+        for raiz, _, nombres in os.walk(carpeta) for nombre in nombres
+    )
+
+def medidas(datos):
+    with Image.open(io.BytesIO(datos)) as imagen:
+        return imagen.format, imagen.size
+
+class TestGenerarVariantes(unittest.TestCase):
+    def test_anchos_y_formatos(self):
+        variantes, _ = generar_variantes(jpeg(2000, 1000))
+
+        self.assertEqual(
+            [(ancho, formato, medidas(datos)) for ancho, formato, datos in variantes],
+            [
+                (320, 'webp', ('WEBP', (320, 160))),
+                (640, 'webp', ('WEBP', (640, 320))),
+                (1280, 'webp', ('WEBP', (1280, 640))),
+                (640, 'jpeg', ('JPEG', (640, 320))),
+            ],
+        )
+
+    def test_no_amplia_imagenes_pequenas(self):
+        variantes, _ = generar_variantes(jpeg(200, 100))
+        self.assertEqual([(a, f) for a, f, _ in variantes], [(200, 'webp'), (200, 'jpeg')])
+
+    def test_medidas_y_vista_previa(self):
+        datos = jpeg(1000, 500, orientacion=6)
+        self.assertEqual(medir_imagen(io.BytesIO(datos)), (500, 1000))
+
+        for placeholder in (generar_variantes(datos)[1], vista_previa(io.BytesIO(datos))):
+            self.assertTrue(placeholder.startswith('data:image/webp;base64,'))
+            self.assertLess(len(placeholder), 400)
+            vista = base64.b64decode(placeholder.split(',', 1)[1])
+            self.assertEqual(medidas(vista), ('WEBP', (8, 16)))
+
+    def test_medir_no_decodifica_la_imagen(self):
+        for datos in (jpeg(3000, 2000, orientacion=6), png(3000, 2000)):
+            with unittest.mock.patch.object(ImageFile.ImageFile, 'load') as cargar:
+                medir_imagen(io.BytesIO(datos))
+            cargar.assert_not_called()
+
+    def test_formato_por_firma(self):
+        webp = io.BytesIO()
+        Image.new('RGB', (10, 10)).save(webp, 'WEBP')
+        self.assertEqual(extension_por_firma(jpeg(10, 10)), '.jpg')
+        self.assertEqual(extension_por_firma(png(10, 10)), '.png')
+        self.assertEqual(extension_por_firma(webp.getvalue()), '.webp')
+        self.assertIsNone(extension_por_firma(b'<svg xmlns="http://www.w3.org/2000/svg"/>'))
+
+    def test_respeta_la_orientacion_exif(self):
+        # Orientación 6: la foto se tomó con el celular en vertical
+        variantes, _ = generar_variantes(jpeg(1000, 500, orientacion=6))
+        self.assertEqual(medidas(variantes[0][2])[1], (320, 640))
+
+
+class TestImagenesObjeto(unittest.TestCase):
+    def setUp(self):
+        # Force SQLite for testing
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['WTF_CSRF_ENABLED'] = False
+        self.app.config['IMAGENES_PROCESOS'] = 0
+        self.app.config['BORRADO_EN_SEGUNDO_PLANO'] = 0
+        self.uploads = tempfile.mkdtemp()
+        self.app.config['UPLOAD_FOLDER'] = self.uploads
+        self.client = self.app.test_client()
+
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        db.session.add(Rol(id_rol=3, nombre='Propietario', descripcion='Propietario'))
+        self.categoria = Categoria(nombre='Herramientas', descripcion='Test')
+        self.propietario = Usuario(
+            nombre='Propietario', apellido='User', correo='propietario@test.com',
+            contrasena='password', telefono='123', direccion='Test', id_rol=3,
+            fecha_registro=date.today()
+        )
+        self.propietario.set_password('password')
+        db.session.add_all([self.categoria, self.propietario])
+        db.session.commit()
+
+    def tearDown(self):
+        pool = self.app.extensions.get('rentflow_imagenes')
+        if pool:
+            pool.shutdown()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+        shutil.rmtree(self.uploads)
+
+    def login(self, email, password):
+        return self.client.post('/auth/login', data=dict(
+            correo=email,
+            contrasena=password
+        ), follow_redirects=True)
+
+    def crear_con_foto(self, nombre='Kayak doble', datos=None, archivo='kayak.jpg'):
+        self.login('propietario@test.com', 'password')
+        self.client.post('/objetos/nuevo', data={
+            'nombre': nombre, 'descripcion': 'Desc', 'estado': 'Disponible',
+            'precio': '500', 'id_categoria': self.categoria.id_categoria, 'publicar': 'on',
+            'imagenes': [(io.BytesIO(datos or jpeg(1600, 1200)), archivo)],
+        }, content_type='multipart/form-data')
+        return Objeto.query.filter_by(nombre=nombre).one()
+
+    def test_crear_objeto_registra_variantes(self):
+        datos = jpeg(1600, 1200)
+        huella = hashlib.sha256(datos).hexdigest()
+        base = f'{huella[:2]}/{huella[2:4]}/{huella}'
+
+        objeto = self.crear_con_foto(datos=datos)
+        imagen = objeto.imagenes[0]
+
+        self.assertEqual(imagen.hash_contenido, huella)
+        self.assertEqual((imagen.ancho, imagen.alto, imagen.tamano_bytes), (1600, 1200, len(datos)))
+        self.assertTrue(imagen.placeholder.startswith('data:image/webp;base64,'))
+        self.assertEqual(imagen.nombre_archivo, base + '.jpg')
+        self.assertEqual(
+            sorted(v['archivo'] for v in imagen.variantes),
+            [base + '_1280.webp', base + '_320.webp', base + '_640.jpg', base + '_640.webp'],
+        )
+        self.assertEqual(archivos(self.uploads), sorted(
+            [imagen.nombre_archivo] + [v['archivo'] for v in imagen.variantes]
+        ))
+
+        html = self.client.get('/objetos/').data
+        self.assertIn(f'src="/uploads/{base}_640.jpg"'.encode(), html)
+        self.assertIn(b'width="1600" height="1200"', html)
+        self.assertIn(imagen.placeholder.encode(), html)
+        self.assertIn(f'/uploads/{base}_320.webp 320w'.encode(), html)
+
+    def test_contenido_repetido_se_guarda_una_vez(self):
+        datos = jpeg(1600, 1200)
+        primero = self.crear_con_foto('Kayak doble', datos, 'kayak.jpg')
+        en_disco = archivos(self.uploads)
+
+        with unittest.mock.patch('src.services.imagenes.generar_variantes') as generar:
+            segundo = self.crear_con_foto('Kayak de repuesto', datos, 'otro-nombre.JPG')
+        generar.assert_not_called()
+
+        a, b = primero.imagenes[0], segundo.imagenes[0]
+        self.assertEqual(b.nombre_archivo, a.nombre_archivo)
+        self.assertEqual(b.variantes, a.variantes)
+        self.assertEqual(b.placeholder, a.placeholder)
+        self.assertEqual(ImagenObjeto.referencias(a.hash_contenido), 2)
+        self.assertEqual(archivos(self.uploads), en_disco)
+
+    def test_no_reutiliza_variantes_sin_archivos(self):
+        datos = jpeg(1600, 1200)
+        primero = self.crear_con_foto('Kayak doble', datos)
+        perdida = primero.imagenes[0].variantes[0]['archivo']
+        os.unlink(os.path.join(self.uploads, perdida))
+
+        segundo = self.crear_con_foto('Kayak de repuesto', datos)
+
+        self.assertIsNotNone(segundo.imagenes[0].variantes)
+        self.assertIn(perdida, archivos(self.uploads))
+
+    def test_eliminar_conserva_archivos_compartidos(self):
+        datos = jpeg(1600, 1200)
+        primero = self.crear_con_foto('Kayak doble', datos)
+        segundo = self.crear_con_foto('Kayak de repuesto', datos)
+        en_disco = archivos(self.uploads)
+
+        self.client.post(f'/objetos/eliminar/{primero.id_objeto}')
+        self.assertEqual(archivos(self.uploads), en_disco)
+
+        self.client.post(f'/objetos/eliminar/{segundo.id_objeto}')
+        self.assertEqual(archivos(self.uploads), [])
+
+    def test_borrado_en_segundo_plano(self):
+        self.app.config['BORRADO_EN_SEGUNDO_PLANO'] = 1
+        objeto = self.crear_con_foto()
+
+        self.client.post(f'/objetos/eliminar/{objeto.id_objeto}')
+        esperar_borrados()
+        self.assertEqual(archivos(self.uploads), [])
+
+    def test_eliminar_usuario_borra_sus_archivos(self):
+        db.session.add(Rol(id_rol=1, nombre='Administrador', descripcion='Admin'))
+        admin = Usuario(
+            nombre='Admin', apellido='User', correo='admin@test.com',
+            contrasena='password', telefono='123', direccion='Test', id_rol=1,
+            fecha_registro=date.today()
+        )
+        admin.set_password('password')
+        db.session.add(admin)
+        db.session.commit()
+        self.crear_con_foto()
+        self.client.get('/auth/logout')
+
+        self.propietario.estado = 'suspendido'
+        db.session.commit()
+        self.login('admin@test.com', 'password')
+        respuesta = self.client.post(f'/admin/usuarios/eliminar/{self.propietario.id_usuario}')
+
+        self.assertTrue(respuesta.get_json()['ok'])
+        self.assertEqual(archivos(self.uploads), [])
+
+    def test_eliminar_borra_las_variantes(self):
+        objeto = self.crear_con_foto()
+        self.client.post(f'/objetos/eliminar/{objeto.id_objeto}')
+        self.assertEqual(archivos(self.uploads), [])
+
+    def test_varias_imagenes_en_una_transaccion(self):
+        self.login('propietario@test.com', 'password')
+        fotos = [(io.BytesIO(jpeg(400 + i, 300)), f'foto{i}.jpg') for i in range(5)]
+        fotos.append((io.BytesIO(png(50, 50)), 'extra.png'))  # la sexta se ignora
+
+        with unittest.mock.patch.object(db.session, 'commit', wraps=db.session.commit) as commit:
+            self.client.post('/objetos/nuevo', data={
+                'nombre': 'Kayak doble', 'descripcion': 'Desc', 'estado': 'Disponible',
+                'precio': '500', 'id_categoria': self.categoria.id_categoria, 'publicar': 'on',
+                'imagenes': fotos,
+            }, content_type='multipart/form-data')
+            commits = [c for c in commit.mock_calls if c[0] == '']
+
+        objeto = Objeto.query.filter_by(nombre='Kayak doble').one()
+        self.assertEqual(len(objeto.imagenes), 5)
+        for imagen in objeto.imagenes:
+            self.assertTrue(os.path.exists(os.path.join(self.uploads, imagen.nombre_archivo)))
+        # Uno para el objeto y sus imágenes, uno por cada registro de variantes
+        self.assertEqual(len(commits), 1 + 5)
+        self.assertFalse([a for a in archivos(self.uploads) if '.subida-' in a])
+
+    def test_rechaza_archivos_que_no_son_imagenes(self):
+        self.login('propietario@test.com', 'password')
+        respuesta = self.client.post('/objetos/nuevo', data={
+            'nombre': 'Kayak doble', 'descripcion': 'Desc', 'estado': 'Disponible',
+            'precio': '500', 'id_categoria': self.categoria.id_categoria, 'publicar': 'on',
+            'imagenes': [
+                (io.BytesIO(jpeg(400, 300)), 'kayak.jpg'),
+                (io.BytesIO(b'MZ\x90\x00 no soy una foto'), 'kayak.jpg.exe'),
+            ],
+        }, content_type='multipart/form-data')
+
+        self.assertIn('no es una imagen'.encode(), respuesta.data)
+        self.assertEqual(Objeto.query.count(), 0)
+        self.assertEqual(archivos(self.uploads), [])
+
+    def test_rechaza_imagenes_danadas(self):
+        self.login('propietario@test.com', 'password')
+        respuesta = self.client.post('/objetos/nuevo', data={
+            'nombre': 'Kayak doble', 'descripcion': 'Desc', 'estado': 'Disponible',
+            'precio': '500', 'id_categoria': self.categoria.id_categoria, 'publicar': 'on',
+            'imagenes': [(io.BytesIO(b'\x89PNG\r\n\x1a\n' + b'\x00' * 64), 'kayak.png')],
+        }, content_type='multipart/form-data')
+
+        self.assertIn('dañado'.encode(), respuesta.data)
+        self.assertEqual(Objeto.query.count(), 0)
+        self.assertEqual(archivos(self.uploads), [])
+
+    def test_rechaza_imagenes_demasiado_grandes(self):
+        self.app.config['IMAGEN_MAX_BYTES'] = 1024
+        self.login('propietario@test.com', 'password')
+        respuesta = self.client.post('/objetos/nuevo', data={
+            'nombre': 'Kayak doble', 'descripcion': 'Desc', 'estado': 'Disponible',
+            'precio': '500', 'id_categoria': self.categoria.id_categoria, 'publicar': 'on',
+            'imagenes': [(io.BytesIO(jpeg(1600, 1200)), 'kayak.jpg')],
+        }, content_type='multipart/form-data')
+
+        self.assertIn('supera el máximo'.encode(), respuesta.data)
+        self.assertEqual(Objeto.query.count(), 0)
+        self.assertEqual(archivos(self.uploads), [])
+
+    def test_rechaza_imagenes_de_demasiados_pixeles(self):
+        self.app.config['IMAGEN_MAX_PIXELES'] = 1000 * 1000
+        self.login('propietario@test.com', 'password')
+        with unittest.mock.patch('src.services.imagenes.generar_variantes') as generar:
+            respuesta = self.client.post('/objetos/nuevo', data={
+                'nombre': 'Kayak doble', 'descripcion': 'Desc', 'estado': 'Disponible',
+                'precio': '500', 'id_categoria': self.categoria.id_categoria, 'publicar': 'on',
+                'imagenes': [(io.BytesIO(jpeg(1600, 1200)), 'kayak.jpg')],
+            }, content_type='multipart/form-data')
+        generar.assert_not_called()
+
+        self.assertIn('megapíxeles'.encode(), respuesta.data)
+        self.assertEqual(Objeto.query.count(), 0)
+        self.assertEqual(archivos(self.uploads), [])
+
+    def test_pool_de_procesos(self):
+        self.app.config['IMAGENES_PROCESOS'] = 1
+        objeto = Objeto(
+            nombre='Carpa', descripcion='Desc', precio=100, estado='Disponible',
+            id_usuario=self.propietario.id_usuario, id_categoria=self.categoria.id_categoria,
+        )
+        db.session.add(objeto)
+        db.session.flush()
+        imagen = ImagenObjeto(nombre_archivo='carpa.jpg', objeto_id=objeto.id_objeto)
+        db.session.add(imagen)
+        db.session.commit()
+
+        with open(os.path.join(self.uploads, 'carpa.jpg'), 'wb') as archivo:
+            archivo.write(jpeg(800, 600))
+
+        procesar_imagen(imagen).result(timeout=60)
+
+        # El registro lo hace el callback del pool, en otro hilo
+        limite = time.monotonic() + 10
+        while time.monotonic() < limite:
+            db.session.expire_all()
+            if db.session.get(ImagenObjeto, imagen.id).variantes:
+                break
+            time.sleep(0.05)
+        imagen = db.session.get(ImagenObjeto, imagen.id)
+        self.assertEqual(len(imagen.variantes), 4)
+        self.assertTrue(imagen.placeholder.startswith('data:image/webp;base64,'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import sys
+import os
+import unittest
+from datetime import date, timedelta
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from sqlalchemy import event
+from models.usuario import Usuario
+from models.rol import Rol
+from models.objeto import Objeto
+from models.categoria import Categoria
+from models.reserva import Reserva
+from models.pago import Pago
+from src.services.catalogo import paginar
+from src.services.reservas import ORDEN_RESERVAS, consulta_reservas_de
+
+HOY = date.today()
+
+
+class TestMisReservas(unittest.TestCase):
+    def setUp(self):
+        # Force SQLite for testing
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['WTF_CSRF_ENABLED'] = False
+        self.client = self.app.test_client()
+
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        db.session.add_all([
+            Rol(id_rol=2, nombre='Cliente', descripcion='Cliente'),
+            Rol(id_rol=3, nombre='Propietario', descripcion='Propietario'),
+        ])
+        self.cliente = Usuario(
+            nombre='Cliente', apellido='User', correo='cliente@test.com',
+            contrasena='password', telefono='123', direccion='Test', id_rol=2,
+            fecha_registro=HOY
+        )
+        self.cliente.set_password('password')
+        self.propietario = Usuario(
+            nombre='Propietario', apellido='User', correo='propietario@test.com',
+            contrasena='password', telefono='123', direccion='Test', id_rol=3,
+            fecha_registro=HOY
+        )
+        db.session.add_all([self.cliente, self.propietario])
+        db.session.commit()
+        self.numero = 0
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def agregar_reservas(self, cantidad):
+        """Cada reserva con su propio objeto y categoría; las pares, pagadas."""
+        ids = []
+        for _ in range(cantidad):
+            self.numero += 1
+            categoria = Categoria(nombre=f'Categoría {self.numero}', descripcion='Test')
+            db.session.add(categoria)
+            db.session.flush()
+            objeto = Objeto(
+                nombre=f'Objeto {self.numero}', descripcion='Desc', precio=100.0,
+                estado='Disponible', id_usuario=self.propietario.id_usuario,
+                id_categoria=categoria.id_categoria, fecha_publicacion=HOY,
+            )
+            db.session.add(objeto)
+            db.session.flush()
+            pagada = self.numero % 2 == 0
+            reserva = Reserva(
+                fecha_reserva=HOY - timedelta(days=self.numero % 4), fecha_inicio=HOY, fecha_fin=HOY,
+                estado='Confirmada' if pagada else 'Pendiente',
+                id_usuario=self.cliente.id_usuario, id_objeto=objeto.id_objeto,
+            )
+            db.session.add(reserva)
+            db.session.flush()
+            if pagada:
+                db.session.add(Pago(
+                    monto=200, fecha_pago=HOY, metodo='Tarjeta', id_reserva=reserva.id_reserva,
+                ))
+            ids.append(reserva.id_reserva)
+        db.session.commit()
+        return ids
+
+    def consultas_de_la_pagina(self, **parametros):
+        consultas = []
+        def contar(conn, cursor, sentencia, *args):
+            if sentencia.startswith('SELECT'):
+                consultas.append(sentencia)
+        event.listen(db.engine, 'before_cursor_execute', contar)
+        try:
+            respuesta = self.client.get('/reservas/', query_string=parametros)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', contar)
+        self.assertEqual(respuesta.status_code, 200)
+        return len(consultas), respuesta.data.decode()
+
+    def login(self):
+        self.client.post('/auth/login', data=dict(correo='cliente@test.com', contrasena='password'))
+
+    def test_consultas_fijas_por_pagina(self):
+        self.login()
+        self.agregar_reservas(3)
+        pocas, html = self.consultas_de_la_pagina()
+        self.assertIn('Categoría 3', html)
+        self.assertIn('RD$ 200.00', html)
+
+        self.agregar_reservas(30)
+        muchas, html = self.consultas_de_la_pagina()
+        self.assertEqual(html.count('Ver más antiguas'), 1)
+
+        self.assertEqual(pocas, muchas)
+
+    def test_recorre_todas_las_paginas_en_orden(self):
+        ids = self.agregar_reservas(9)
+        esperado = [
+            r.id_reserva for r in sorted(
+                Reserva.query.all(), key=lambda r: (r.fecha_reserva, r.id_reserva), reverse=True
+            )
+        ]
+
+        vistas, cursor = [], None
+        while True:
+            pagina, cursor = paginar(consulta_reservas_de(self.cliente.id_usuario), cursor, 2, ORDEN_RESERVAS)
+            vistas.extend(r.id_reserva for r in pagina)
+            if not cursor:
+                break
+
+        self.assertEqual(vistas, esperado)
+        self.assertEqual(sorted(vistas), sorted(ids))
+
+    def test_filtro_por_estado(self):
+        self.login()
+        self.agregar_reservas(4)
+
+        _, html = self.consultas_de_la_pagina(estado='Confirmada')
+        for numero, confirmada in [(1, False), (2, True), (3, False), (4, True)]:
+            self.assertEqual(f'Categoría {numero}' in html, confirmada)
+
+        # Estado desconocido: sin filtro
+        _, html = self.consultas_de_la_pagina(estado='Perdida')
+        self.assertIn('Categoría 1', html)
+
+
+if __name__ == '__main__':
+    unittest.main()
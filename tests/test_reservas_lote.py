@@ -0,0 +1,226 @@
+import sys
+import os
+import re
+import unittest
+from datetime import date, timedelta
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from sqlalchemy import event, update
+from models.usuario import Usuario
+from models.rol import Rol
+from models.objeto import Objeto
+from models.categoria import Categoria
+from models.reserva import Reserva
+from src.services.disponibilidad import esta_disponible
+
+HOY = date.today()
+
+
+def dia(n):
+    return HOY + timedelta(days=n)
+
+
+class TestReservasEnLote(unittest.TestCase):
+    def setUp(self):
+        # Force SQLite for testing
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['WTF_CSRF_ENABLED'] = False
+        self.client = self.app.test_client()
+
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        db.session.add_all([
+            Rol(id_rol=2, nombre='Cliente', descripcion='Cliente'),
+            Rol(id_rol=3, nombre='Propietario', descripcion='Propietario'),
+        ])
+        cat = Categoria(nombre='Herramientas', descripcion='Test')
+        db.session.add(cat)
+        usuarios = {}
+        for correo, rol in [('cliente@test.com', 2), ('propietario@test.com', 3), ('otro@test.com', 3)]:
+            usuario = Usuario(
+                nombre='Usuario', apellido='Test', correo=correo,
+                contrasena='password', telefono='123', direccion='Test', id_rol=rol,
+                fecha_registro=HOY
+            )
+            usuario.set_password('password')
+            usuarios[correo] = usuario
+        db.session.add_all(usuarios.values())
+        db.session.commit()
+        self.cliente = usuarios['cliente@test.com']
+
+        self.objetos = []
+        for nombre, dueno in [('Taladro', 'propietario@test.com'), ('Sierra', 'propietario@test.com'),
+                              ('Kayak', 'otro@test.com')]:
+            objeto = Objeto(
+                nombre=nombre, descripcion='Desc', precio=100.0, estado='Disponible',
+                id_usuario=usuarios[dueno].id_usuario, id_categoria=cat.id_categoria,
+                fecha_publicacion=HOY,
+            )
+            db.session.add(objeto)
+            self.objetos.append(objeto)
+        db.session.commit()
+
+        # Pendientes de Taladro y Sierra (propias), una ya aceptada y una de Kayak (ajena)
+        self.ids = [
+            self.reservar(self.objetos[0], 1, 3),
+            self.reservar(self.objetos[0], 5, 7),
+            self.reservar(self.objetos[1], 1, 3),
+            self.reservar(self.objetos[1], 9, 10, 'Aceptada'),
+            self.reservar(self.objetos[2], 1, 3),
+        ]
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def reservar(self, objeto, inicio, fin, estado='Pendiente'):
+        reserva = Reserva(
+            fecha_reserva=HOY, fecha_inicio=dia(inicio), fecha_fin=dia(fin), estado=estado,
+            id_usuario=self.cliente.id_usuario, id_objeto=objeto.id_objeto,
+        )
+        db.session.add(reserva)
+        db.session.commit()
+        return reserva.id_reserva
+
+    def login(self, correo):
+        self.client.post('/auth/login', data=dict(correo=correo, contrasena='password'))
+
+    def estados(self):
+        db.session.expire_all()
+        return [db.session.get(Reserva, i).estado for i in self.ids]
+
+    def test_aceptar_en_lote_con_resultado_por_id(self):
+        self.login('propietario@test.com')
+        versiones = [o.version for o in self.objetos]
+
+        sentencias = []
+        def registrar(conn, cursor, sentencia, *args):
+            sentencias.append(sentencia)
+        event.listen(db.engine, 'before_cursor_execute', registrar)
+        try:
+            respuesta = self.client.post('/reservas/gestionar/lote', json={
+                'accion': 'aceptar', 'ids': self.ids[:3] + [self.ids[3], self.ids[4], 999, self.ids[0]],
+            })
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', registrar)
+
+        datos = respuesta.get_json()
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertFalse(datos['ok'])
+        self.assertEqual(datos['msg'], '3 de 6 solicitudes aceptadas.')
+        self.assertEqual(
+            [(r['id_reserva'], r['ok'], r['estado']) for r in datos['resultados']],
+            [
+                (self.ids[0], True, 'Aceptada'),
+                (self.ids[1], True, 'Aceptada'),
+                (self.ids[2], True, 'Aceptada'),
+                (self.ids[3], False, 'Aceptada'),
+                (self.ids[4], False, 'Pendiente'),
+                (999, False, None),
+            ],
+        )
+        self.assertEqual(datos['resultados'][4]['motivo'], 'No es de tus objetos')
+        self.assertEqual(self.estados(), ['Aceptada', 'Aceptada', 'Aceptada', 'Aceptada', 'Pendiente'])
+
+        # Una lectura con join y un UPDATE de reserva para todo el lote
+        self.assertEqual(len([s for s in sentencias if 'FROM reserva' in s]), 1)
+        self.assertIn('JOIN objeto', [s for s in sentencias if 'FROM reserva' in s][0])
+        self.assertEqual(len([s for s in sentencias if s.startswith('UPDATE reserva')]), 1)
+
+        # Las versiones de los objetos tocados cambian (ETag, calendario)
+        db.session.expire_all()
+        cambiados = [o.version != v for o, v in zip(self.objetos, versiones)]
+        self.assertEqual(cambiados, [True, True, False])
+
+    def test_rechazar_desde_el_formulario_libera_las_fechas(self):
+        self.login('propietario@test.com')
+
+        respuesta = self.client.post('/reservas/gestionar/lote', data={
+            'accion': 'rechazar', 'ids': [self.ids[0], self.ids[2]],
+        }, follow_redirects=True)
+
+        self.assertIn('2 de 2 solicitudes rechazadas.'.encode(), respuesta.data)
+        self.assertEqual(self.estados(), ['Rechazada', 'Pendiente', 'Rechazada', 'Aceptada', 'Pendiente'])
+        self.assertTrue(esta_disponible(self.objetos[0].id_objeto, dia(1), dia(3)))
+        self.assertTrue(esta_disponible(self.objetos[1].id_objeto, dia(1), dia(3)))
+
+    def test_peticiones_invalidas(self):
+        self.login('propietario@test.com')
+        url = '/reservas/gestionar/lote'
+        self.assertEqual(self.client.post(url, json={'accion': 'borrar', 'ids': self.ids}).status_code, 400)
+        self.assertEqual(self.client.post(url, json={'accion': 'aceptar', 'ids': []}).status_code, 400)
+        self.assertEqual(self.client.post(url, json={'accion': 'aceptar', 'ids': ['x']}).status_code, 400)
+        for cuerpo in ([self.ids[0], self.ids[1]], 'aceptar',
+                       {'accion': 'aceptar', 'ids': str(self.ids[0])},
+                       {'accion': 'aceptar', 'ids': [True]},
+                       {'accion': 'aceptar', 'ids': [str(self.ids[0])]},
+                       {'accion': 'aceptar', 'ids': {str(self.ids[0]): 1}},
+                       {'accion': ['aceptar'], 'ids': [self.ids[0]]}):
+            self.assertEqual(self.client.post(url, json=cuerpo).status_code, 400, cuerpo)
+        self.assertEqual(self.estados()[:3], ['Pendiente', 'Pendiente', 'Pendiente'])
+
+        self.client.get('/auth/logout')
+        self.login('cliente@test.com')
+        self.assertEqual(self.client.post(url, json={'accion': 'aceptar', 'ids': self.ids}).status_code, 403)
+        self.assertEqual(self.estados()[0], 'Pendiente')
+
+    def test_exige_token_csrf(self):
+        self.login('propietario@test.com')
+        self.app.config['WTF_CSRF_ENABLED'] = True
+        url = '/reservas/gestionar/lote'
+
+        pagina = self.client.get('/reservas/gestionar').get_data(as_text=True)
+        token = re.search(r'name="csrf_token" value="([^"]+)"', pagina).group(1)
+
+        respuesta = self.client.post(url, data={'accion': 'rechazar', 'ids': [self.ids[0]]})
+        self.assertEqual(respuesta.status_code, 302)
+        respuesta = self.client.post(url, json={'accion': 'rechazar', 'ids': [self.ids[0]]})
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(self.estados()[0], 'Pendiente')
+
+        respuesta = self.client.post(url, json={'accion': 'rechazar', 'ids': [self.ids[0]]},
+                                     headers={'X-CSRFToken': token})
+        self.assertEqual(respuesta.status_code, 200)
+        self.client.post(url, data={'accion': 'rechazar', 'ids': [self.ids[2]], 'csrf_token': token})
+        self.assertEqual(self.estados()[:3], ['Rechazada', 'Pendiente', 'Rechazada'])
+
+    def test_reclasifica_si_otra_peticion_gano(self):
+        self.login('propietario@test.com')
+
+        # Entre la lectura y el UPDATE el cliente cancela la segunda
+        original = db.session.execute
+        carreras = iter([True])
+
+        def execute(sentencia, *args, **kwargs):
+            if getattr(sentencia, 'is_update', False) and next(carreras, False):
+                original(update(Reserva).where(Reserva.id_reserva == self.ids[1]).values(estado='Cancelada'))
+                db.session.commit()
+            return original(sentencia, *args, **kwargs)
+
+        db.session.execute = execute
+        try:
+            datos = self.client.post('/reservas/gestionar/lote', json={
+                'accion': 'aceptar', 'ids': self.ids[:2],
+            }).get_json()
+        finally:
+            db.session.execute = original
+
+        self.assertEqual(
+            [(r['ok'], r['motivo']) for r in datos['resultados']],
+            [(True, None), (False, 'Ya no está pendiente')],
+        )
+        self.assertEqual(self.estados()[:2], ['Aceptada', 'Cancelada'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+import sys
+import os
+import unittest
+from datetime import date
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from models.usuario import Usuario
+from models.rol import Rol
+from models.objeto import Objeto
+from models.categoria import Categoria
+from src.services.sugerencias import IndiceSugerencias, obtener_indice
+
+class TestIndiceSugerencias(unittest.TestCase):
+    def test_prefijos_sin_acentos_y_por_palabra(self):
+        indice = IndiceSugerencias()
+        indice.cargar([(1, 'Cámara Réflex'), (2, 'Taladro percutor')], [(1, 'Cámping')])
+
+        self.assertEqual([r['texto'] for r in indice.buscar('cam')], ['Cámara Réflex', 'Cámping'])
+        self.assertEqual([r['texto'] for r in indice.buscar('PERC')], ['Taladro percutor'])
+        self.assertEqual(indice.buscar('xyz'), [])
+
+    def test_agregar_y_quitar(self):
+        indice = IndiceSugerencias()
+        indice.agregar('objeto', 1, 'Bicicleta de montaña')
+        indice.agregar('objeto', 1, 'Bicicleta urbana')
+        self.assertEqual([r['texto'] for r in indice.buscar('bici')], ['Bicicleta urbana'])
+        self.assertEqual(indice.buscar('montana'), [])
+
+        indice.quitar('objeto', 1)
+        self.assertEqual(indice.buscar('bici'), [])
+
+
+class TestSugerencias(unittest.TestCase):
+    def setUp(self):
+        # Force SQLite for testing
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['WTF_CSRF_ENABLED'] = False
+        self.client = self.app.test_client()
+
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        db.session.add(Rol(id_rol=3, nombre='Propietario', descripcion='Propietario'))
+        self.categoria = Categoria(nombre='Herramientas', descripcion='Test')
+        db.session.add(self.categoria)
+
+        self.propietario = Usuario(
+            nombre='Propietario', apellido='User', correo='propietario@test.com',
+            contrasena='password', telefono='123', direccion='Test', id_rol=3,
+            fecha_registro=date.today()
+        )
+        self.propietario.set_password('password')
+        db.session.add(self.propietario)
+        db.session.commit()
+
+        self.publicado = Objeto(
+            nombre='Taladro percutor', descripcion='Desc', precio=100,
+            estado='Disponible', publicado=True, fecha_publicacion=date.today(),
+            id_usuario=self.propietario.id_usuario, id_categoria=self.categoria.id_categoria,
+        )
+        self.borrador = Objeto(
+            nombre='Hidrolavadora', descripcion='Desc', precio=100,
+            estado='Disponible', publicado=False,
+            id_usuario=self.propietario.id_usuario, id_categoria=self.categoria.id_categoria,
+        )
+        db.session.add_all([self.publicado, self.borrador])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def login(self, email, password):
+        return self.client.post('/auth/login', data=dict(
+            correo=email,
+            contrasena=password
+        ), follow_redirects=True)
+
+    def sugerir(self, q):
+        datos = self.client.get('/objetos/sugerencias', query_string={'q': q}).get_json()
+        return [s['texto'] for s in datos['sugerencias']]
+
+    def test_sugiere_objetos_publicados_y_categorias(self):
+        self.assertEqual(self.sugerir('tal'), ['Taladro percutor'])
+        self.assertEqual(self.sugerir('herra'), ['Herramientas'])
+        self.assertEqual(self.sugerir('hidro'), [])
+        self.assertEqual(self.sugerir(''), [])
+
+    def test_se_actualiza_al_publicar_y_eliminar(self):
+        self.assertEqual(self.sugerir('hidro'), [])
+        self.login('propietario@test.com', 'password')
+
+        self.client.post(f'/objetos/publicar/{self.borrador.id_objeto}')
+        self.assertEqual(self.sugerir('hidro'), ['Hidrolavadora'])
+
+        self.client.post(f'/objetos/eliminar/{self.publicado.id_objeto}')
+        self.assertEqual(self.sugerir('tal'), [])
+
+    def test_eliminar_usuario_lo_retira(self):
+        db.session.add(Rol(id_rol=1, nombre='Administrador', descripcion='Admin'))
+        admin = Usuario(
+            nombre='Admin', apellido='User', correo='admin@test.com',
+            contrasena='password', telefono='123', direccion='Test', id_rol=1,
+            fecha_registro=date.today()
+        )
+        admin.set_password('password')
+        self.propietario.estado = 'suspendido'
+        db.session.add(admin)
+        db.session.commit()
+        self.assertEqual(self.sugerir('tal'), ['Taladro percutor'])
+
+        self.login('admin@test.com', 'password')
+        self.client.post(f'/admin/usuarios/eliminar/{self.propietario.id_usuario}')
+        self.assertEqual(self.sugerir('tal'), [])
+
+    def test_reconstruye_una_sola_peticion(self):
+        indice = obtener_indice()
+        construido_en = indice.construido_en
+        self.app.config['SUGERENCIAS_TTL'] = -1
+
+        # Otra petición está reconstruyendo: esta sigue con el índice anterior
+        with indice.reconstruyendo:
+            self.assertIs(obtener_indice(), indice)
+            self.assertEqual(indice.construido_en, construido_en)
+            self.assertEqual(self.sugerir('tal'), ['Taladro percutor'])
+
+        obtener_indice()
+        self.assertGreater(indice.construido_en, construido_en)
+
+    def test_solo_objetos_disponibles(self):
+        self.publicado.estado = 'No Disponible'
+        db.session.commit()
+        self.assertEqual(self.sugerir('tal'), [])
+
+    def test_se_actualiza_con_las_categorias(self):
+        db.session.add(Rol(id_rol=1, nombre='Administrador', descripcion='Admin'))
+        admin = Usuario(
+            nombre='Admin', apellido='User', correo='admin@test.com',
+            contrasena='password', telefono='123', direccion='Test', id_rol=1,
+            fecha_registro=date.today()
+        )
+        admin.set_password('password')
+        db.session.add(admin)
+        db.session.commit()
+        self.assertEqual(self.sugerir('camp'), [])
+        self.login('admin@test.com', 'password')
+
+        self.client.post('/admin/categorias/crear', data={'nombre': 'Camping'})
+        self.assertEqual(self.sugerir('camp'), ['Camping'])
+
+        camping = Categoria.query.filter_by(nombre='Camping').one()
+        self.client.post('/admin/categorias/editar', data={
+            'categoria_id': camping.id_categoria, 'nombre': 'Acampar',
+        })
+        self.assertEqual(self.sugerir('camp'), [])
+        self.assertEqual(self.sugerir('acam'), ['Acampar'])
+
+        self.client.post(f'/admin/categorias/{camping.id_categoria}/eliminar')
+        self.assertEqual(self.sugerir('acam'), [])
+
+    def test_se_actualiza_al_crear(self):
+        self.assertEqual(self.sugerir('kay'), [])
+        self.login('propietario@test.com', 'password')
+
+        self.client.post('/objetos/nuevo', data={
+            'nombre': 'Kayak doble', 'descripcion': 'Desc', 'estado': 'Disponible',
+            'precio': '500', 'id_categoria': self.categoria.id_categoria, 'publicar': 'on',
+        })
+        self.assertEqual(self.sugerir('kay'), ['Kayak doble'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+
+HUELLA = 'ab' + 'cd' + '0' * 60
+INMUTABLE = f'ab/cd/{HUELLA}_640.webp'
+CONTENIDO = b'RIFF\x00\x00\x00\x00WEBP' + bytes(range(256)) * 4
+
+class TestServirUploads(unittest.TestCase):
+    def setUp(self):
+        # Force SQLite for testing
+        os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.uploads = tempfile.mkdtemp()
+        self.app.config['UPLOAD_FOLDER'] = self.uploads
+        self.client = self.app.test_client()
+
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+        db.create_all()
+
+        for archivo in (INMUTABLE, 'kayak.jpg'):
+            ruta = os.path.join(self.uploads, archivo)
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            with open(ruta, 'wb') as destino:
+                destino.write(CONTENIDO)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+        shutil.rmtree(self.uploads)
+
+    def test_archivos_por_contenido_son_inmutables(self):
+        respuesta = self.client.get(f'/uploads/{INMUTABLE}')
+
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.data, CONTENIDO)
+        self.assertEqual(respuesta.mimetype, 'image/webp')
+        self.assertTrue(respuesta.cache_control.immutable)
+        self.assertTrue(respuesta.cache_control.public)
+        self.assertEqual(respuesta.cache_control.max_age, 365 * 24 * 3600)
+
+    def test_nombres_sin_huella_se_revalidan(self):
+        respuesta = self.client.get('/uploads/kayak.jpg')
+
+        self.assertFalse(respuesta.cache_control.immutable)
+        self.assertEqual(respuesta.cache_control.max_age, self.app.config['UPLOADS_MAX_AGE'])
+
+        condicional = self.client.get('/uploads/kayak.jpg', headers={
+            'If-None-Match': respuesta.headers['ETag'],
+        })
+        self.assertEqual(condicional.status_code, 304)
+        self.assertEqual(condicional.data, b'')
+
+    def test_rango(self):
+        respuesta = self.client.get(f'/uploads/{INMUTABLE}', headers={'Range': 'bytes=12-21'})
+
+        self.assertEqual(respuesta.status_code, 206)
+        self.assertEqual(respuesta.data, CONTENIDO[12:22])
+        self.assertEqual(respuesta.headers['Content-Range'], f'bytes 12-21/{len(CONTENIDO)}')
+
+    def test_fuera_de_la_carpeta(self):
+        self.assertEqual(self.client.get('/uploads/no-existe.jpg').status_code, 404)
+        self.assertEqual(self.client.get('/uploads/../app.py').status_code, 404)
+        self.assertEqual(self.client.get('/uploads/ab/../../app.py').status_code, 404)
+
+    def test_x_accel_redirect(self):
+        self.app.config['UPLOADS_SENDFILE'] = 'x-accel'
+        respuesta = self.client.get(f'/uploads/{INMUTABLE}')
+
+        self.assertEqual(respuesta.data, b'')
+        self.assertEqual(respuesta.headers['X-Accel-Redirect'], f'/_uploads/{INMUTABLE}')
+        self.assertEqual(respuesta.mimetype, 'image/webp')
+        self.assertTrue(respuesta.cache_control.immutable)
+
+    def test_x_sendfile(self):
+        self.app.config['UPLOADS_SENDFILE'] = 'x-sendfile'
+        respuesta = self.client.get('/uploads/kayak.jpg')
+
+        self.assertEqual(respuesta.data, b'')
+        self.assertEqual(
+            respuesta.headers['X-Sendfile'], os.path.join(self.uploads, 'kayak.jpg')
+        )
+
+if __name__ == '__main__':
+    unittest.main()